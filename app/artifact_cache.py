@@ -0,0 +1,127 @@
+"""
+Cache d'artefacts adressé par contenu (à la manière de joblib.Memory)
+
+Une étape (`stage`) est un appel de fonction dont le résultat est gardé
+sur disque sous l'empreinte joblib de son nom, du code source de la
+fonction et de ses arguments (données comprises) : mêmes données et mêmes
+paramètres, même artefact, quel que soit le lancement. Modifier la
+fonction ou les données change la clé ; les anciens artefacts restent
+jusqu'à `clear()`.
+
+Statistiques par étape (`report()`) : appels servis par le cache ou
+recalculés, durée de calcul, temps économisé (durée de calcul mémorisée
+moins le coût du hachage et de la lecture).
+
+    python -m app.artifact_cache model/artifact_cache --clear
+"""
+import inspect
+import os
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+import joblib
+
+
+def _function_id(func: Callable) -> tuple:
+    try:
+        source = inspect.getsource(func)
+    except (OSError, TypeError):
+        source = None
+    return getattr(func, "__module__", None), getattr(func, "__qualname__", repr(func)), source
+
+
+class ArtifactCache:
+    """Cache disque (ou mémoire si `location` est None) des étapes de préparation"""
+
+    def __init__(self, location=None):
+        self.location = Path(location) if location else None
+        self._memory: Dict[str, tuple] = {}
+        self.stats: Dict[str, dict] = {}
+
+    def call(self, stage: str, func: Callable, *args, **kwargs):
+        """Résultat de `func(*args, **kwargs)`, lu dans le cache s'il existe"""
+        started = time.perf_counter()
+        key = joblib.hash((stage, _function_id(func), args, kwargs))
+        cached = self._load(stage, key)
+        stats = self.stats.setdefault(stage, {
+            "hits": 0, "misses": 0, "compute_seconds": 0.0, "lookup_seconds": 0.0, "saved_seconds": 0.0,
+        })
+        if cached is not None:
+            value, seconds = cached
+            lookup = time.perf_counter() - started
+            stats["hits"] += 1
+            stats["lookup_seconds"] += lookup
+            stats["saved_seconds"] += seconds - lookup
+            return value
+
+        lookup = time.perf_counter() - started
+        computed = time.perf_counter()
+        value = func(*args, **kwargs)
+        seconds = time.perf_counter() - computed
+        self._store(stage, key, value, seconds)
+        stats["misses"] += 1
+        stats["lookup_seconds"] += lookup
+        stats["compute_seconds"] += seconds
+        return value
+
+    def report(self) -> Dict[str, dict]:
+        """Par étape : hits, misses, taux de hits et durées (secondes)"""
+        report = {}
+        for stage, stats in self.stats.items():
+            calls = stats["hits"] + stats["misses"]
+            report[stage] = {
+                **{name: round(value, 3) if isinstance(value, float) else value for name, value in stats.items()},
+                "hit_rate": round(stats["hits"] / calls, 3) if calls else 0.0,
+            }
+        return report
+
+    def clear(self):
+        self._memory.clear()
+        self.stats.clear()
+        if self.location is not None and self.location.exists():
+            shutil.rmtree(self.location)
+
+    # =========================
+    # STOCKAGE
+    # =========================
+    def _path(self, stage: str, key: str) -> Path:
+        return self.location / stage / f"{key}.joblib"
+
+    def _load(self, stage: str, key: str) -> Optional[tuple]:
+        if self.location is None:
+            return self._memory.get(key)
+        try:
+            payload = joblib.load(self._path(stage, key))
+        except (OSError, EOFError, ValueError, KeyError):
+            return None
+        return payload["value"], payload["seconds"]
+
+    def _store(self, stage: str, key: str, value, seconds: float):
+        if self.location is None:
+            self._memory[key] = (value, seconds)
+            return
+        path = self._path(stage, key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Écriture atomique : plusieurs processus peuvent remplir le même cache
+        fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        os.close(fd)
+        try:
+            joblib.dump({"value": value, "seconds": seconds}, tmp)
+            os.replace(tmp, path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+
+if __name__ == "__main__":
+    target = sys.argv[1] if len(sys.argv) > 1 else "model/artifact_cache"
+    if "--clear" in sys.argv[2:]:
+        ArtifactCache(target).clear()
+        print({"cleared": target})
+    else:
+        files = list(Path(target).rglob("*.joblib"))
+        print({"artifacts": len(files), "mb": round(sum(f.stat().st_size for f in files) / 2**20, 1)})
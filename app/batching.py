@@ -0,0 +1,168 @@
+"""
+Micro-batching des prédictions unitaires (/predict)
+
+Les requêtes concurrentes sont regroupées pendant au plus `max_wait_ms`
+(ou jusqu'à `max_batch_size` lignes) puis scorées en un seul appel
+matriciel ; chaque requête récupère ensuite sa propre probabilité.
+
+Chaque ligne peut porter un `context` (le modèle qui doit la scorer) :
+pendant un rechargement du modèle, un lot est découpé par contexte pour
+qu'aucune ligne ne soit scorée par un autre modèle que le sien.
+"""
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from typing import Callable, Optional
+
+import numpy as np
+
+# Bornes supérieures des buckets de l'histogramme des tailles de lot
+BATCH_SIZE_BUCKETS = [1, 2, 4, 8, 16, 32, 64, 128, 256, 512]
+
+
+class MicroBatcher:
+    """
+    Regroupe les lignes soumises par plusieurs threads et les score ensemble
+    """
+
+    def __init__(
+        self,
+        predict_fn: Callable[[np.ndarray, object], np.ndarray],
+        max_batch_size: int = 64,
+        max_wait_ms: float = 2.0,
+    ):
+        self.predict_fn = predict_fn
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait = max(0.0, float(max_wait_ms)) / 1000.0
+
+        self._queue = deque()
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._running = False
+
+        # -------- Statistiques
+        self._batches = 0
+        self._rows = 0
+        self._size_histogram = [0] * (len(BATCH_SIZE_BUCKETS) + 1)
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    # =========================
+    # CYCLE DE VIE
+    # =========================
+    def start(self):
+        with self._cond:
+            if self._running:
+                return
+            self._running = True
+        self._thread = threading.Thread(
+            target=self._run, name="micro-batcher", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    @property
+    def running(self) -> bool:
+        return self._running
+
+    # =========================
+    # SOUMISSION
+    # =========================
+    def submit(self, row: np.ndarray, context=None, timeout: Optional[float] = None) -> float:
+        """
+        Soumet une ligne (10 features) et attend sa probabilité de churn
+        """
+        future: Future = Future()
+        with self._cond:
+            if not self._running:
+                raise RuntimeError("Micro-batcher not running")
+            self._queue.append((row, time.perf_counter(), future, context))
+            self._cond.notify()
+        return future.result(timeout)
+
+    # =========================
+    # BOUCLE DE TRAITEMENT
+    # =========================
+    def _collect(self):
+        with self._cond:
+            while self._running and not self._queue:
+                self._cond.wait()
+            if not self._queue:
+                return []
+
+            # Premier élément arrivé : on attend au plus max_wait pour remplir le lot
+            deadline = self._queue[0][1] + self.max_wait
+            while self._running and len(self._queue) < self.max_batch_size:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+
+            size = min(len(self._queue), self.max_batch_size)
+            return [self._queue.popleft() for _ in range(size)]
+
+    def _run(self):
+        while True:
+            items = self._collect()
+            if not items:
+                if not self._running:
+                    return
+                continue
+
+            started = time.perf_counter()
+            groups = {}
+            for item in items:
+                groups.setdefault(id(item[3]), []).append(item)
+
+            for group in groups.values():
+                try:
+                    X = np.vstack([row for row, _, _, _ in group])
+                    probas = np.asarray(self.predict_fn(X, group[0][3]), dtype=np.float64)
+                except Exception as e:
+                    for _, _, future, _ in group:
+                        future.set_exception(e)
+                else:
+                    for (_, _, future, _), proba in zip(group, probas.tolist()):
+                        future.set_result(proba)
+
+            self._record(len(items), [started - enqueued for _, enqueued, _, _ in items])
+
+    def _record(self, size: int, waits):
+        with self._cond:
+            self._batches += 1
+            self._rows += size
+            bucket = next(
+                (i for i, bound in enumerate(BATCH_SIZE_BUCKETS) if size <= bound),
+                len(BATCH_SIZE_BUCKETS),
+            )
+            self._size_histogram[bucket] += 1
+            self._wait_total += sum(waits)
+            self._wait_max = max(self._wait_max, max(waits))
+
+    # =========================
+    # STATISTIQUES
+    # =========================
+    def stats(self) -> dict:
+        with self._cond:
+            labels = [f"<={b}" for b in BATCH_SIZE_BUCKETS] + [f">{BATCH_SIZE_BUCKETS[-1]}"]
+            return {
+                "enabled": True,
+                "running": self._running,
+                "max_batch_size": self.max_batch_size,
+                "max_wait_ms": self.max_wait * 1000.0,
+                "queue_depth": len(self._queue),
+                "batches": self._batches,
+                "rows": self._rows,
+                "avg_batch_size": round(self._rows / self._batches, 3) if self._batches else 0,
+                "batch_size_histogram": dict(zip(labels, self._size_histogram)),
+                "avg_added_wait_ms": round(self._wait_total / self._rows * 1000.0, 3) if self._rows else 0,
+                "max_added_wait_ms": round(self._wait_max * 1000.0, 3),
+            }
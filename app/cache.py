@@ -0,0 +1,123 @@
+"""
+Cache LRU/TTL des prédictions
+
+Clé : (version du modèle, vecteur canonique des 10 features). Le cache
+ne garde que les entrées de la version courante : un rechargement du
+modèle appelle `invalidate(nouvelle_version)` qui vide tout.
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Hashable, Iterable, List, Optional, Sequence, Tuple
+
+
+def canonical_key(row: Iterable) -> Tuple[float, ...]:
+    """
+    Vecteur de features normalisé en float (650 et 650.0 donnent la même clé)
+    """
+    return tuple(float(v) for v in row)
+
+
+class PredictionCache:
+    """
+    Cache borné en taille (LRU) avec expiration optionnelle (TTL)
+    """
+
+    def __init__(self, max_size: int = 10000, ttl_seconds: float = 0):
+        self.max_size = max(0, int(max_size))
+        self.ttl = max(0.0, float(ttl_seconds))
+        self._data: "OrderedDict[Hashable, Tuple[float, float]]" = OrderedDict()
+        self._version: Optional[str] = None
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_size > 0
+
+    # =========================
+    # LECTURE / ÉCRITURE
+    # =========================
+    def get_many(self, version: str, keys: Sequence[Hashable]) -> List[Optional[float]]:
+        """
+        Valeurs en cache (ou None) pour chaque clé, dans l'ordre
+        """
+        now = time.monotonic()
+        results: List[Optional[float]] = []
+        with self._lock:
+            if version is None or version != self._version:
+                self.misses += len(keys)
+                return [None] * len(keys)
+
+            for key in keys:
+                entry = self._data.get(key)
+                if entry is not None and self.ttl and now - entry[1] > self.ttl:
+                    del self._data[key]
+                    self.expirations += 1
+                    entry = None
+
+                if entry is None:
+                    self.misses += 1
+                    results.append(None)
+                else:
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    results.append(entry[0])
+        return results
+
+    def put_many(self, version: str, items: Iterable[Tuple[Hashable, float]]):
+        """
+        Stocke des résultats ; ignorés s'ils viennent d'une autre version du modèle
+        """
+        if not self.enabled:
+            return
+        now = time.monotonic()
+        with self._lock:
+            if version is None or version != self._version:
+                return
+            for key, value in items:
+                self._data[key] = (value, now)
+                self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def get(self, version: str, key: Hashable) -> Optional[float]:
+        return self.get_many(version, [key])[0]
+
+    def put(self, version: str, key: Hashable, value: float):
+        self.put_many(version, [(key, value)])
+
+    # =========================
+    # INVALIDATION
+    # =========================
+    def invalidate(self, version: Optional[str] = None):
+        """
+        Vide le cache et n'accepte plus que la version donnée
+        """
+        with self._lock:
+            self._data.clear()
+            self._version = version
+            self.invalidations += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "model_version": self._version,
+                "size": len(self._data),
+                "max_size": self.max_size,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+            }
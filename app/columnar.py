@@ -0,0 +1,148 @@
+"""
+Entrées / sorties colonnaires pour /predict/columnar
+
+Deux formats, choisis par Content-Type :
+- Arrow IPC stream (`application/vnd.apache.arrow.stream`, pyarrow requis)
+- buffer brut float64 little-endian (`application/octet-stream`), ordre
+  des colonnes déclaré dans l'en-tête `X-Columns`, disposition `row`
+  (ligne par ligne, défaut) ou `column` dans `X-Layout`
+
+Le buffer brut est relu sans copie : np.frombuffer + reshape donne
+directement la matrice passée au modèle.
+"""
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from app.utils import FEATURE_COLUMNS
+
+try:
+    import pyarrow as pa
+except ImportError:  # dépendance optionnelle
+    pa = None
+
+ARROW_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+RAW_MEDIA_TYPE = "application/octet-stream"
+
+
+class ColumnarFormatError(ValueError):
+    """Corps de requête colonnaire mal formé"""
+
+
+class UnsupportedFormatError(ColumnarFormatError):
+    """Format non pris en charge par ce serveur"""
+
+
+def parse_columns(header: Optional[str]) -> List[str]:
+    """
+    Ordre des colonnes déclaré (en-tête X-Columns), FEATURE_COLUMNS par défaut
+    """
+    if not header:
+        return list(FEATURE_COLUMNS)
+    columns = [c.strip() for c in header.split(",") if c.strip()]
+    if sorted(columns) != sorted(FEATURE_COLUMNS):
+        missing = sorted(set(FEATURE_COLUMNS) - set(columns))
+        extra = sorted(set(columns) - set(FEATURE_COLUMNS))
+        raise ColumnarFormatError(
+            f"X-Columns doit lister les 10 features (manquantes: {missing}, inconnues: {extra})"
+        )
+    return columns
+
+
+# =========================
+# DÉCODAGE
+# =========================
+def decode_raw(body: bytes, columns: List[str], layout: str = "row") -> np.ndarray:
+    """
+    Buffer float64 little-endian -> matrice (n, 10) dans l'ordre du modèle
+    """
+    n_cols = len(columns)
+    itemsize = np.dtype("<f8").itemsize
+    if len(body) % (itemsize * n_cols):
+        raise ColumnarFormatError(
+            f"Taille du buffer ({len(body)} octets) non multiple de {itemsize * n_cols}"
+        )
+
+    values = np.frombuffer(body, dtype="<f8")
+    if layout == "row":
+        X = values.reshape(-1, n_cols)
+    elif layout == "column":
+        X = values.reshape(n_cols, -1).T
+    else:
+        raise ColumnarFormatError(f"X-Layout inconnu: {layout}")
+
+    if columns != FEATURE_COLUMNS:
+        X = X[:, [columns.index(c) for c in FEATURE_COLUMNS]]
+    return X
+
+
+def decode_arrow(body: bytes) -> np.ndarray:
+    """
+    Flux Arrow IPC -> matrice (n, 10) dans l'ordre du modèle
+    """
+    if pa is None:
+        raise UnsupportedFormatError("pyarrow n'est pas installé sur le serveur")
+
+    try:
+        table = pa.ipc.open_stream(pa.py_buffer(body)).read_all()
+    except pa.ArrowException as e:
+        raise ColumnarFormatError(f"Flux Arrow invalide: {e}")
+
+    missing = [c for c in FEATURE_COLUMNS if c not in table.column_names]
+    if missing:
+        raise ColumnarFormatError(f"Colonnes manquantes: {missing}")
+
+    X = np.empty((table.num_rows, len(FEATURE_COLUMNS)), dtype=np.float64)
+    for j, name in enumerate(FEATURE_COLUMNS):
+        column = table.column(name)
+        # Types numériques scalaires seulement (ni chaînes, ni listes, ni structs)
+        if not (pa.types.is_integer(column.type) or pa.types.is_floating(column.type)
+                or pa.types.is_boolean(column.type)):
+            raise ColumnarFormatError(f"Type non numérique pour {name}: {column.type}")
+        if column.null_count:
+            raise ColumnarFormatError(f"Valeurs nulles dans {name}")
+        try:
+            X[:, j] = column.to_numpy()
+        except (pa.ArrowException, ValueError, TypeError) as e:
+            raise ColumnarFormatError(f"Colonne {name} illisible: {e}")
+    return X
+
+
+# =========================
+# ENCODAGE
+# =========================
+def encode_raw(probas: np.ndarray) -> bytes:
+    """Probabilités en float64 little-endian"""
+    return np.ascontiguousarray(probas, dtype="<f8").tobytes()
+
+
+def encode_arrow(probas: np.ndarray) -> bytes:
+    """Table Arrow (churn_probability, prediction) en flux IPC"""
+    table = pa.table({
+        "churn_probability": pa.array(probas, type=pa.float64()),
+        "prediction": pa.array((probas > 0.5).astype(np.int8), type=pa.int8()),
+    })
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def decode(body: bytes, content_type: str, columns_header: Optional[str],
+           layout_header: Optional[str]) -> Tuple[np.ndarray, str]:
+    """
+    Décode le corps selon le Content-Type ; renvoie (matrice, media type de réponse)
+    """
+    media_type = (content_type or RAW_MEDIA_TYPE).split(";")[0].strip().lower()
+    if media_type == ARROW_MEDIA_TYPE:
+        return decode_arrow(body), ARROW_MEDIA_TYPE
+    if media_type == RAW_MEDIA_TYPE:
+        columns = parse_columns(columns_header)
+        return decode_raw(body, columns, (layout_header or "row").lower()), RAW_MEDIA_TYPE
+    raise UnsupportedFormatError(f"Content-Type non supporté: {media_type}")
+
+
+def encode(probas: np.ndarray, media_type: str) -> bytes:
+    if media_type == ARROW_MEDIA_TYPE:
+        return encode_arrow(probas)
+    return encode_raw(probas)
@@ -0,0 +1,141 @@
+"""
+Chargement typé des CSV du projet (drift, entraînement, génération)
+
+Par défaut pandas lit chaque colonne en int64 / float64 : 8 octets par
+valeur, y compris pour les indicateurs 0/1. Le schéma ci-dessous fixe le
+plus petit type sûr de chaque colonne connue (les drapeaux et one-hot
+sont déjà des codes de modalité entiers : int8). Les colonnes hors schéma
+gardent l'inférence de pandas.
+
+Décimaux : float32 pour l'entraînement (les arbres de scikit-learn
+travaillent en float32), float64 pour le drift (statistiques identiques
+aux profils de référence sauvegardés).
+
+Les colonnes entières sont lues en float64 (pandas convertirait sans
+erreur 300 en 44 dans un int8), bloc par bloc, puis réduites à leur type
+du schéma seulement si toutes les valeurs sont entières et dans les
+bornes `np.iinfo`. Sinon (valeur manquante, décimale ou hors bornes) la
+colonne du bloc reste en float32, exact jusqu'à 2^24 (float64 au-delà).
+
+`read_table` ne garde jamais deux copies de la table : les colonnes du
+schéma sont préallouées (nombre de lignes compté d'abord sur les octets
+du fichier) puis remplies bloc par bloc ; une colonne n'est élargie
+(int8 -> float32...) que si un bloc l'exige.
+"""
+from typing import Dict, Iterator, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+SCHEMA: Dict[str, str] = {
+    "CreditScore": "int16",
+    "Age": "int16",
+    "Tenure": "int8",
+    "Balance": "float",
+    "NumOfProducts": "int8",
+    "HasCrCard": "int8",
+    "IsActiveMember": "int8",
+    "EstimatedSalary": "float",
+    "Geography_Germany": "int8",
+    "Geography_Spain": "int8",
+    "Exited": "int8",
+}
+
+
+def csv_dtypes(float_dtype=np.float32) -> Dict[str, object]:
+    """Types cibles du schéma (entiers au plus petit type, décimaux en `float_dtype`)"""
+    return {col: float_dtype if dtype == "float" else dtype for col, dtype in SCHEMA.items()}
+
+
+# Lignes par bloc de lecture de `read_table` (pic mémoire : table typée + un bloc en float64)
+READ_CHUNK_ROWS = 100_000
+
+# Taille des lectures du comptage de lignes
+COUNT_BLOCK_BYTES = 1 << 20
+
+# Plus grand entier exact en float32
+FLOAT32_EXACT_MAX = 2 ** 24
+
+
+def _read_dtypes(float_dtype) -> Dict[str, object]:
+    return {col: float_dtype if dtype == "float" else np.float64 for col, dtype in SCHEMA.items()}
+
+
+def _narrow(chunk: pd.DataFrame) -> pd.DataFrame:
+    """Colonnes entières du schéma réduites à leur type si les valeurs y tiennent"""
+    for col, dtype in SCHEMA.items():
+        if dtype == "float" or col not in chunk.columns:
+            continue
+        values = chunk[col].to_numpy()
+        if not len(values):
+            chunk[col] = values.astype(dtype)
+            continue
+        info = np.iinfo(dtype)
+        if (
+            np.isfinite(values).all()
+            and (values == np.floor(values)).all()
+            and values.min() >= info.min
+            and values.max() <= info.max
+        ):
+            chunk[col] = values.astype(dtype)
+        elif np.nanmax(np.abs(values), initial=0) <= FLOAT32_EXACT_MAX:
+            chunk[col] = values.astype(np.float32)
+    return chunk
+
+
+def header(path) -> List[str]:
+    return list(pd.read_csv(path, nrows=0).columns)
+
+
+def _count_lines(path) -> int:
+    """Sauts de ligne du fichier (+1) : borne haute du nombre de lignes de données"""
+    count = 1
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(COUNT_BLOCK_BYTES), b""):
+            count += block.count(b"\n")
+    return count
+
+
+def read_table(path, usecols: Optional[Sequence[str]] = None, float_dtype=np.float32) -> pd.DataFrame:
+    """CSV entier en mémoire, colonnes du schéma typées (remplies en place, bloc par bloc)"""
+    capacity = _count_lines(path)
+    targets = csv_dtypes(float_dtype)
+    columns: Dict[str, np.ndarray] = {}
+    others: Dict[str, List[pd.Series]] = {}
+    n_rows = 0
+    for chunk in read_table_chunks(path, READ_CHUNK_ROWS, usecols=usecols, float_dtype=float_dtype):
+        end = n_rows + len(chunk)
+        if end > capacity:
+            # Comptage inexact (fichier compressé...) : capacité doublée
+            capacity = max(end, 2 * capacity)
+            for col, array in columns.items():
+                columns[col] = np.empty(capacity, dtype=array.dtype)
+                columns[col][:n_rows] = array[:n_rows]
+        for col in chunk.columns:
+            values = chunk[col]
+            if col not in targets:
+                others.setdefault(col, []).append(values)
+                continue
+            if col not in columns:
+                columns[col] = np.empty(capacity, dtype=targets[col])
+            if values.dtype != columns[col].dtype:
+                # Bloc resté en float32 / float64 : toute la colonne est élargie
+                columns[col] = columns[col].astype(np.result_type(columns[col].dtype, values.dtype))
+            columns[col][n_rows:end] = values.to_numpy()
+        n_rows = end
+    if not n_rows:
+        return _narrow(pd.read_csv(path, usecols=usecols, dtype=_read_dtypes(float_dtype)))
+
+    order = [col for col in header(path) if col in columns or col in others]
+    data = {
+        col: columns[col][:n_rows] if col in columns else pd.concat(others[col], ignore_index=True)
+        for col in order
+    }
+    return pd.DataFrame(data, copy=False)
+
+
+def read_table_chunks(path, chunksize: int, usecols: Optional[Sequence[str]] = None,
+                      float_dtype=np.float32) -> Iterator[pd.DataFrame]:
+    """CSV par blocs de `chunksize` lignes, colonnes du schéma typées (par bloc)"""
+    for chunk in pd.read_csv(path, chunksize=chunksize, usecols=usecols, dtype=_read_dtypes(float_dtype)):
+        yield _narrow(chunk)
@@ -0,0 +1,97 @@
+"""
+Diagnostics mémoire des workers (Linux, via /proc)
+
+Pour chaque processus : RSS, PSS, et découpage partagé / privé des pages
+(`/proc/<pid>/smaps_rollup`). Avec un modèle mappé en mémoire ou
+préchargé avant le fork, les pages du modèle apparaissent en
+`shared_*` et la PSS de chaque worker baisse d'autant.
+"""
+import os
+from pathlib import Path
+from typing import List, Optional
+
+PROC = Path("/proc")
+
+# Champs de smaps_rollup remontés (en kB dans /proc, convertis en MB)
+SMAPS_FIELDS = {
+    "Rss": "rss_mb",
+    "Pss": "pss_mb",
+    "Shared_Clean": "shared_clean_mb",
+    "Shared_Dirty": "shared_dirty_mb",
+    "Private_Clean": "private_clean_mb",
+    "Private_Dirty": "private_dirty_mb",
+}
+
+
+def process_memory(pid: int) -> Optional[dict]:
+    """
+    Mémoire d'un processus, ou None si /proc n'est pas disponible
+    """
+    rollup = PROC / str(pid) / "smaps_rollup"
+    try:
+        lines = rollup.read_text().splitlines()
+    except OSError:
+        return None
+
+    stats = {"pid": pid}
+    for line in lines:
+        key, _, rest = line.partition(":")
+        if key in SMAPS_FIELDS:
+            stats[SMAPS_FIELDS[key]] = round(int(rest.split()[0]) / 1024, 2)
+
+    stats["shared_mb"] = round(stats.get("shared_clean_mb", 0) + stats.get("shared_dirty_mb", 0), 2)
+    stats["private_mb"] = round(stats.get("private_clean_mb", 0) + stats.get("private_dirty_mb", 0), 2)
+    return stats
+
+
+def _parent_pid(pid: int) -> Optional[int]:
+    try:
+        stat = (PROC / str(pid) / "stat").read_text()
+    except OSError:
+        return None
+    # Le nom du processus (2e champ) peut contenir des espaces : on coupe après ")"
+    return int(stat.rsplit(")", 1)[1].split()[1])
+
+
+def _executable(pid: int) -> Optional[str]:
+    try:
+        return os.readlink(PROC / str(pid) / "exe")
+    except OSError:
+        return None
+
+
+def sibling_workers(pid: Optional[int] = None) -> List[int]:
+    """
+    Processus Python ayant le même parent (workers gunicorn / uvicorn), pid inclus
+    """
+    pid = pid or os.getpid()
+    parent = _parent_pid(pid)
+    if parent is None or parent <= 1:
+        return [pid]
+
+    executable = _executable(pid)
+    siblings = []
+    for entry in PROC.iterdir():
+        if not entry.name.isdigit():
+            continue
+        other = int(entry.name)
+        if _parent_pid(other) == parent and _executable(other) == executable:
+            siblings.append(other)
+    return sorted(siblings) or [pid]
+
+
+def memory_report() -> dict:
+    """
+    Mémoire du worker courant et de ses frères
+    """
+    current = os.getpid()
+    workers = [m for m in (process_memory(p) for p in sibling_workers(current)) if m]
+    return {
+        "available": bool(workers),
+        "pid": current,
+        "parent_pid": os.getppid(),
+        "current": next((w for w in workers if w["pid"] == current), None),
+        "workers": workers,
+        "total_rss_mb": round(sum(w.get("rss_mb", 0) for w in workers), 2),
+        "total_pss_mb": round(sum(w.get("pss_mb", 0) for w in workers), 2),
+    }
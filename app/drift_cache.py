@@ -0,0 +1,123 @@
+"""
+Cache des résultats de contrôles de drift
+
+Clé : empreinte des fichiers (contenu de la référence, taille + mtime de
+la production et du profil) et configuration du test. Un fichier modifié
+change la clé : les anciens résultats ne sont plus jamais servis et
+sortent par LRU, sans invalidation explicite. Le calcul de la clé ne
+coûte que des `stat` : le SHA-256 de la référence n'est recalculé que si
+sa taille ou sa date de modification change.
+"""
+import os
+import threading
+from collections import OrderedDict
+from typing import Hashable, Optional, Tuple
+
+from app.utils import file_version
+
+
+def file_stamp(path) -> Tuple[int, int]:
+    """(taille, mtime en ns) d'un fichier ; (-1, -1) s'il n'existe pas"""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return (-1, -1)
+    return (st.st_size, st.st_mtime_ns)
+
+
+class ContentHasher:
+    """SHA-256 de fichiers, mémorisé tant que (taille, mtime) ne change pas"""
+
+    def __init__(self):
+        self._hashes = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, path) -> Optional[str]:
+        stamp = file_stamp(path)
+        if stamp[0] < 0:
+            return None
+        with self._lock:
+            cached = self._hashes.get(path)
+            if cached is not None and cached[0] == stamp:
+                return cached[1]
+        digest = file_version(path, length=64)
+        with self._lock:
+            self._hashes[path] = (stamp, digest)
+        return digest
+
+
+class DriftResultCache:
+    """
+    Résultats de contrôles terminés (LRU borné), par clé de contrôle
+    """
+
+    def __init__(self, max_size: int = 32):
+        self.max_size = max(0, int(max_size))
+        self._data: "OrderedDict[Hashable, dict]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hasher = ContentHasher()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_size > 0
+
+    def key(self, reference_file, production_file, profile_path, **config) -> Hashable:
+        """Clé d'un contrôle : empreintes des fichiers + configuration du test"""
+        return (
+            self.hasher(reference_file),
+            file_stamp(production_file),
+            file_stamp(profile_path),
+            tuple(sorted(config.items())),
+        )
+
+    def get(self, key: Hashable) -> Optional[dict]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key: Hashable, value: dict):
+        if not self.enabled:
+            return
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def find_job(self, job_id: str) -> Optional[dict]:
+        """
+        Vue complète (résultats compris) d'un job en cache : reste
+        consultable après son oubli par l'historique borné du runner
+        """
+        with self._lock:
+            for entry in self._data.values():
+                if entry.get("id") == job_id:
+                    return entry
+        return None
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "size": len(self._data),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+            }
@@ -1,13 +1,10 @@
 """
-Détection de Data Drift avec visualisations et alertes
+Détection de Data Drift et rapports
 Compatible API / Docker / Azure
-"""
 
-# =========================
-# BACKEND MATPLOTLIB SAFE
-# =========================
-import matplotlib
-matplotlib.use("Agg")
+Les graphiques ne sont pas dessinés ici : le rapport garde les classes
+d'histogramme et app.drift_plots les rend à la demande.
+"""
 
 # =========================
 # IMPORTS
@@ -15,12 +12,27 @@ matplotlib.use("Agg")
 import pandas as pd
 import numpy as np
 from scipy.stats import ks_2samp, chi2_contingency
-import json
 from datetime import datetime
-import matplotlib.pyplot as plt
-import seaborn as sns
 from pathlib import Path
-import os
+
+from app.data_loader import header, read_table, read_table_chunks
+from app.drift_profile import (
+    KS_SUBDIVISIONS, PSI_BINS, ReferenceProfile, load_or_build, population_stability_index
+)
+from app.drift_reports import new_report_id, save_report
+from app.drift_stats import (
+    category_table, chi2_columns, chi2_tables, ks_2samp_columns, ks_asymptotic_pvalue, ks_limit_pvalue
+)
+from app.sketches import DEFAULT_K, KLLSketch, ks_statistic_from_sketch
+
+# Lignes lues à la fois par le mode "streaming"
+DEFAULT_CHUNK_SIZE = 100_000
+DRIFT_MODES = ("full", "streaming")
+# Classes des histogrammes gardés dans le rapport (graphique des distributions)
+HISTOGRAM_BINS = 30
+# Timeline : lignes par fenêtre par défaut, seuil de PSI d'une fenêtre en drift
+DEFAULT_WINDOW_ROWS = 1000
+TIMELINE_PSI_THRESHOLD = 0.25
 
 # =========================
 # PATHS ROBUSTES
@@ -37,11 +49,31 @@ def detect_drift(
     reference_file: str,
     production_file: str,
     threshold: float = 0.05,
-    output_dir: Path | None = None
+    output_dir: Path | None = None,
+    profile_path: Path | None = None,
+    mode: str = "full",
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    sketch_k: int = DEFAULT_K,
+    report_id: str | None = None
 ):
     """
     Détecte le drift entre données de référence et production
+
+    `profile_path` : profil de référence précalculé (app.drift_profile),
+    utilisé s'il correspond au fichier de référence ; sinon les
+    statistiques de référence sont recalculées depuis le CSV.
+
+    `mode` : "full" charge le fichier de production en mémoire ;
+    "streaming" le lit par blocs de `chunk_size` lignes (sketch KLL de
+    paramètre `sketch_k` pour les continues, comptages exacts pour les
+    catégorielles) : mémoire bornée, KS approché (cf. compute_drift_streaming).
+
+    Le rapport `drift_report_<report_id>.json` (identifiant généré si
+    absent) contient les résultats et les histogrammes des features
+    continues, de quoi dessiner les graphiques sans relire les données.
     """
+    if mode not in DRIFT_MODES:
+        raise ValueError(f"Mode de drift inconnu: {mode}")
 
     # -------- Paths sécurisés
     if output_dir is None:
@@ -60,172 +92,512 @@ def detect_drift(
     if not production_file.exists():
         raise FileNotFoundError(f"Fichier de production introuvable: {production_file}")
 
-    # -------- Chargement données
-    ref_data = pd.read_csv(reference_file)
-    prod_data = pd.read_csv(production_file)
+    # -------- Chargement données (la référence vient du profil)
+    profile = load_or_build(reference_file, profile_path)
+    streaming = None
+    prod_weights = {}
+    if mode == "streaming":
+        drift_results, continuous_features, sketches, streaming = compute_drift_streaming(
+            profile, production_file, threshold, chunk_size, sketch_k
+        )
+        prod_values, prod_weights = {}, {}
+        for col in continuous_features:
+            prod_values[col], prod_weights[col] = sketches[col].weighted_items()
+    else:
+        columns = header(production_file)
+        prod_data = read_table(
+            production_file, usecols=[col for col in profile.features if col in columns], float_dtype=np.float64
+        )
+        drift_results, continuous_features = compute_drift(profile, prod_data, threshold)
+        prod_values = {col: prod_data[col].dropna().to_numpy(dtype=np.float64) for col in continuous_features}
 
-    drift_results = {}
-    continuous_features = []
-    categorical_features = []
+    # =========================
+    # RÉSUMÉ
+    # =========================
+    drifted_features = [
+        f for f, r in drift_results.items() if r["drift_detected"]
+    ]
 
-    # -------- Classification des features
-    for col in ref_data.columns:
-        if col == "Exited":
-            continue
-        if col in prod_data.columns:
-            if ref_data[col].dtype in ["int64", "float64"] and ref_data[col].nunique() > 10:
-                continuous_features.append(col)
-            else:
-                categorical_features.append(col)
+    drift_percentage = (
+        len(drifted_features) / len(drift_results) * 100
+        if drift_results
+        else 0
+    )
 
     # =========================
-    # DRIFT CONTINU
+    # SAUVEGARDE RAPPORT JSON
     # =========================
-    for col in continuous_features:
-        ref_values = ref_data[col].dropna()
-        prod_values = prod_data[col].dropna()
+    report_id = report_id or new_report_id()
+    report = {
+        "report_id": report_id,
+        "timestamp": datetime.utcnow().isoformat(),
+        "threshold": threshold,
+        "features_analyzed": len(drift_results),
+        "features_drifted": len(drifted_features),
+        "drift_percentage": drift_percentage,
+        "mode": mode,
+        "results": drift_results,
+        "histograms": {
+            col: histogram_bins(profile.continuous[col]["sorted"], prod_values[col], prod_weights.get(col))
+            for col in continuous_features
+        },
+    }
+    if streaming is not None:
+        report["streaming"] = streaming
+
+    save_report(output_dir, report_id, report)
+
+    return drift_results
+
 
-        statistic, p_value = ks_2samp(ref_values, prod_values)
-        drift_detected = p_value < threshold
+# =========================
+# TESTS STATISTIQUES
+# =========================
+def compute_drift(profile: ReferenceProfile, prod_data: pd.DataFrame, threshold: float = 0.05):
+    """
+    Tests de drift (KS pour les continues, chi² pour les catégorielles),
+    vectorisés sur toutes les features (app.drift_stats) ; seules les
+    données de production sont parcourues.
+
+    Renvoie (résultats par feature, features continues).
+    """
+    drift_results = {}
+    continuous_features = [
+        col for col in profile.features if col in profile.continuous and col in prod_data.columns
+    ]
+    categorical_features = [
+        col for col in profile.features if col in profile.categorical and col in prod_data.columns
+    ]
+
+    # =========================
+    # DRIFT CONTINU (toutes les colonnes en une passe)
+    # =========================
+    statistics, p_values = [], []
+    if continuous_features:
+        statistics, p_values = ks_2samp_columns(
+            [profile.continuous[col]["sorted"] for col in continuous_features],
+            prod_data[continuous_features].to_numpy(dtype=np.float64),
+        )
+    for col, statistic, p_value in zip(continuous_features, statistics, p_values):
+        ref_stats = profile.continuous[col]
+        prod_values = prod_data[col].dropna()
 
         drift_results[col] = {
             "p_value": float(p_value),
             "statistic": float(statistic),
-            "drift_detected": bool(drift_detected),
+            "drift_detected": bool(p_value < threshold),
             "type": "continuous",
-            "ref_mean": float(ref_values.mean()),
+            "ref_mean": ref_stats["mean"],
             "prod_mean": float(prod_values.mean()),
-            "ref_std": float(ref_values.std()),
+            "ref_std": ref_stats["std"],
             "prod_std": float(prod_values.std()),
         }
 
     # =========================
     # DRIFT CATÉGORIEL
     # =========================
+    # Modalités numériques : codage entier + un seul bincount pour toutes les colonnes
+    numeric = [
+        col for col in categorical_features
+        if pd.api.types.is_numeric_dtype(prod_data[col])
+        and _numeric_categories([value for value, _ in profile.categorical[col]])
+    ]
+    vectorized = {}
+    if numeric:
+        chi2, chi2_p_values, valid = chi2_columns(
+            [profile.categorical[col] for col in numeric],
+            prod_data[numeric].to_numpy(),
+        )
+        # Table sans effectif en production : ignorée, comme l'erreur de chi2_contingency
+        vectorized = {
+            col: _chi2_result(stat, p_value, threshold)
+            for col, stat, p_value, ok in zip(numeric, chi2, chi2_p_values, valid) if ok
+        }
+
     for col in categorical_features:
+        if col in numeric:
+            if col in vectorized:
+                drift_results[col] = vectorized[col]
+            continue
         try:
-            ref_counts = ref_data[col].value_counts()
             prod_counts = prod_data[col].value_counts()
+            drift_results[col] = _chi2_test(
+                profile.categorical[col], prod_counts, prod_counts.index, threshold
+            )
+        except Exception:
+            continue
 
-            all_values = set(ref_counts.index) | set(prod_counts.index)
-            ref_aligned = [ref_counts.get(v, 0) for v in all_values]
-            prod_aligned = [prod_counts.get(v, 0) for v in all_values]
+    return drift_results, continuous_features
 
-            contingency_table = np.array([ref_aligned, prod_aligned])
-            chi2, p_value, _, _ = chi2_contingency(contingency_table)
 
-            drift_results[col] = {
-                "p_value": float(p_value),
-                "chi2": float(chi2),
-                "drift_detected": bool(p_value < threshold),
-                "type": "categorical",
-            }
-        except Exception:
-            continue
+def _numeric_categories(*value_lists) -> bool:
+    """Modalités toutes numériques : éligibles au codage entier de app.drift_stats"""
+    return all(isinstance(value, (int, float, np.number)) for values in value_lists for value in values)
 
-    # =========================
-    # RÉSUMÉ
-    # =========================
-    drifted_features = [
-        f for f, r in drift_results.items() if r["drift_detected"]
-    ]
 
-    drift_percentage = (
-        len(drifted_features) / len(drift_results) * 100
-        if drift_results
-        else 0
-    )
+def _chi2_result(chi2, p_value, threshold: float) -> dict:
+    return {
+        "p_value": float(p_value),
+        "chi2": float(chi2),
+        "drift_detected": bool(p_value < threshold),
+        "type": "categorical",
+    }
 
-    # =========================
-    # VISUALISATIONS
-    # =========================
-    create_drift_visualizations(
-        ref_data,
-        prod_data,
-        drift_results,
-        continuous_features,
-        output_dir,
-    )
 
-    # =========================
-    # SAUVEGARDE RAPPORT JSON
-    # =========================
-    report = {
-        "timestamp": datetime.utcnow().isoformat(),
-        "threshold": threshold,
-        "features_analyzed": len(drift_results),
-        "features_drifted": len(drifted_features),
-        "drift_percentage": drift_percentage,
-        "results": drift_results,
+def _chi2_test(ref_pairs, prod_counts, prod_values, threshold: float) -> dict:
+    ref_counts = dict((value, count) for value, count in ref_pairs)
+
+    all_values = set(ref_counts) | set(prod_values)
+    ref_aligned = [ref_counts.get(v, 0) for v in all_values]
+    prod_aligned = [prod_counts.get(v, 0) for v in all_values]
+
+    contingency_table = np.array([ref_aligned, prod_aligned])
+    chi2, p_value, _, _ = chi2_contingency(contingency_table)
+
+    return _chi2_result(chi2, p_value, threshold)
+
+
+def compute_drift_streaming(
+    profile: ReferenceProfile,
+    production_file,
+    threshold: float = 0.05,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    sketch_k: int = DEFAULT_K,
+):
+    """
+    Drift sur un fichier de production lu par blocs (mémoire bornée)
+
+    - continues : sketch KLL (app.sketches) + moments exacts (fusion de
+      Chan). La statistique KS est approchée : |D - D_exact| <= ε avec
+      ε = rank_error(sketch_k) (99 %) ; la p-value (asymptotique, comme
+      ks_2samp au-delà de 10 000 paires) est encadrée par
+      p(D + ε) <= p <= p(D - ε). Sketch non compacté (petit fichier) :
+      résultat identique au mode "full".
+    - catégorielles : comptages exacts, chi² identique au mode "full".
+
+    Renvoie (résultats, features continues, sketches, infos de lecture).
+    """
+    columns = header(production_file)
+    continuous_features = [col for col in profile.features if col in profile.continuous and col in columns]
+    categorical_features = [col for col in profile.features if col in profile.categorical and col in columns]
+
+    sketches = {col: KLLSketch(sketch_k, seed=i) for i, col in enumerate(continuous_features)}
+    moments = {col: (0, 0.0, 0.0) for col in continuous_features}
+    counts = {col: {} for col in categorical_features}
+    rows = chunks = 0
+
+    for chunk in read_table_chunks(production_file, chunk_size, usecols=continuous_features + categorical_features,
+                                   float_dtype=np.float64):
+        rows += len(chunk)
+        chunks += 1
+        for col in continuous_features:
+            values = chunk[col].to_numpy(dtype=np.float64)
+            values = values[~np.isnan(values)]
+            sketches[col].update(values)
+            moments[col] = _merge_moments(moments[col], values)
+        for col in categorical_features:
+            col_counts = counts[col]
+            for value, count in chunk[col].value_counts().items():
+                col_counts[value] = col_counts.get(value, 0) + int(count)
+
+    drift_results = {}
+    for col in continuous_features:
+        ref_stats = profile.continuous[col]
+        sketch = sketches[col]
+        epsilon = sketch.error_bound()
+        n_prod, prod_mean, m2 = moments[col]
+
+        if sketch.is_exact:
+            # Toutes les valeurs sont encore dans le sketch : test exact
+            statistic, p_value = ks_2samp(ref_stats["sorted"], sketch.levels[0])
+            p_bounds = (float(p_value), float(p_value))
+        else:
+            statistic = ks_statistic_from_sketch(ref_stats["sorted"], sketch)
+            p_value = ks_asymptotic_pvalue(statistic, len(ref_stats["sorted"]), n_prod)
+            p_bounds = (
+                ks_asymptotic_pvalue(min(1.0, statistic + epsilon), len(ref_stats["sorted"]), n_prod),
+                ks_asymptotic_pvalue(max(0.0, statistic - epsilon), len(ref_stats["sorted"]), n_prod),
+            )
+
+        drift_results[col] = {
+            "p_value": float(p_value),
+            "statistic": float(statistic),
+            "drift_detected": bool(p_value < threshold),
+            "type": "continuous",
+            "ref_mean": ref_stats["mean"],
+            "prod_mean": float(prod_mean),
+            "ref_std": ref_stats["std"],
+            "prod_std": float(np.sqrt(m2 / (n_prod - 1))) if n_prod > 1 else float("nan"),
+            "statistic_error_bound": epsilon,
+            "p_value_bounds": [float(p_bounds[0]), float(p_bounds[1])],
+            # Décision identique sur tout l'intervalle de la p-value
+            "decision_certain": bool((p_bounds[1] < threshold) or (p_bounds[0] >= threshold)),
+        }
+
+    # Effectifs exacts : mêmes tables (et même chi²) que le mode "full"
+    numeric = [
+        col for col in categorical_features
+        if _numeric_categories([value for value, _ in profile.categorical[col]], counts[col])
+    ]
+    if numeric:
+        chi2, chi2_p_values, valid = chi2_tables(category_table(
+            [profile.categorical[col] for col in numeric],
+            [list(counts[col].items()) for col in numeric],
+        ))
+        for col, stat, p_value, ok in zip(numeric, chi2, chi2_p_values, valid):
+            if ok:
+                drift_results[col] = _chi2_result(stat, p_value, threshold)
+
+    for col in categorical_features:
+        if col in numeric:
+            continue
+        try:
+            drift_results[col] = _chi2_test(profile.categorical[col], counts[col], counts[col], threshold)
+        except Exception:
+            continue
+
+    streaming = {
+        "rows": rows,
+        "chunks": chunks,
+        "chunk_size": chunk_size,
+        "sketch_k": sketch_k,
+        "sketch_items": {col: sketch.size for col, sketch in sketches.items()},
     }
+    return drift_results, continuous_features, sketches, streaming
 
-    report_path = output_dir / f"drift_report_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}.json"
-    with open(report_path, "w", encoding="utf-8") as f:
-        json.dump(report, f, indent=2)
 
-    return drift_results
+def _merge_moments(moments, values: np.ndarray):
+    """Fusion (n, moyenne, M2) d'un bloc, algorithme parallèle de Chan"""
+    n_a, mean_a, m2_a = moments
+    n_b = len(values)
+    if n_b == 0:
+        return moments
+    mean_b = float(values.mean())
+    m2_b = float(((values - mean_b) ** 2).sum())
+    n = n_a + n_b
+    delta = mean_b - mean_a
+    return n, mean_a + delta * n_b / n, m2_a + m2_b + delta ** 2 * n_a * n_b / n
 
 
 # =========================
-# VISUALISATIONS
+# TIMELINE PAR FENÊTRES
 # =========================
-def create_drift_visualizations(
-    ref_data,
-    prod_data,
-    drift_results,
-    continuous_features,
-    output_dir: Path,
-):
+def detect_drift_timeline(
+    reference_file: str,
+    production_file: str,
+    profile_path: Path | None = None,
+    **options
+) -> dict:
+    """Timeline de drift du fichier de production (cf. compute_drift_timeline)"""
+    reference_file = Path(reference_file)
+    production_file = Path(production_file)
+    if not reference_file.exists():
+        raise FileNotFoundError(f"Fichier de référence introuvable: {reference_file}")
+    if not production_file.exists():
+        raise FileNotFoundError(f"Fichier de production introuvable: {production_file}")
+    return compute_drift_timeline(load_or_build(reference_file, profile_path), production_file, **options)
+
+
+def compute_drift_timeline(
+    profile: ReferenceProfile,
+    production_file,
+    window_rows: int | None = DEFAULT_WINDOW_ROWS,
+    time_column: str | None = None,
+    freq: str | None = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    psi_threshold: float = TIMELINE_PSI_THRESHOLD,
+) -> dict:
     """
-    Crée les graphiques de drift
+    PSI et KS par feature et par fenêtre de production, en une seule lecture
+
+    Fenêtres de `window_rows` lignes consécutives, ou, avec `time_column`,
+    par période `freq` (durée fixe pandas : "1h", "1D", "7D"... ; lignes
+    sans horodatage ignorées, fichier non trié accepté). Chaque bloc lu
+    n'ajoute que des effectifs par (fenêtre, classe de référence) :
+
+    - continues : classes aux quantiles de la référence
+      (ReferenceProfile.nested_bin_edges) ; PSI sur les classes de PSI
+      (identique à ReferenceProfile.psi sur la fenêtre), KS évalué aux
+      bornes des sous-classes (minorant de la statistique exacte, écart
+      au plus la masse d'une sous-classe), p-value de la loi limite de
+      Kolmogorov (coût constant par fenêtre) ;
+    - catégorielles numériques : PSI par modalité, pas de KS.
+
+    Matrices features × fenêtres (None si la fenêtre n'a pas de valeur) ;
+    `drift_onset` : première fenêtre dont le PSI atteint `psi_threshold`.
     """
+    if time_column is None and not window_rows:
+        raise ValueError("window_rows ou time_column requis")
+    if time_column is not None and not freq:
+        raise ValueError("freq requis avec time_column")
+    step = pd.Timedelta(freq).value if time_column is not None else None
+
+    columns = header(production_file)
+    continuous_features = [col for col in profile.features if col in profile.continuous and col in columns]
+    categorical_features = [
+        col for col in profile.features
+        if col in profile.categorical and col in columns
+        and _numeric_categories([value for value, _ in profile.categorical[col]])
+    ]
+    n_fine = PSI_BINS * KS_SUBDIVISIONS
+    edges = {col: profile.nested_bin_edges(col) for col in continuous_features}
+
+    # Effectifs par fenêtre (lignes) et par classe (colonnes), agrandis au fil de la lecture
+    window_index = {}
+    window_rows_seen = np.zeros(0, dtype=np.int64)
+    fine_counts = {col: np.zeros((0, n_fine), dtype=np.int64) for col in continuous_features}
+    vocabularies = {col: {float(v): i for i, (v, _) in enumerate(profile.categorical[col])}
+                    for col in categorical_features}
+    category_counts = {col: np.zeros((0, len(vocabularies[col])), dtype=np.int64) for col in categorical_features}
+    rows = chunks = skipped = 0
+
+    usecols = continuous_features + categorical_features + ([time_column] if time_column is not None else [])
+    for chunk in read_table_chunks(production_file, chunk_size, usecols=usecols, float_dtype=np.float64):
+        chunks += 1
+        if time_column is None:
+            labels = (rows + np.arange(len(chunk))) // window_rows
+        else:
+            stamps = pd.to_datetime(chunk[time_column], errors="coerce")
+            valid = stamps.notna().to_numpy()
+            skipped += int((~valid).sum())
+            chunk = chunk[valid]
+            labels = stamps[valid].to_numpy(dtype="datetime64[ns]").astype(np.int64) // step * step
+        rows += len(chunk)
+        if not len(chunk):
+            continue
 
-    # -------- Distributions
-    if continuous_features:
-        n_cols = 3
-        n_rows = (len(continuous_features) + n_cols - 1) // n_cols
-
-        fig, axes = plt.subplots(n_rows, n_cols, figsize=(15, 5 * n_rows))
-        axes = axes.flatten()
-
-        for idx, col in enumerate(continuous_features):
-            ax = axes[idx]
-
-            ax.hist(ref_data[col].dropna(), bins=30, alpha=0.5, density=True, label="Référence")
-            ax.hist(prod_data[col].dropna(), bins=30, alpha=0.5, density=True, label="Production")
-
-            status = "DRIFT" if drift_results[col]["drift_detected"] else "OK"
-            p_val = drift_results[col]["p_value"]
-
-            ax.set_title(f"{col} | {status} (p={p_val:.4f})")
-            ax.legend()
-            ax.grid(alpha=0.3)
-
-        for idx in range(len(continuous_features), len(axes)):
-            axes[idx].set_visible(False)
-
-        plt.tight_layout()
-        plt.savefig(output_dir / "drift_distributions.png", dpi=150)
-        plt.close()
-
-    # -------- Heatmap p-values
-    features = list(drift_results.keys())
-    p_values = [drift_results[f]["p_value"] for f in features]
-
-    fig, ax = plt.subplots(figsize=(10, max(6, len(features) * 0.3)))
-    sns.heatmap(
-        np.array(p_values).reshape(-1, 1),
-        annot=True,
-        fmt=".4f",
-        yticklabels=features,
-        xticklabels=["P-value"],
-        cmap="RdYlGn_r",
-        vmin=0,
-        vmax=0.1,
-        ax=ax,
-    )
+        # Fenêtres du bloc -> indices globaux (nouvelles fenêtres ajoutées)
+        local_labels, local = np.unique(labels, return_inverse=True)
+        for label in local_labels.tolist():
+            window_index.setdefault(label, len(window_index))
+        targets = np.array([window_index[label] for label in local_labels.tolist()])
+        n_local, n_windows = len(local_labels), len(window_index)
+
+        window_rows_seen = _grow(window_rows_seen, n_windows)
+        window_rows_seen[targets] += np.bincount(local, minlength=n_local)
+
+        for col in continuous_features:
+            values = chunk[col].to_numpy(dtype=np.float64)
+            valid = ~np.isnan(values)
+            bins = np.searchsorted(edges[col], values[valid], side="right")
+            counts = np.bincount(local[valid] * n_fine + bins, minlength=n_local * n_fine)
+            fine_counts[col] = _grow(fine_counts[col], n_windows)
+            fine_counts[col][targets] += counts.reshape(n_local, n_fine)
+
+        for col in categorical_features:
+            values = chunk[col].to_numpy(dtype=np.float64)
+            valid = ~np.isnan(values)
+            categories, codes = np.unique(values[valid], return_inverse=True)
+            vocabulary = vocabularies[col]
+            for category in categories.tolist():
+                vocabulary.setdefault(category, len(vocabulary))
+            code_map = np.array([vocabulary[c] for c in categories.tolist()], dtype=np.int64)
+            n_codes = len(vocabulary)
+            counts = np.bincount(local[valid] * n_codes + code_map[codes], minlength=n_local * n_codes)
+            category_counts[col] = _grow(category_counts[col], n_windows, n_codes)
+            category_counts[col][targets] += counts.reshape(n_local, n_codes)
+
+    # Fenêtres dans l'ordre chronologique (ou des lignes)
+    labels = sorted(window_index)
+    order = np.array([window_index[label] for label in labels], dtype=np.int64)
+    window_rows_seen = window_rows_seen[order] if len(order) else window_rows_seen
+
+    psi, ks_statistic, ks_p_value = {}, {}, {}
+    for col in continuous_features:
+        counts = fine_counts[col][order]
+        ref = profile.continuous[col]["sorted"]
+        ref_counts = np.bincount(np.searchsorted(edges[col], ref, side="right"), minlength=n_fine)
+        psi[col] = population_stability_index(_psi_bins(ref_counts), _psi_bins(counts))
+
+        n_prod = counts.sum(axis=1)
+        ref_cdf = np.cumsum(ref_counts)[:-1] / len(ref)
+        prod_cdf = np.cumsum(counts, axis=1)[:, :-1] / np.maximum(n_prod, 1)[:, None]
+        statistic = np.abs(prod_cdf - ref_cdf).max(axis=1, initial=0.0)
+        ks_statistic[col] = np.where(n_prod > 0, statistic, np.nan)
+        ks_p_value[col] = np.where(
+            n_prod > 0, ks_limit_pvalue(statistic, len(ref), np.maximum(n_prod, 1)), np.nan
+        )
+        psi[col] = np.where(n_prod > 0, psi[col], np.nan)
+
+    for col in categorical_features:
+        counts = category_counts[col]
+        counts = _grow(counts, len(window_index), len(vocabularies[col]))[order]
+        ref_counts = np.zeros(counts.shape[1], dtype=np.int64)
+        ref_counts[:len(profile.categorical[col])] = [c for _, c in profile.categorical[col]]
+        psi[col] = np.where(counts.sum(axis=1) > 0, population_stability_index(ref_counts, counts), np.nan)
+
+    features = [col for col in profile.features if col in psi]
+    drifted = {col: np.nan_to_num(psi[col], nan=0.0) >= psi_threshold for col in features}
+    if time_column is None:
+        windows = [
+            {"start_row": label * window_rows, "end_row": label * window_rows + int(n), "rows": int(n)}
+            for label, n in zip(labels, window_rows_seen)
+        ]
+    else:
+        windows = [
+            {
+                "start": pd.Timestamp(label).isoformat(),
+                "end": pd.Timestamp(label + step).isoformat(),
+                "rows": int(n),
+            }
+            for label, n in zip(labels, window_rows_seen)
+        ]
+
+    return {
+        "window": {"rows": window_rows} if time_column is None else {"time_column": time_column, "freq": freq},
+        "windows": windows,
+        "features": features,
+        "psi": [_matrix_row(psi[col]) for col in features],
+        "ks_statistic": [_matrix_row(ks_statistic.get(col)) for col in features],
+        "ks_p_value": [_matrix_row(ks_p_value.get(col)) for col in features],
+        "psi_threshold": psi_threshold,
+        "drift_onset": {
+            col: int(np.argmax(drifted[col])) if drifted[col].any() else None for col in features
+        },
+        "reference_bins": {"psi": PSI_BINS, "ks": n_fine},
+        "rows": rows,
+        "rows_skipped": skipped,
+        "chunks": chunks,
+    }
+
+
+def _psi_bins(fine_counts: np.ndarray) -> np.ndarray:
+    """Effectifs par classe de PSI : somme des sous-classes de chaque classe"""
+    return fine_counts.reshape(*fine_counts.shape[:-1], PSI_BINS, KS_SUBDIVISIONS).sum(axis=-1)
+
+
+def _grow(counts: np.ndarray, n_rows: int, n_cols: int | None = None) -> np.ndarray:
+    """Agrandit un tableau d'effectifs (zéros) jusqu'à `n_rows` lignes et `n_cols` colonnes"""
+    if counts.shape[0] >= n_rows and (n_cols is None or counts.shape[1] >= n_cols):
+        return counts
+    shape = (max(n_rows, counts.shape[0]),) + (() if counts.ndim == 1 else (max(n_cols or 0, counts.shape[1]),))
+    grown = np.zeros(shape, dtype=counts.dtype)
+    grown[tuple(slice(0, n) for n in counts.shape)] = counts
+    return grown
 
-    ax.set_title("Heatmap des p-values (drift en rouge)")
-    plt.tight_layout()
-    plt.savefig(output_dir / "drift_heatmap.png", dpi=150)
-    plt.close()
+
+def _matrix_row(values) -> list | None:
+    """Ligne de matrice JSON : arrondie, NaN -> None ; None pour une mesure sans objet"""
+    if values is None:
+        return None
+    return [None if np.isnan(v) else round(float(v), 6) for v in values]
+
+
+# =========================
+# HISTOGRAMMES DU RAPPORT
+# =========================
+def histogram_bins(ref_values, prod_values, prod_weights=None, bins: int = HISTOGRAM_BINS) -> dict:
+    """
+    Effectifs des deux échantillons sur des classes communes ; `prod_weights` :
+    poids des valeurs de production (éléments d'un sketch)
+    """
+    ref_values = np.asarray(ref_values, dtype=np.float64)
+    prod_values = np.asarray(prod_values, dtype=np.float64)
+    low = min(ref_values.min(), prod_values.min()) if len(prod_values) else ref_values.min()
+    high = max(ref_values.max(), prod_values.max()) if len(prod_values) else ref_values.max()
+    edges = np.histogram_bin_edges(ref_values, bins=bins, range=(low, high))
+    return {
+        "edges": edges.tolist(),
+        "reference": np.histogram(ref_values, edges)[0].tolist(),
+        "production": np.histogram(prod_values, edges, weights=prod_weights)[0].tolist(),
+    }
@@ -0,0 +1,265 @@
+"""
+Historique des contrôles de drift (SQLite embarqué)
+
+Une ligne par contrôle (`runs`) et une par feature et par contrôle
+(`features`), indexées sur le temps et sur (feature, temps) : une série
+temporelle se lit sans parcourir les rapports JSON. Les instants sont en
+millisecondes depuis l'epoch (UTC).
+
+Rétention : les contrôles plus anciens que `max_age_days`, ou au-delà des
+`max_runs` plus récents, sont supprimés avec leur rapport JSON et leurs
+graphiques en cache ; la base est ensuite compactée (auto_vacuum
+incrémental).
+
+Import des rapports existants :
+    python -m app.drift_history drift_reports/ drift_reports/drift_history.db
+"""
+import sqlite3
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import List, Optional
+
+from app.drift_reports import PLOT_KINDS, REPORT_PREFIX, load_report, plot_path
+
+DEFAULT_DB_NAME = "drift_history.db"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    report_id TEXT NOT NULL UNIQUE,
+    ts_ms INTEGER NOT NULL,
+    source TEXT NOT NULL,
+    mode TEXT,
+    threshold REAL,
+    features_analyzed INTEGER,
+    features_drifted INTEGER,
+    drift_percentage REAL,
+    reports_dir TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_runs_ts ON runs (ts_ms);
+
+CREATE TABLE IF NOT EXISTS features (
+    run_id INTEGER NOT NULL REFERENCES runs (id) ON DELETE CASCADE,
+    feature TEXT NOT NULL,
+    ts_ms INTEGER NOT NULL,
+    type TEXT,
+    p_value REAL,
+    statistic REAL,
+    chi2 REAL,
+    psi REAL,
+    drift_detected INTEGER,
+    prod_mean REAL,
+    prod_std REAL,
+    PRIMARY KEY (run_id, feature)
+);
+CREATE INDEX IF NOT EXISTS idx_features_feature_ts ON features (feature, ts_ms);
+"""
+
+# Colonnes de `features` reprises telles quelles du résultat d'une feature
+FEATURE_FIELDS = ("type", "p_value", "statistic", "chi2", "psi", "drift_detected", "prod_mean", "prod_std")
+
+
+def to_ms(value) -> int:
+    """Instant en ms : entier (déjà en ms), datetime ou chaîne ISO 8601 (UTC si sans fuseau)"""
+    if isinstance(value, (int, float)):
+        return int(value)
+    if isinstance(value, str):
+        if value.lstrip("-").isdigit():
+            return int(value)
+        value = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return int(value.timestamp() * 1000)
+
+
+class DriftHistoryStore:
+    """
+    Accès à la base d'historique ; une connexion par opération (utilisable
+    depuis plusieurs threads, et plusieurs workers grâce au mode WAL)
+    """
+
+    def __init__(self, path, max_age_days: float = 0, max_runs: int = 0):
+        self.path = Path(path)
+        self.max_age_days = float(max_age_days)
+        self.max_runs = int(max_runs)
+        self._init_lock = threading.Lock()
+        self._initialized = False
+
+    def _connect(self) -> sqlite3.Connection:
+        if not self._initialized:
+            with self._init_lock:
+                if not self._initialized:
+                    self.path.parent.mkdir(parents=True, exist_ok=True)
+                    conn = sqlite3.connect(self.path, timeout=10)
+                    # auto_vacuum doit être fixé avant la création des tables
+                    conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+                    conn.execute("PRAGMA journal_mode = WAL")
+                    conn.executescript(SCHEMA)
+                    conn.close()
+                    self._initialized = True
+        conn = sqlite3.connect(self.path, timeout=10)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA foreign_keys = ON")
+        return conn
+
+    # =========================
+    # ÉCRITURE
+    # =========================
+    def record(self, report: dict, source: str = "check", reports_dir=None) -> bool:
+        """
+        Enregistre un rapport (`report_id`, `timestamp`, `results`, ...) ;
+        sans effet s'il est déjà présent. Applique ensuite la rétention.
+        """
+        ts_ms = to_ms(report["timestamp"])
+        results = report.get("results") or {}
+        conn = self._connect()
+        try:
+            with conn:
+                cursor = conn.execute(
+                    "INSERT OR IGNORE INTO runs (report_id, ts_ms, source, mode, threshold, features_analyzed,"
+                    " features_drifted, drift_percentage, reports_dir) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        report["report_id"], ts_ms, source, report.get("mode"), report.get("threshold"),
+                        report.get("features_analyzed", len(results)),
+                        report.get("features_drifted", sum(1 for r in results.values() if r.get("drift_detected"))),
+                        report.get("drift_percentage"),
+                        str(reports_dir) if reports_dir is not None else None,
+                    ),
+                )
+                if cursor.rowcount == 0:
+                    return False
+                run_id = cursor.lastrowid
+                conn.executemany(
+                    f"INSERT INTO features (run_id, feature, ts_ms, {', '.join(FEATURE_FIELDS)})"
+                    f" VALUES (?, ?, ?, {', '.join('?' * len(FEATURE_FIELDS))})",
+                    [
+                        (run_id, feature, ts_ms, *(_value(result.get(field)) for field in FEATURE_FIELDS))
+                        for feature, result in results.items()
+                    ],
+                )
+        finally:
+            conn.close()
+        self.apply_retention()
+        return True
+
+    def import_reports(self, reports_dir) -> dict:
+        """Importe les `drift_report_*.json` d'un répertoire (les rapports déjà présents sont ignorés)"""
+        imported = skipped = failed = 0
+        for path in sorted(Path(reports_dir).glob(f"{REPORT_PREFIX}*.json")):
+            report_id = path.stem[len(REPORT_PREFIX):]
+            try:
+                report = load_report(reports_dir, report_id)
+                report.setdefault("report_id", report_id)
+                if self.record(report, source="import", reports_dir=reports_dir):
+                    imported += 1
+                else:
+                    skipped += 1
+            except (OSError, ValueError, KeyError):
+                failed += 1
+        return {"imported": imported, "skipped": skipped, "failed": failed}
+
+    # =========================
+    # RÉTENTION / COMPACTAGE
+    # =========================
+    def apply_retention(self, now_ms: Optional[int] = None) -> int:
+        """Supprime les contrôles hors politique de rétention ; renvoie leur nombre"""
+        if self.max_age_days <= 0 and self.max_runs <= 0:
+            return 0
+        now_ms = int(time.time() * 1000) if now_ms is None else now_ms
+        conditions, params = [], []
+        if self.max_age_days > 0:
+            conditions.append("ts_ms < ?")
+            params.append(now_ms - int(self.max_age_days * 86_400_000))
+        if self.max_runs > 0:
+            conditions.append("id NOT IN (SELECT id FROM runs ORDER BY ts_ms DESC, id DESC LIMIT ?)")
+            params.append(self.max_runs)
+
+        conn = self._connect()
+        try:
+            with conn:
+                expired = conn.execute(
+                    f"SELECT id, report_id, reports_dir FROM runs WHERE {' OR '.join(conditions)}", params
+                ).fetchall()
+                conn.executemany("DELETE FROM runs WHERE id = ?", [(row["id"],) for row in expired])
+            if expired:
+                conn.execute("PRAGMA incremental_vacuum")
+        finally:
+            conn.close()
+
+        for row in expired:
+            if row["reports_dir"]:
+                _delete_report_files(row["reports_dir"], row["report_id"])
+        return len(expired)
+
+    # =========================
+    # LECTURE
+    # =========================
+    def history(self, feature: str, since_ms: Optional[int] = None, until_ms: Optional[int] = None,
+                limit: int = 1000) -> List[dict]:
+        """Série temporelle d'une feature, du plus ancien au plus récent"""
+        query = (
+            "SELECT f.ts_ms, r.report_id, r.source, f.type, f.p_value, f.statistic, f.chi2, f.psi,"
+            " f.drift_detected FROM features f JOIN runs r ON r.id = f.run_id WHERE f.feature = ?"
+        )
+        return self._series(query, [feature], "f.ts_ms", since_ms, until_ms, limit)
+
+    def runs(self, since_ms: Optional[int] = None, until_ms: Optional[int] = None, limit: int = 1000) -> List[dict]:
+        """Série temporelle des contrôles (part de features en drift)"""
+        query = (
+            "SELECT ts_ms, report_id, source, mode, features_analyzed, features_drifted, drift_percentage"
+            " FROM runs WHERE 1 = 1"
+        )
+        return self._series(query, [], "ts_ms", since_ms, until_ms, limit)
+
+    def features(self) -> List[str]:
+        conn = self._connect()
+        try:
+            return [row[0] for row in conn.execute("SELECT DISTINCT feature FROM features ORDER BY feature")]
+        finally:
+            conn.close()
+
+    def _series(self, query: str, params: list, ts_column: str, since_ms, until_ms, limit: int) -> List[dict]:
+        if since_ms is not None:
+            query += f" AND {ts_column} >= ?"
+            params.append(since_ms)
+        if until_ms is not None:
+            query += f" AND {ts_column} <= ?"
+            params.append(until_ms)
+        # Les `limit` points les plus récents, renvoyés dans l'ordre chronologique
+        query = f"SELECT * FROM ({query} ORDER BY {ts_column} DESC LIMIT ?) ORDER BY ts_ms"
+        params.append(limit)
+        conn = self._connect()
+        try:
+            points = [dict(row) for row in conn.execute(query, params)]
+        finally:
+            conn.close()
+        for point in points:
+            if point.get("drift_detected") is not None:
+                point["drift_detected"] = bool(point["drift_detected"])
+        return points
+
+
+def _value(value):
+    return int(value) if isinstance(value, bool) else value
+
+
+def _delete_report_files(reports_dir, report_id: str):
+    paths = [Path(reports_dir) / f"{REPORT_PREFIX}{report_id}.json"]
+    try:
+        paths += [plot_path(reports_dir, report_id, kind) for kind in PLOT_KINDS]
+    except ValueError:
+        pass
+    for path in paths:
+        try:
+            path.unlink()
+        except OSError:
+            pass
+
+
+if __name__ == "__main__":
+    source = sys.argv[1] if len(sys.argv) > 1 else "drift_reports"
+    target = sys.argv[2] if len(sys.argv) > 2 else Path(source) / DEFAULT_DB_NAME
+    print(DriftHistoryStore(target).import_reports(source))
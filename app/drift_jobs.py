@@ -0,0 +1,311 @@
+"""
+Exécution des contrôles de drift en tâche de fond
+
+Chaque job tourne dans son propre processus (pas de contention du GIL avec
+l'inférence), au plus `max_workers` à la fois ; les autres attendent dans
+une file bornée. Un job en attente est annulé sans être lancé, un job en
+cours est annulé en terminant son processus.
+
+Sous Linux les processus sont créés par un serveur "forkserver" qui a déjà
+importé la pile de drift (pandas, scipy) et de graphiques (matplotlib,
+seaborn) : un job
+démarre sans réimporter ces modules, et le processus de l'API ne les
+importe jamais.
+"""
+import multiprocessing
+import queue
+import threading
+import time
+import traceback
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from typing import Callable, Optional
+
+# Modules préchargés par le forkserver
+PRELOAD_MODULES = ["app.drift_detect", "app.drift_plots"]
+
+QUEUED, RUNNING, SUCCEEDED, FAILED, CANCELLED = (
+    "queued", "running", "succeeded", "failed", "cancelled"
+)
+FINISHED = (SUCCEEDED, FAILED, CANCELLED)
+
+
+class JobQueueFull(RuntimeError):
+    """Trop de jobs en attente"""
+
+
+class JobNotFound(KeyError):
+    """Identifiant de job inconnu (ou purgé de l'historique)"""
+
+
+def run_detect_drift(**params):
+    """Cible par défaut, importée dans le processus du job"""
+    from app.drift_detect import detect_drift
+    return detect_drift(**params)
+
+
+def run_drift_timeline(**params):
+    """Timeline PSI / KS par fenêtres (app.drift_detect), dans le processus du job"""
+    from app.drift_detect import detect_drift_timeline
+    return detect_drift_timeline(**params)
+
+
+def run_render_plot(**params):
+    """Rendu d'un graphique de rapport (app.drift_plots), dans le processus du job"""
+    from app.drift_plots import render_report_plot
+    return render_report_plot(**params)
+
+
+def _job_entry(conn, target: Callable, params: dict, data=None):
+    try:
+        result = target(**params) if data is None else target(data, **params)
+        conn.send((SUCCEEDED, result))
+    except BaseException:
+        conn.send((FAILED, traceback.format_exc()))
+    finally:
+        conn.close()
+
+
+def _context(start_method: Optional[str] = None):
+    if start_method is None:
+        start_method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+    ctx = multiprocessing.get_context(start_method)
+    if start_method == "forkserver":
+        ctx.set_forkserver_preload(PRELOAD_MODULES)
+    return ctx
+
+
+class DriftJobRunner:
+    """
+    File de jobs de drift exécutés dans des processus séparés
+
+    `on_complete(job)` est appelé dans le processus de l'API quand un job
+    se termine (logging Application Insights, etc.).
+    """
+
+    def __init__(
+        self,
+        target: Callable = run_detect_drift,
+        max_workers: int = 1,
+        max_queued: int = 20,
+        history: int = 100,
+        on_complete: Optional[Callable[[dict], None]] = None,
+        start_method: Optional[str] = None,
+    ):
+        self.target = target
+        self.max_workers = max(1, int(max_workers))
+        self.max_queued = max(1, int(max_queued))
+        self.history = max(1, int(history))
+        self.on_complete = on_complete
+        self.start_method = start_method
+
+        self._ctx = None
+        self._queue: "queue.Queue[Optional[str]]" = queue.Queue()
+        self._jobs: "OrderedDict[str, dict]" = OrderedDict()
+        self._processes = {}
+        self._payloads = {}
+        self._lock = threading.Lock()
+        self._finished = threading.Condition(self._lock)
+        self._dispatchers = []
+
+    # =========================
+    # CYCLE DE VIE
+    # =========================
+    def start(self):
+        with self._lock:
+            if self._dispatchers:
+                return
+            if self._ctx is None:
+                self._ctx = _context(self.start_method)
+            for i in range(self.max_workers):
+                thread = threading.Thread(target=self._dispatch, name=f"drift-job-{i}", daemon=True)
+                thread.start()
+                self._dispatchers.append(thread)
+
+    def warmup(self):
+        """Démarre le forkserver (et donc l'import de la pile de drift) à l'avance"""
+        if self._ctx is None:
+            self._ctx = _context(self.start_method)
+        if self._ctx.get_start_method() == "forkserver":
+            from multiprocessing import forkserver
+            forkserver.ensure_running()
+
+    def stop(self, timeout: float = 5.0):
+        with self._lock:
+            dispatchers, self._dispatchers = self._dispatchers, []
+            for job in self._jobs.values():
+                if job["status"] == QUEUED:
+                    self._finish(job, CANCELLED, error="Runner stopped")
+            processes = list(self._processes.values())
+        for process in processes:
+            if process.pid is not None:
+                process.terminate()
+        for _ in dispatchers:
+            self._queue.put(None)
+        for thread in dispatchers:
+            thread.join(timeout)
+
+    @property
+    def running(self) -> bool:
+        return bool(self._dispatchers)
+
+    # =========================
+    # JOBS
+    # =========================
+    def submit(self, target: Optional[Callable] = None, data=None, **params) -> dict:
+        """
+        Met un job en file : `target(**params)`, ou `target(data, **params)`
+        si `data` est fourni (tableaux transmis au processus du job mais
+        absents de la vue du job)
+        """
+        with self._lock:
+            queued = sum(1 for job in self._jobs.values() if job["status"] == QUEUED)
+            if queued >= self.max_queued:
+                raise JobQueueFull(f"{queued} jobs already queued")
+            job_id = uuid.uuid4().hex
+            job = {
+                "id": job_id,
+                "kind": (target or self.target).__name__,
+                "status": QUEUED,
+                "params": params,
+                "submitted_at": datetime.utcnow().isoformat(),
+                "started_at": None,
+                "finished_at": None,
+                "duration_s": None,
+                "result": None,
+                "error": None,
+            }
+            self._jobs[job_id] = job
+            self._payloads[job_id] = (target or self.target, data)
+            self._prune()
+        self._queue.put(job_id)
+        return dict(job)
+
+    def get(self, job_id: str) -> dict:
+        with self._lock:
+            if job_id not in self._jobs:
+                raise JobNotFound(job_id)
+            return dict(self._jobs[job_id])
+
+    def wait(self, job_id: str, timeout: Optional[float] = None) -> dict:
+        """Attend la fin d'un job (au plus `timeout` secondes) et renvoie son état"""
+        with self._lock:
+            if job_id not in self._jobs:
+                raise JobNotFound(job_id)
+            job = self._jobs[job_id]
+            self._finished.wait_for(lambda: job["status"] in FINISHED, timeout)
+            return dict(job)
+
+    def jobs(self) -> list:
+        with self._lock:
+            return [
+                {k: v for k, v in job.items() if k != "result"}
+                for job in reversed(self._jobs.values())
+            ]
+
+    def cancel(self, job_id: str) -> dict:
+        """
+        Annule un job en attente ou en cours ; sans effet sur un job terminé
+        """
+        with self._lock:
+            if job_id not in self._jobs:
+                raise JobNotFound(job_id)
+            job = self._jobs[job_id]
+            if job["status"] == QUEUED:
+                self._finish(job, CANCELLED)
+            elif job["status"] == RUNNING:
+                job["cancel_requested"] = True
+                process = self._processes.get(job_id)
+                # Processus pas encore démarré : le dispatcher verra la demande
+                if process is not None and process.pid is not None:
+                    process.terminate()
+            return dict(job)
+
+    def stats(self) -> dict:
+        with self._lock:
+            counts = {}
+            for job in self._jobs.values():
+                counts[job["status"]] = counts.get(job["status"], 0) + 1
+            return {
+                "running": self.running,
+                "max_workers": self.max_workers,
+                "max_queued": self.max_queued,
+                "start_method": self._ctx.get_start_method() if self._ctx else self.start_method,
+                "jobs": counts,
+            }
+
+    # =========================
+    # EXÉCUTION
+    # =========================
+    def _dispatch(self):
+        while True:
+            job_id = self._queue.get()
+            if job_id is None:
+                return
+            with self._lock:
+                job = self._jobs.get(job_id)
+                target, data = self._payloads.pop(job_id, (None, None))
+                if job is None or job["status"] != QUEUED:
+                    continue
+                job["status"] = RUNNING
+                job["started_at"] = datetime.utcnow().isoformat()
+                started = time.perf_counter()
+
+                receiver, sender = self._ctx.Pipe(duplex=False)
+                process = self._ctx.Process(
+                    target=_job_entry,
+                    args=(sender, target, job["params"], data),
+                    name=f"drift-job-{job_id[:8]}",
+                    daemon=True,
+                )
+                self._processes[job_id] = process
+            try:
+                process.start()
+                sender.close()
+                if job.get("cancel_requested"):
+                    process.terminate()
+                # Lecture avant join : un gros résultat bloquerait l'enfant sur le pipe
+                status, payload = receiver.recv()
+            except (EOFError, OSError):
+                status, payload = FAILED, None
+            except Exception as e:
+                # Ex. PicklingError sur les paramètres : le job échoue, le dispatcher continue
+                status, payload = FAILED, f"{type(e).__name__}: {e}"
+            finally:
+                sender.close()
+                receiver.close()
+                if process.pid is not None:
+                    process.join()
+
+            with self._lock:
+                self._processes.pop(job_id, None)
+                if job.get("cancel_requested"):
+                    self._finish(job, CANCELLED, started=started)
+                elif status == SUCCEEDED:
+                    self._finish(job, SUCCEEDED, result=payload, started=started)
+                else:
+                    error = payload or f"Job process exited with code {process.exitcode}"
+                    self._finish(job, FAILED, error=error, started=started)
+                finished = dict(job)
+
+            if self.on_complete is not None:
+                try:
+                    self.on_complete(finished)
+                except Exception:
+                    pass
+
+    def _finish(self, job: dict, status: str, result=None, error=None, started=None):
+        job["status"] = status
+        job["result"] = result
+        job["error"] = error
+        job["finished_at"] = datetime.utcnow().isoformat()
+        if started is not None:
+            job["duration_s"] = round(time.perf_counter() - started, 3)
+        self._finished.notify_all()
+
+    def _prune(self):
+        # Historique borné : on oublie d'abord les jobs terminés les plus anciens
+        excess = len(self._jobs) - self.history
+        for job_id in [j for j, job in self._jobs.items() if job["status"] in FINISHED][:max(0, excess)]:
+            del self._jobs[job_id]
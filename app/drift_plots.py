@@ -0,0 +1,94 @@
+"""
+Graphiques de drift rendus à la demande depuis un rapport sauvegardé
+
+Exécuté dans un processus de drift (app.drift_jobs), jamais dans l'API :
+les distributions sont redessinées à partir des classes d'histogramme du
+rapport (pas des données brutes), la heatmap à partir des p-values.
+Le PNG est écrit dans le cache du rapport (app.drift_reports.plot_path).
+"""
+
+# =========================
+# BACKEND MATPLOTLIB SAFE
+# =========================
+import matplotlib
+matplotlib.use("Agg")
+
+import matplotlib.pyplot as plt
+import numpy as np
+import seaborn as sns
+
+from app.drift_reports import load_report, plot_path
+
+PLOT_DPI = 150
+
+
+def render_report_plot(report_id: str, reports_dir, kind: str = "distributions") -> str:
+    """Dessine un graphique du rapport `report_id` et renvoie le chemin du PNG"""
+    report = load_report(reports_dir, report_id)
+    target = plot_path(reports_dir, report_id, kind)
+    target.parent.mkdir(parents=True, exist_ok=True)
+
+    if kind == "distributions":
+        fig = plot_distributions(report)
+    else:
+        fig = plot_heatmap(report)
+
+    # Écriture atomique : un lecteur ne voit jamais un PNG partiel
+    tmp = target.with_name(target.name + ".tmp")
+    fig.savefig(tmp, dpi=PLOT_DPI, format="png")
+    plt.close(fig)
+    tmp.replace(target)
+    return str(target)
+
+
+def plot_distributions(report: dict):
+    histograms = report.get("histograms")
+    if not histograms:
+        raise ValueError(f"Rapport {report.get('report_id')} sans histogrammes")
+    results = report["results"]
+
+    n_cols = 3
+    n_rows = (len(histograms) + n_cols - 1) // n_cols
+    fig, axes = plt.subplots(n_rows, n_cols, figsize=(15, 5 * n_rows))
+    axes = np.atleast_1d(axes).flatten()
+
+    for ax, (col, bins) in zip(axes, histograms.items()):
+        edges = np.asarray(bins["edges"])
+        for label, key in (("Référence", "reference"), ("Production", "production")):
+            counts = np.asarray(bins[key], dtype=np.float64)
+            density = counts / (counts.sum() * np.diff(edges)) if counts.sum() else counts
+            ax.stairs(density, edges, fill=True, alpha=0.5, label=label)
+
+        status = "DRIFT" if results[col]["drift_detected"] else "OK"
+        ax.set_title(f"{col} | {status} (p={results[col]['p_value']:.4f})")
+        ax.legend()
+        ax.grid(alpha=0.3)
+
+    for ax in axes[len(histograms):]:
+        ax.set_visible(False)
+
+    fig.tight_layout()
+    return fig
+
+
+def plot_heatmap(report: dict):
+    results = report["results"]
+    features = list(results.keys())
+    p_values = [results[f]["p_value"] for f in features]
+
+    fig, ax = plt.subplots(figsize=(10, max(6, len(features) * 0.3)))
+    sns.heatmap(
+        np.array(p_values).reshape(-1, 1),
+        annot=True,
+        fmt=".4f",
+        yticklabels=features,
+        xticklabels=["P-value"],
+        cmap="RdYlGn_r",
+        vmin=0,
+        vmax=0.1,
+        ax=ax,
+    )
+
+    ax.set_title("Heatmap des p-values (drift en rouge)")
+    fig.tight_layout()
+    return fig
@@ -0,0 +1,229 @@
+"""
+Profil de référence pour la détection de drift
+
+Tout ce que `detect_drift` calcule sur les données de référence (typage
+des features, échantillons triés pour KS, comptages par modalité pour le
+chi², moyennes et écarts-types) est calculé une fois et sauvegardé à côté
+du modèle. Un contrôle de drift ne traite alors que les données de
+production.
+
+    python -m app.drift_profile data/bank_churn.csv model/reference_profile.npz
+"""
+import json
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from app.data_loader import read_table
+from app.utils import file_version
+
+TARGET_COLUMN = "Exited"
+
+# Une feature numérique avec plus de modalités que ce seuil est traitée comme continue
+CONTINUOUS_MIN_UNIQUE = 10
+
+PROFILE_FORMAT = 1
+
+# Nombre de classes (quantiles de la référence) pour le PSI des features continues
+PSI_BINS = 10
+# Plancher des proportions dans le PSI (évite log(0) sur une classe vide)
+PSI_EPSILON = 1e-4
+# Subdivisions de chaque classe de PSI pour le KS par classes (timeline de drift)
+KS_SUBDIVISIONS = 10
+
+DEFAULT_PROFILE_PATH = Path(__file__).resolve().parent.parent / "model" / "reference_profile.npz"
+
+
+def is_continuous(series: pd.Series) -> bool:
+    numeric = pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series)
+    return numeric and series.nunique() > CONTINUOUS_MIN_UNIQUE
+
+
+class ReferenceProfile:
+    """
+    Statistiques des données de référence
+
+    - `continuous[col]` : {"sorted": valeurs triées (float64, sans NaN), "mean", "std"}
+    - `categorical[col]` : liste de [modalité, effectif]
+    - `schema` : {colonne: dtype}, dans l'ordre du fichier
+    """
+
+    def __init__(
+        self,
+        schema: Dict[str, str],
+        n_rows: int,
+        continuous: Dict[str, dict],
+        categorical: Dict[str, List[list]],
+        source_version: Optional[str] = None,
+    ):
+        self.schema = schema
+        self.n_rows = n_rows
+        self.continuous = continuous
+        self.categorical = categorical
+        self.source_version = source_version
+
+    # =========================
+    # CONSTRUCTION
+    # =========================
+    @classmethod
+    def from_dataframe(cls, df: pd.DataFrame, source_version: Optional[str] = None) -> "ReferenceProfile":
+        continuous, categorical = {}, {}
+        for col in df.columns:
+            if col == TARGET_COLUMN:
+                continue
+            series = df[col]
+            if is_continuous(series):
+                values = series.dropna()
+                continuous[col] = {
+                    "sorted": np.sort(values.to_numpy(dtype=np.float64)),
+                    "mean": float(values.mean()),
+                    "std": float(values.std()),
+                }
+            else:
+                counts = series.value_counts()
+                categorical[col] = [[v.item() if hasattr(v, "item") else v, int(c)]
+                                    for v, c in counts.items()]
+        return cls(
+            schema={col: str(dtype) for col, dtype in df.dtypes.items()},
+            n_rows=len(df),
+            continuous=continuous,
+            categorical=categorical,
+            source_version=source_version,
+        )
+
+    @classmethod
+    def from_csv(cls, path) -> "ReferenceProfile":
+        return cls.from_dataframe(read_table(path, float_dtype=np.float64), source_version=file_version(str(path)))
+
+    # =========================
+    # ACCÈS
+    # =========================
+    @property
+    def features(self) -> List[str]:
+        return [col for col in self.schema if col in self.continuous or col in self.categorical]
+
+    def bin_edges(self, col: str, n_bins: int = PSI_BINS) -> np.ndarray:
+        """Bornes intérieures des classes de PSI : quantiles de la référence, dédupliqués"""
+        ref = self.continuous[col]["sorted"]
+        return np.unique(np.quantile(ref, np.linspace(0, 1, n_bins + 1)[1:-1]))
+
+    def nested_bin_edges(self, col: str, n_bins: int = PSI_BINS, subdivisions: int = KS_SUBDIVISIONS) -> np.ndarray:
+        """
+        Bornes intérieures (non dédupliquées) de `n_bins * subdivisions`
+        classes aux quantiles de la référence ; une borne sur `subdivisions`
+        est une borne de `bin_edges` : les effectifs par classe de PSI sont
+        des sommes de blocs consécutifs (doublons = classes vides)
+        """
+        ref = self.continuous[col]["sorted"]
+        probs = np.linspace(0, 1, n_bins * subdivisions + 1)
+        probs[::subdivisions] = np.linspace(0, 1, n_bins + 1)
+        return np.quantile(ref, probs[1:-1])
+
+    def psi(self, col: str, values: np.ndarray, n_bins: int = PSI_BINS) -> float:
+        """
+        Population Stability Index de `values` par rapport à la référence
+
+        Continues : classes aux quantiles de la référence ; catégorielles :
+        une classe par modalité (référence ∪ production).
+        """
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        if col in self.continuous:
+            edges = self.bin_edges(col, n_bins)
+            ref = self.continuous[col]["sorted"]
+            ref_counts = np.bincount(np.searchsorted(edges, ref, side="right"), minlength=len(edges) + 1)
+            prod_counts = np.bincount(np.searchsorted(edges, values, side="right"), minlength=len(edges) + 1)
+        else:
+            ref_map = {float(v): c for v, c in self.categorical[col]}
+            categories, prod_observed = np.unique(values, return_counts=True)
+            keys = sorted(set(ref_map) | set(categories.tolist()))
+            observed = dict(zip(categories.tolist(), prod_observed.tolist()))
+            ref_counts = np.array([ref_map.get(k, 0) for k in keys], dtype=np.float64)
+            prod_counts = np.array([observed.get(k, 0) for k in keys], dtype=np.float64)
+        return population_stability_index(ref_counts, prod_counts)
+
+    def matches(self, reference_file) -> bool:
+        """Vrai si le profil a été construit à partir de ce fichier (même contenu)"""
+        return self.source_version is not None and self.source_version == file_version(str(reference_file))
+
+    # =========================
+    # PERSISTANCE
+    # =========================
+    def save(self, path) -> Path:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        meta = {
+            "format": PROFILE_FORMAT,
+            "source_version": self.source_version,
+            "n_rows": self.n_rows,
+            "schema": self.schema,
+            "continuous": {col: {"mean": s["mean"], "std": s["std"]} for col, s in self.continuous.items()},
+            "categorical": self.categorical,
+        }
+        arrays = {f"sorted_{i}": s["sorted"] for i, s in enumerate(self.continuous.values())}
+        tmp = path.with_name(path.name + ".tmp")
+        with open(tmp, "wb") as f:
+            np.savez(f, meta=np.array(json.dumps(meta)), **arrays)
+        tmp.replace(path)
+        return path
+
+    @classmethod
+    def load(cls, path) -> "ReferenceProfile":
+        with np.load(path, allow_pickle=False) as data:
+            meta = json.loads(str(data["meta"]))
+            if meta.get("format") != PROFILE_FORMAT:
+                raise ValueError(f"Format de profil non supporté: {meta.get('format')}")
+            continuous = {
+                col: {"sorted": data[f"sorted_{i}"], **stats}
+                for i, (col, stats) in enumerate(meta["continuous"].items())
+            }
+        return cls(
+            schema=meta["schema"],
+            n_rows=meta["n_rows"],
+            continuous=continuous,
+            categorical=meta["categorical"],
+            source_version=meta["source_version"],
+        )
+
+
+def population_stability_index(ref_counts, prod_counts, epsilon: float = PSI_EPSILON):
+    """
+    PSI = Σ (p - q) · ln(p / q) sur des effectifs par classe ;
+    `prod_counts` en 2-D (une ligne par fenêtre) : un PSI par ligne
+    """
+    ref = np.asarray(ref_counts, dtype=np.float64)
+    prod = np.asarray(prod_counts, dtype=np.float64)
+    totals = prod.sum(axis=-1, keepdims=True)
+    if ref.sum() == 0:
+        return 0.0 if prod.ndim == 1 else np.zeros(len(prod))
+    p = np.maximum(prod / np.where(totals == 0, 1, totals), epsilon)
+    q = np.maximum(ref / ref.sum(), epsilon)
+    psi = np.where(totals[..., 0] == 0, 0.0, np.sum((p - q) * np.log(p / q), axis=-1))
+    return float(psi) if prod.ndim == 1 else psi
+
+
+def psi_level(psi: float) -> str:
+    """Seuils usuels : < 0.1 stable, < 0.25 modéré, au-delà significatif"""
+    return "stable" if psi < 0.1 else "moderate" if psi < 0.25 else "significant"
+
+
+def load_or_build(reference_file, profile_path=None) -> ReferenceProfile:
+    """
+    Profil sauvegardé s'il correspond au fichier de référence, sinon
+    recalculé depuis le CSV (sans être sauvegardé)
+    """
+    if profile_path is not None and Path(profile_path).exists():
+        profile = ReferenceProfile.load(profile_path)
+        if profile.matches(reference_file):
+            return profile
+    return ReferenceProfile.from_csv(reference_file)
+
+
+if __name__ == "__main__":
+    source = sys.argv[1] if len(sys.argv) > 1 else "data/bank_churn.csv"
+    target = sys.argv[2] if len(sys.argv) > 2 else DEFAULT_PROFILE_PATH
+    saved = ReferenceProfile.from_csv(source).save(target)
+    print(f"Profil de référence sauvegardé dans : {saved}")
@@ -0,0 +1,66 @@
+"""
+Rapports de drift sauvegardés : identifiants, chemins et lecture
+
+Module léger (json / pathlib) : importé par l'API sans la pile de drift.
+Un rapport `drift_report_<id>.json` contient les résultats des tests et
+les classes d'histogramme des features continues ; les graphiques sont
+dessinés à la demande à partir de ces données (app.drift_plots) et mis
+en cache dans `plots/<id>_<type>.png`.
+"""
+import json
+import re
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+REPORT_PREFIX = "drift_report_"
+PLOTS_DIR = "plots"
+PLOT_KINDS = ("distributions", "heatmap")
+
+# Identifiants acceptés : ceux générés ci-dessous et les anciens (horodatage seul)
+REPORT_ID_PATTERN = re.compile(r"^[0-9A-Za-z_]{1,64}$")
+
+
+def new_report_id() -> str:
+    """Horodatage (tri chronologique) + suffixe aléatoire (pas de collision dans la seconde)"""
+    return f"{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:6]}"
+
+
+def report_path(reports_dir, report_id: str) -> Path:
+    if not REPORT_ID_PATTERN.match(report_id):
+        raise ValueError(f"Identifiant de rapport invalide: {report_id}")
+    return Path(reports_dir) / f"{REPORT_PREFIX}{report_id}.json"
+
+
+def plot_path(reports_dir, report_id: str, kind: str) -> Path:
+    if kind not in PLOT_KINDS:
+        raise ValueError(f"Type de graphique inconnu: {kind}")
+    return report_path(reports_dir, report_id).parent / PLOTS_DIR / f"{report_id}_{kind}.png"
+
+
+def cached_plot(reports_dir, report_id: str, kind: str) -> Optional[Path]:
+    """PNG déjà rendu et plus récent que le rapport, sinon None"""
+    png = plot_path(reports_dir, report_id, kind)
+    report = report_path(reports_dir, report_id)
+    try:
+        if png.stat().st_mtime >= report.stat().st_mtime:
+            return png
+    except OSError:
+        pass
+    return None
+
+
+def save_report(reports_dir, report_id: str, report: dict) -> Path:
+    path = report_path(reports_dir, report_id)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    tmp.replace(path)
+    return path
+
+
+def load_report(reports_dir, report_id: str) -> dict:
+    with open(report_path(reports_dir, report_id), encoding="utf-8") as f:
+        return json.load(f)
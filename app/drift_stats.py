@@ -0,0 +1,264 @@
+"""
+Tests de drift vectorisés sur toutes les features à la fois
+
+- KS : les colonnes continues de production sont triées en un seul appel
+  (matrice n × c) ; les écarts F_ref - F_prod ne sont évalués qu'en O(m)
+  points par colonne (m = taille de la référence), au lieu des m + n de
+  ks_2samp, tous en une passe sur la matrice empilée.
+- chi² : les colonnes catégorielles sont codées en entiers et comptées
+  par un seul `np.bincount` ; les tables de contingence sont traitées
+  ensemble.
+
+Résultats identiques à `ks_2samp` (statistique et p-value, méthode
+"auto") et à `chi2_contingency` (correction de Yates à 1 ddl), au
+dernier bit près pour KS, à un arrondi près pour le chi² (somme exacte
+fsum, indépendante du codage des modalités).
+"""
+from math import fsum, gcd
+from typing import List, Sequence
+
+import numpy as np
+from scipy.stats import distributions, ks_2samp
+
+try:
+    from scipy.stats._stats_py import _attempt_exact_2kssamp
+except ImportError:  # API privée de scipy : repli sur ks_2samp
+    _attempt_exact_2kssamp = None
+
+# Même seuil que ks_2samp(method="auto") : p-value exacte jusqu'à 10 000 valeurs
+KS_MAX_EXACT_N = 10000
+
+# Amplitude max (max - min + 1) d'une colonne entière codée sans recherche
+MAX_DENSE_CODES = 4096
+
+
+# =========================
+# RECHERCHE SUR MATRICE EMPILÉE
+# =========================
+def searchsorted_columns(sorted_matrix: np.ndarray, lengths: np.ndarray, queries: np.ndarray,
+                         side: str = "left") -> np.ndarray:
+    """
+    `np.searchsorted` colonne par colonne sur une matrice empilée
+
+    `sorted_matrix` (n × c, de préférence en ordre Fortran) : chaque
+    colonne triée sur ses `lengths[j]` premières lignes ; `queries`
+    (q × c) : valeurs cherchées dans la colonne correspondante. Renvoie
+    les indices d'insertion (q × c).
+
+    Une dichotomie vectorisée sur toute la matrice fait un accès mémoire
+    aléatoire par requête et par étape ; `np.searchsorted` sur une colonne
+    contiguë, avec des requêtes triées, reste dans le cache : c appels C
+    sont plus rapides.
+    """
+    found = np.empty(queries.shape, dtype=np.int64)
+    for j in range(queries.shape[1]):
+        found[:, j] = np.searchsorted(sorted_matrix[:lengths[j], j], queries[:, j], side=side)
+    return found
+
+
+# =========================
+# KOLMOGOROV-SMIRNOV
+# =========================
+def ks_2samp_columns(reference: Sequence[np.ndarray], production: np.ndarray):
+    """
+    KS à deux échantillons pour chaque colonne de `production` (n × c,
+    NaN ignorés) contre `reference[j]` (triée, sans NaN)
+
+    F_ref ne change qu'aux valeurs de référence : entre deux valeurs
+    consécutives R_i <= x < R_i+1, F_ref - F_prod est maximal au plus petit
+    point de production et minimal au plus grand. Les extrêmes de ks_2samp
+    sont donc atteints sur O(m) points, trouvés par dichotomie.
+
+    Renvoie (statistiques, p-values), tableaux de taille c.
+    """
+    n_cols = len(reference)
+    # Tri de toutes les colonnes en un appel ; ordre Fortran : colonnes contiguës
+    prod = np.sort(np.asfortranarray(production, dtype=np.float64).reshape(-1, n_cols, order="F"), axis=0)
+    n_prod = np.count_nonzero(~np.isnan(prod), axis=0)
+    n_ref = np.array([len(r) for r in reference], dtype=np.int64)
+    if np.any(n_prod == 0) or np.any(n_ref == 0):
+        raise ValueError("Data passed to ks_2samp must not be empty")
+
+    ref = np.full((n_ref.max(), n_cols), np.nan)
+    for j, values in enumerate(reference):
+        ref[:len(values), j] = values
+    rows = np.arange(len(ref))[:, None]
+    valid = rows < n_ref
+
+    # Fin de groupe d'ex-aequo dans la référence : F_ref y vaut (i + 1) / m
+    following = np.vstack([ref[1:], np.full((1, n_cols), np.nan)])
+    group_end = valid & (ref != following)
+    cdf_ref = (rows + 1) / n_ref
+
+    first_geq = searchsorted_columns(prod, n_prod, ref, "left")
+    # Premier point de production >= R_i+1 (fin de l'intervalle [R_i, R_i+1))
+    next_geq = np.where(rows + 1 < n_ref, np.vstack([first_geq[1:], first_geq[-1:]]), n_prod)
+
+    # Points de référence
+    diff_ref = cdf_ref - searchsorted_columns(prod, n_prod, ref, "right") / n_prod
+    # Points de production dans [R_i, R_i+1)
+    in_interval = group_end & (first_geq < next_geq)
+    smallest = prod[np.minimum(first_geq, len(prod) - 1), np.arange(n_cols)]
+    diff_high = cdf_ref - searchsorted_columns(prod, n_prod, smallest, "right") / n_prod
+    diff_low = cdf_ref - next_geq / n_prod
+
+    # Points de production sous la plus petite valeur de référence (F_ref = 0)
+    below = first_geq[0] > 0
+    below_high = 0.0 - searchsorted_columns(prod, n_prod, prod[:1], "right")[0] / n_prod
+    below_low = 0.0 - first_geq[0] / n_prod
+
+    max_s = np.max(np.vstack([
+        np.where(group_end, diff_ref, -np.inf),
+        np.where(in_interval, diff_high, -np.inf),
+        np.where(below, below_high, -np.inf)[None, :],
+    ]), axis=0)
+    min_s = np.min(np.vstack([
+        np.where(group_end, diff_ref, np.inf),
+        np.where(in_interval, diff_low, np.inf),
+        np.where(below, below_low, np.inf)[None, :],
+    ]), axis=0)
+    min_s = np.clip(-min_s, 0, 1)
+    statistics = np.where(min_s > max_s, min_s, max_s)
+
+    # Même choix de méthode que ks_2samp(method="auto") : exacte pour les petits échantillons
+    exact = np.maximum(n_ref, n_prod) <= KS_MAX_EXACT_N
+    p_values = np.empty(n_cols)
+    p_values[~exact] = ks_asymptotic_pvalue(statistics[~exact], n_ref[~exact], n_prod[~exact])
+    for j in np.flatnonzero(exact):
+        n1, n2 = int(n_ref[j]), int(n_prod[j])
+        if _attempt_exact_2kssamp is None:
+            statistics[j], p_values[j] = ks_2samp(reference[j], prod[:n2, j])
+            continue
+        # La méthode exacte arrondit D sur la grille des k / ppcm(m, n)
+        success, statistics[j], prob = _attempt_exact_2kssamp(
+            n1, n2, gcd(n1, n2), statistics[j], "two-sided"
+        )
+        # Échec du calcul exact : ks_2samp se replie aussi sur l'asymptotique
+        p_values[j] = np.clip(prob, 0, 1) if success else ks_asymptotic_pvalue(statistics[j], n1, n2)
+    return statistics, p_values
+
+
+def ks_asymptotic_pvalue(statistic, n_ref, n_prod):
+    """Distribution de ks_2samp(method="asymp") : kstwo de taille m·n / (m + n)"""
+    m = np.maximum(n_ref, n_prod).astype(np.float64)
+    n = np.minimum(n_ref, n_prod).astype(np.float64)
+    en = m * n / (m + n)
+    return np.clip(distributions.kstwo.sf(statistic, np.round(en)), 0, 1)
+
+
+def ks_limit_pvalue(statistic, n_ref, n_prod):
+    """
+    Loi limite de Kolmogorov (kstwobign) en D·√(m·n / (m + n)) : coût
+    constant quelle que soit la taille, pour des milliers de fenêtres
+    """
+    n_ref = np.asarray(n_ref, dtype=np.float64)
+    n_prod = np.asarray(n_prod, dtype=np.float64)
+    en = n_ref * n_prod / (n_ref + n_prod)
+    return np.clip(distributions.kstwobign.sf(np.asarray(statistic) * np.sqrt(en)), 0, 1)
+
+
+# =========================
+# CHI²
+# =========================
+def chi2_columns(reference: List[list], production: np.ndarray):
+    """
+    chi² d'indépendance (référence vs production) pour chaque colonne de
+    `production` (n × k, NaN ignorés) ; `reference[j]` : liste de
+    [modalité, effectif]
+
+    Renvoie (chi2, p-values, valides) ; une colonne non valide (aucune
+    valeur en production) est celle pour laquelle chi2_contingency lève
+    une erreur (effectif attendu nul).
+    """
+    return chi2_tables(category_counts(reference, production))
+
+
+def chi2_tables(observed: np.ndarray):
+    """
+    chi2_contingency sur k tables (k × 2 × V) traitées ensemble ; les codes
+    vides des deux côtés ne font pas partie de la table
+    """
+    in_table = observed.sum(axis=1) > 0
+    row_sums = observed.sum(axis=2, keepdims=True)
+    col_sums = observed.sum(axis=1, keepdims=True)
+    totals = row_sums.sum(axis=1, keepdims=True)
+    valid = row_sums.min(axis=1)[:, 0] > 0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        expected = row_sums * col_sums / totals
+
+        dof = in_table.sum(axis=1) - 1
+        # Correction de continuité de Yates (tables 2 × 2)
+        diff = expected - observed
+        yates = (dof == 1)[:, None, None]
+        observed = np.where(yates, observed + np.minimum(0.5, np.abs(diff)) * np.sign(diff), observed)
+
+        terms = (observed - expected) ** 2 / expected
+    # Somme exacte (fsum) : même résultat quels que soient le codage et le remplissage
+    chi2 = np.array([
+        fsum(terms[j][:, in_table[j]].ravel()) if dof[j] > 0 else 0.0 for j in range(len(observed))
+    ])
+    p_values = np.where(dof > 0, distributions.chi2.sf(chi2, np.maximum(dof, 1)), 1.0)
+    return chi2, p_values, valid
+
+
+def category_table(reference: List[list], production: List[list]) -> np.ndarray:
+    """Tables (k × 2 × V) à partir d'effectifs déjà comptés : [modalité, effectif] des deux côtés"""
+    n_cols = len(reference)
+    observed = []
+    for side in (reference, production):
+        values = np.array([v for pairs in side for v, _ in pairs], dtype=np.float64)
+        counts = np.array([c for pairs in side for _, c in pairs], dtype=np.float64)
+        cols = np.repeat(np.arange(n_cols), [len(pairs) for pairs in side])
+        observed.append((values, counts, cols))
+    vocabulary = np.unique(np.concatenate([observed[0][0], observed[1][0]]))
+
+    tables = np.zeros((n_cols, 2, len(vocabulary)))
+    for side, (values, counts, cols) in enumerate(observed):
+        np.add.at(tables[:, side], (cols, np.searchsorted(vocabulary, values)), counts)
+    return tables
+
+
+def category_counts(reference: List[list], production: np.ndarray) -> np.ndarray:
+    """
+    Effectifs par modalité, (k × 2 × V) : [colonne, référence | production, code]
+
+    Colonnes entières de faible amplitude : code = valeur - minimum de la
+    colonne, sans recherche. Sinon : codes dans un vocabulaire commun
+    (modalités de référence, plus les nouvelles vues en production).
+    """
+    n_cols = len(reference)
+    prod = np.asarray(production).reshape(-1, n_cols)
+    ref_values = np.array([v for pairs in reference for v, _ in pairs], dtype=np.float64)
+    ref_counts = np.array([c for pairs in reference for _, c in pairs], dtype=np.float64)
+    ref_cols = np.repeat(np.arange(n_cols), [len(pairs) for pairs in reference])
+
+    if prod.dtype.kind in "biu" and len(prod) and np.all(ref_values == np.round(ref_values)):
+        prod = prod.astype(np.int64, copy=False)
+        low = prod.min(axis=0)
+        high = prod.max(axis=0)
+        if len(ref_values):
+            np.minimum.at(low, ref_cols, ref_values.astype(np.int64))
+            np.maximum.at(high, ref_cols, ref_values.astype(np.int64))
+        size = int((high - low).max()) + 1
+        if size <= MAX_DENSE_CODES:
+            observed = np.zeros((n_cols, 2, size))
+            codes = prod - (low - size * np.arange(n_cols))
+            observed[:, 1] = np.bincount(codes.ravel(), minlength=n_cols * size).reshape(n_cols, size)
+            np.add.at(observed[:, 0], (ref_cols, ref_values.astype(np.int64) - low[ref_cols]), ref_counts)
+            return observed
+
+    prod = prod.astype(np.float64, copy=False)
+    present = ~np.isnan(prod)
+    vocabulary = np.unique(ref_values)
+    codes = np.searchsorted(vocabulary, prod)
+    known = vocabulary[np.minimum(codes, len(vocabulary) - 1)] == prod if len(vocabulary) else ~present
+    if np.any(present & ~known):
+        vocabulary = np.union1d(vocabulary, prod[present & ~known])
+        codes = np.searchsorted(vocabulary, prod)
+    size = len(vocabulary)
+
+    observed = np.zeros((n_cols, 2, size))
+    flat = (codes + size * np.arange(n_cols))[present]
+    observed[:, 1] = np.bincount(flat, minlength=n_cols * size).reshape(n_cols, size)
+    np.add.at(observed[:, 0], (ref_cols, np.searchsorted(vocabulary, ref_values)), ref_counts)
+    return observed
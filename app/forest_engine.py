@@ -0,0 +1,249 @@
+"""
+Moteur d'inférence compilé pour RandomForestClassifier
+
+Au chargement, tous les arbres sont aplatis dans des tableaux NumPy
+contigus (feature, seuil, enfants, probabilités des feuilles) ; la forêt
+entière est ensuite évaluée niveau par niveau de façon vectorisée, sans
+la validation ni le dispatch par estimateur de scikit-learn.
+
+Les résultats sont identiques à `RandomForestClassifier.predict_proba` :
+mêmes entrées converties en float32, mêmes probabilités normalisées par
+feuille, et accumulation dans l'ordre des arbres.
+"""
+import json
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+# Marqueur de feuille utilisé par scikit-learn (sklearn.tree._tree.TREE_LEAF)
+TREE_LEAF = -1
+
+# Nombre max de lignes évaluées à la fois (borne la mémoire T x N)
+DEFAULT_BLOCK_SIZE = 512
+
+# Tableaux persistés (un fichier .npy chacun) par `save` / `load`
+ARRAY_FIELDS = ("feature", "threshold", "children", "is_leaf", "leaf_values", "roots")
+
+
+class CompiledForest:
+    """
+    Forêt aplatie : un seul jeu de tableaux pour tous les arbres
+
+    `children[2 * i]` / `children[2 * i + 1]` sont les enfants gauche /
+    droit du nœud i ; une feuille pointe sur elle-même des deux côtés, ce
+    qui permet d'avancer toutes les positions à chaque niveau sans masque.
+    """
+
+    def __init__(
+        self,
+        feature: np.ndarray,
+        threshold: np.ndarray,
+        children: np.ndarray,
+        is_leaf: np.ndarray,
+        leaf_values: np.ndarray,
+        roots: np.ndarray,
+        classes: np.ndarray,
+        n_features: int,
+        max_depth: int,
+        block_size: int = DEFAULT_BLOCK_SIZE,
+    ):
+        self.feature = feature
+        self.threshold = threshold
+        self.children = children
+        self.is_leaf = is_leaf
+        self.leaf_values = leaf_values
+        self.roots = roots
+        self.classes_ = classes
+        self.n_features_in_ = int(n_features)
+        self.max_depth = int(max_depth)
+        self.block_size = int(block_size)
+
+    # =========================
+    # CONSTRUCTION
+    # =========================
+    @classmethod
+    def from_sklearn(cls, forest, block_size: int = DEFAULT_BLOCK_SIZE):
+        """
+        Aplatit un RandomForestClassifier entraîné (sortie unique)
+        """
+        if not hasattr(forest, "estimators_"):
+            raise TypeError("Le modèle doit être un RandomForestClassifier entraîné")
+        if getattr(forest, "n_outputs_", 1) != 1:
+            raise TypeError("Seuls les modèles à une sortie sont supportés")
+
+        n_classes = len(forest.classes_)
+        features, thresholds, children, leaves, values, roots = [], [], [], [], [], []
+        offset = 0
+        max_depth = 0
+
+        for estimator in forest.estimators_:
+            tree = estimator.tree_
+            node_ids = np.arange(tree.node_count, dtype=np.int64) + offset
+            is_leaf = tree.children_left == TREE_LEAF
+
+            # Même normalisation que DecisionTreeClassifier.predict_proba
+            value = tree.value[:, 0, :n_classes].astype(np.float64)
+            normalizer = value.sum(axis=1)[:, np.newaxis]
+            normalizer[normalizer == 0.0] = 1.0
+            value = value / normalizer
+
+            left = np.where(is_leaf, node_ids, tree.children_left + offset)
+            right = np.where(is_leaf, node_ids, tree.children_right + offset)
+
+            features.append(np.where(is_leaf, 0, tree.feature).astype(np.int64))
+            thresholds.append(np.where(is_leaf, np.inf, tree.threshold).astype(np.float64))
+            children.append(np.stack([left, right], axis=1).ravel().astype(np.int64))
+            leaves.append(is_leaf)
+            values.append(value)
+            roots.append(offset)
+            offset += tree.node_count
+            max_depth = max(max_depth, tree.max_depth)
+
+        return cls(
+            feature=np.concatenate(features),
+            threshold=np.concatenate(thresholds),
+            children=np.concatenate(children),
+            is_leaf=np.concatenate(leaves),
+            leaf_values=np.ascontiguousarray(np.concatenate(values)),
+            roots=np.asarray(roots, dtype=np.int64),
+            classes=np.asarray(forest.classes_),
+            n_features=forest.n_features_in_,
+            max_depth=max_depth,
+            block_size=block_size,
+        )
+
+    # =========================
+    # PERSISTANCE (mmap)
+    # =========================
+    def save(self, directory, source_version: str = None) -> Path:
+        """
+        Écrit les tableaux en .npy dans `directory` (créé de façon atomique)
+
+        Si plusieurs workers construisent le même artefact en même temps,
+        le premier renommage gagne et les autres jettent leur copie.
+        """
+        directory = Path(directory)
+        directory.parent.mkdir(parents=True, exist_ok=True)
+        tmp = Path(tempfile.mkdtemp(prefix=f".{directory.name}-", dir=directory.parent))
+        try:
+            for name in ARRAY_FIELDS:
+                np.save(tmp / f"{name}.npy", np.ascontiguousarray(getattr(self, name)))
+            np.save(tmp / "classes.npy", self.classes_)
+            with open(tmp / "meta.json", "w", encoding="utf-8") as f:
+                json.dump({
+                    "n_features": self.n_features_in_,
+                    "max_depth": self.max_depth,
+                    "n_estimators": self.n_estimators,
+                    "source_version": source_version,
+                }, f, indent=2)
+            os.rename(tmp, directory)
+        except OSError:
+            if not (directory / "meta.json").exists():
+                raise
+        finally:
+            shutil.rmtree(tmp, ignore_errors=True)
+        return directory
+
+    @classmethod
+    def load(cls, directory, mmap_mode: str = "r", block_size: int = DEFAULT_BLOCK_SIZE):
+        """
+        Relit un artefact ; avec mmap_mode="r" les tableaux restent des
+        pages du fichier, partagées par tous les processus qui le mappent
+        """
+        directory = Path(directory)
+        with open(directory / "meta.json", encoding="utf-8") as f:
+            meta = json.load(f)
+        arrays = {
+            name: np.load(directory / f"{name}.npy", mmap_mode=mmap_mode)
+            for name in ARRAY_FIELDS
+        }
+        return cls(
+            classes=np.load(directory / "classes.npy", allow_pickle=True),
+            n_features=meta["n_features"],
+            max_depth=meta["max_depth"],
+            block_size=block_size,
+            **arrays,
+        )
+
+    @property
+    def n_estimators(self) -> int:
+        return len(self.roots)
+
+    @property
+    def node_count(self) -> int:
+        return len(self.feature)
+
+    # =========================
+    # INFÉRENCE
+    # =========================
+    def _check_input(self, X) -> np.ndarray:
+        # scikit-learn compare des float32 aux seuils (float64)
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim != 2 or X.shape[1] != self.n_features_in_:
+            raise ValueError(
+                f"X doit avoir la forme (n, {self.n_features_in_}), reçu {X.shape}"
+            )
+        if not np.isfinite(X).all():
+            raise ValueError("X contient des valeurs NaN ou infinies")
+        return np.ascontiguousarray(X)
+
+    def _leaves(self, X: np.ndarray) -> np.ndarray:
+        """
+        Indice de feuille atteint pour chaque (arbre, ligne) : forme (T, N)
+        """
+        n_rows, n_features = X.shape
+        n_trees = self.n_estimators
+
+        nodes = np.repeat(self.roots, n_rows)
+        rows = np.tile(np.arange(n_rows, dtype=np.int64) * n_features, n_trees)
+        flat_X = X.ravel()
+
+        # Niveaux hauts : toutes les positions avancent ensemble ; dès que
+        # moins de la moitié sont encore sur un nœud interne, on ne suit
+        # plus que celles-ci
+        active = None
+        for _ in range(self.max_depth):
+            current = nodes if active is None else nodes[active]
+            offsets = rows if active is None else rows[active]
+            go_right = np.take(flat_X, offsets + np.take(self.feature, current)) > np.take(
+                self.threshold, current
+            )
+            nxt = np.take(self.children, 2 * current + go_right)
+
+            internal = ~np.take(self.is_leaf, nxt)
+            if active is None:
+                nodes = nxt
+                n_internal = np.count_nonzero(internal)
+                if n_internal == 0:
+                    break
+                if n_internal < nodes.size // 2:
+                    active = np.flatnonzero(internal)
+            else:
+                nodes[active] = nxt
+                active = active[internal]
+                if not active.size:
+                    break
+
+        return nodes.reshape(n_trees, n_rows)
+
+    def predict_proba(self, X) -> np.ndarray:
+        X = self._check_input(X)
+        n_rows = X.shape[0]
+        proba = np.zeros((n_rows, len(self.classes_)), dtype=np.float64)
+
+        for start in range(0, n_rows, max(1, self.block_size)):
+            stop = min(start + self.block_size, n_rows)
+            leaves = self._leaves(X[start:stop])
+            block = proba[start:stop]
+            # Accumulation dans l'ordre des arbres, comme scikit-learn
+            for tree_leaves in leaves:
+                block += self.leaf_values[tree_leaves]
+
+        proba /= self.n_estimators
+        return proba
+
+    def predict(self, X) -> np.ndarray:
+        return self.classes_.take(np.argmax(self.predict_proba(X), axis=1), axis=0)
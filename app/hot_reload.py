@@ -0,0 +1,241 @@
+"""
+Rechargement à chaud du modèle
+
+Le nouvel artefact est chargé dans un thread d'arrière-plan, chauffé sur
+un lot synthétique puis vérifié (probabilités valides, parité avec le
+modèle scikit-learn d'origine si le moteur compilé est utilisé) avant
+d'être échangé atomiquement avec le modèle servi. Les requêtes en cours
+terminent sur l'ancien modèle ; en cas d'échec, il reste en place.
+
+Plusieurs workers (gunicorn) : une demande de rechargement est écrite
+dans un fichier partagé (`request_path`) que le watcher de chaque worker
+surveille ; tous chargent alors le même artefact.
+"""
+import json
+import os
+import tempfile
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Optional
+
+import numpy as np
+
+from app.models import FEATURE_CONSTRAINTS
+from app.utils import FEATURE_COLUMNS, predict_churn_proba
+
+# Bornes utilisées pour les features sans maximum dans le schéma
+UNBOUNDED_FEATURE_MAX = 200000.0
+
+# Tolérance de parité moteur compilé / scikit-learn
+PARITY_TOLERANCE = 1e-9
+
+
+def warmup_batch(n_rows: int = 256, seed: int = 0) -> np.ndarray:
+    """
+    Lot synthétique déterministe respectant les contraintes de CustomerFeatures
+    """
+    rng = np.random.RandomState(seed)
+    X = np.empty((n_rows, len(FEATURE_COLUMNS)), dtype=np.float64)
+    for j, name in enumerate(FEATURE_COLUMNS):
+        rules = FEATURE_CONSTRAINTS[name]
+        low = rules["ge"] if rules["ge"] is not None else 0.0
+        high = rules["le"] if rules["le"] is not None else UNBOUNDED_FEATURE_MAX
+        if rules["integer"]:
+            X[:, j] = rng.randint(low, high + 1, n_rows)
+        else:
+            X[:, j] = rng.uniform(low, high, n_rows)
+    return X
+
+
+def smoke_check(candidate, X: np.ndarray, reference=None) -> dict:
+    """
+    Chauffe `candidate` sur X et vérifie ses sorties
+
+    `reference` : modèle scikit-learn source, comparé au candidat quand
+    celui-ci est une version compilée. Lève ValueError si un contrôle échoue.
+    """
+    started = time.perf_counter()
+    probas = predict_churn_proba(candidate, X)
+    warmup_ms = (time.perf_counter() - started) * 1000.0
+
+    if probas.shape != (len(X),):
+        raise ValueError(f"Forme de sortie inattendue: {probas.shape}")
+    if not np.isfinite(probas).all() or probas.min() < 0 or probas.max() > 1:
+        raise ValueError("Probabilités hors de [0, 1] ou non finies")
+
+    report = {"warmup_rows": len(X), "warmup_ms": round(warmup_ms, 3)}
+    if reference is not None and reference is not candidate:
+        diff = float(np.max(np.abs(probas - predict_churn_proba(reference, X))))
+        report["parity_max_abs_diff"] = diff
+        if diff > PARITY_TOLERANCE:
+            raise ValueError(f"Écart de parité {diff:.3g} > {PARITY_TOLERANCE}")
+    return report
+
+
+def _file_signature(path: Optional[str]):
+    if not path:
+        return None
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+class ModelReloader:
+    """
+    Rechargements sérialisés + surveillance optionnelle du fichier modèle
+
+    `load_fn(path)` renvoie (modèle, version, modèle de référence ou None) ;
+    `swap_fn(modèle, version)` publie le modèle validé. `watch_path` :
+    fichier modèle surveillé ; `request_path` : demandes de rechargement
+    partagées entre workers (toutes deux relues toutes les `watch_interval`
+    secondes).
+    """
+
+    def __init__(
+        self,
+        load_fn: Callable,
+        swap_fn: Callable,
+        watch_path: Optional[str] = None,
+        watch_interval: float = 0,
+        warmup_rows: int = 256,
+        request_path: Optional[str] = None,
+    ):
+        self.load_fn = load_fn
+        self.swap_fn = swap_fn
+        self.watch_path = watch_path
+        self.watch_interval = float(watch_interval)
+        self.warmup_rows = warmup_rows
+        self.request_path = request_path
+
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._watcher: Optional[threading.Thread] = None
+        self._worker: Optional[threading.Thread] = None
+        self._last_signature = self._signature()
+        self._last_request = _file_signature(self.request_path)
+        self._status = {"state": "idle", "reloads": 0, "failures": 0}
+
+    # =========================
+    # RECHARGEMENT
+    # =========================
+    def reload(self, path: str, reason: str = "admin", wait: bool = False, broadcast: bool = False) -> bool:
+        """
+        Lance un rechargement ; False si un rechargement est déjà en cours
+
+        `broadcast` : demande publiée aux autres workers (`broadcast()`)
+        seulement une fois le modèle validé et échangé dans ce worker
+        """
+        if not self._lock.acquire(blocking=False):
+            return False
+        self._status.update({
+            "state": "loading",
+            "reason": reason,
+            "path": path,
+            "started_at": datetime.utcnow().isoformat(),
+            "error": None,
+            "broadcast": False,
+        })
+        self._worker = threading.Thread(
+            target=self._reload, args=(path, broadcast), name="model-reload", daemon=True
+        )
+        self._worker.start()
+        if wait:
+            self._worker.join()
+        return True
+
+    def _reload(self, path: str, broadcast: bool = False):
+        try:
+            candidate, version, reference = self.load_fn(path)
+            report = smoke_check(candidate, warmup_batch(self.warmup_rows), reference)
+            self.swap_fn(candidate, version)
+            self._status.update({"state": "succeeded", "version": version, "checks": report})
+            self._status["reloads"] += 1
+            if broadcast:
+                self._status["broadcast"] = self.broadcast(path)
+        except Exception as e:
+            self._status.update({"state": "failed", "error": str(e)})
+            self._status["failures"] += 1
+        finally:
+            self._status["finished_at"] = datetime.utcnow().isoformat()
+            self._lock.release()
+
+    def status(self) -> dict:
+        status = dict(self._status)
+        status["watching"] = self._watcher is not None
+        status["watch_interval"] = self.watch_interval
+        return status
+
+    # =========================
+    # SURVEILLANCE DU FICHIER
+    # =========================
+    def _signature(self):
+        return _file_signature(self.watch_path)
+
+    def broadcast(self, path: str) -> bool:
+        """
+        Publie une demande de rechargement de `path` pour les autres
+        workers (écriture atomique) ; False si `request_path` n'est pas
+        défini ou pas inscriptible
+        """
+        if not self.request_path:
+            return False
+        directory = os.path.dirname(os.path.abspath(self.request_path))
+        try:
+            fd, tmp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        except OSError:
+            return False
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump({"path": path, "requested_at": datetime.utcnow().isoformat(), "pid": os.getpid()}, f)
+            os.replace(tmp, self.request_path)
+        except OSError:
+            os.unlink(tmp)
+            return False
+        # Ce worker recharge lui-même : sa propre demande est déjà traitée
+        self._last_request = _file_signature(self.request_path)
+        return True
+
+    def poll(self):
+        """Un passage du watcher : demande partagée, puis fichier modèle"""
+        request = _file_signature(self.request_path)
+        if request is not None and request != self._last_request:
+            try:
+                with open(self.request_path) as f:
+                    target = json.load(f)["path"]
+            except (OSError, ValueError, KeyError):
+                target = None
+            if target is None or self.reload(target, reason="broadcast"):
+                self._last_request = request
+            return
+
+        signature = self._signature()
+        if signature is None or signature == self._last_signature:
+            return
+        # Fichier en cours d'écriture : on attend qu'il soit stable
+        time.sleep(min(self.watch_interval, 1.0))
+        if self._signature() != signature:
+            return
+        if self.reload(self.watch_path, reason="file_watch"):
+            self._last_signature = signature
+
+    def start_watching(self):
+        if self.watch_interval <= 0 or not (self.watch_path or self.request_path) or self._watcher is not None:
+            return
+        self._stop.clear()
+        self._last_signature = self._signature()
+        self._last_request = _file_signature(self.request_path)
+        self._watcher = threading.Thread(target=self._watch, name="model-watch", daemon=True)
+        self._watcher.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._watcher is not None:
+            self._watcher.join(self.watch_interval + 1)
+            self._watcher = None
+
+    def _watch(self):
+        while not self._stop.wait(self.watch_interval):
+            self.poll()
@@ -0,0 +1,164 @@
+"""
+Drift en ligne sur le trafic réellement scoré par l'API
+
+Les vecteurs de features servis et les probabilités renvoyées sont copiés
+dans une fenêtre circulaire préallouée (mémoire fixe : capacité × 12
+float64, quel que soit le trafic). L'évaluation (KS / chi² / PSI contre
+le profil de référence, sur les N dernières lignes) tourne dans un
+processus de drift (app.drift_jobs) à partir d'un instantané de la
+fenêtre : scipy et pandas ne sont jamais importés par l'API.
+"""
+import random
+import threading
+import time
+from datetime import datetime
+from typing import List, Optional
+
+import numpy as np
+
+
+class LiveWindow:
+    """
+    Fenêtre circulaire des dernières lignes scorées
+
+    `append` copie un lot en au plus deux tranches contiguës ; au-delà de
+    la capacité, les lignes les plus anciennes sont écrasées.
+    """
+
+    def __init__(self, capacity: int, columns: List[str], sample_rate: float = 1.0, seed: Optional[int] = None):
+        self.capacity = max(1, int(capacity))
+        self.columns = list(columns)
+        self.sample_rate = min(1.0, max(0.0, float(sample_rate)))
+
+        self._X = np.zeros((self.capacity, len(self.columns)), dtype=np.float64)
+        self._probas = np.zeros(self.capacity, dtype=np.float64)
+        self._times = np.zeros(self.capacity, dtype=np.float64)
+        self._next = 0
+        self._size = 0
+        self._seen = 0
+        self._kept = 0
+        self._lock = threading.Lock()
+        self._random = random.Random(seed)
+        self._rng = np.random.default_rng(seed)
+
+    @property
+    def enabled(self) -> bool:
+        return self.sample_rate > 0
+
+    # =========================
+    # ÉCRITURE (CHEMIN DE PRÉDICTION)
+    # =========================
+    def append(self, X: np.ndarray, probas: np.ndarray):
+        n = len(X)
+        if n == 0 or not self.enabled:
+            return
+        now = time.time()
+
+        with self._lock:
+            self._seen += n
+            if self.sample_rate < 1.0:
+                if n == 1:
+                    if self._random.random() >= self.sample_rate:
+                        return
+                else:
+                    keep = self._rng.random(n) < self.sample_rate
+                    X, probas = X[keep], probas[keep]
+                    n = len(X)
+                    if n == 0:
+                        return
+            if n > self.capacity:
+                X, probas = X[-self.capacity:], probas[-self.capacity:]
+                n = self.capacity
+
+            start = self._next
+            first = min(n, self.capacity - start)
+            self._X[start:start + first] = X[:first]
+            self._probas[start:start + first] = probas[:first]
+            self._times[start:start + first] = now
+            if first < n:
+                self._X[:n - first] = X[first:]
+                self._probas[:n - first] = probas[first:]
+                self._times[:n - first] = now
+
+            self._next = (start + n) % self.capacity
+            self._size = min(self.capacity, self._size + n)
+            self._kept += n
+
+    # =========================
+    # LECTURE
+    # =========================
+    def snapshot(self, last: Optional[int] = None):
+        """
+        Copie des `last` dernières lignes (toutes par défaut), ordre chronologique :
+        (X, probabilités, timestamps)
+        """
+        with self._lock:
+            n = self._size if not last else min(int(last), self._size)
+            idx = (self._next - n + np.arange(n)) % self.capacity
+            return self._X[idx], self._probas[idx], self._times[idx]
+
+    def stats(self) -> dict:
+        with self._lock:
+            oldest = newest = None
+            if self._size:
+                newest = self._times[(self._next - 1) % self.capacity]
+                oldest = self._times[(self._next - self._size) % self.capacity]
+            return {
+                "enabled": self.enabled,
+                "capacity": self.capacity,
+                "size": self._size,
+                "rows_seen": self._seen,
+                "rows_kept": self._kept,
+                "sample_rate": self.sample_rate,
+                "memory_bytes": self._X.nbytes + self._probas.nbytes + self._times.nbytes,
+                "oldest": datetime.utcfromtimestamp(oldest).isoformat() if oldest else None,
+                "newest": datetime.utcfromtimestamp(newest).isoformat() if newest else None,
+            }
+
+
+# =========================
+# ÉVALUATION (PROCESSUS DE DRIFT)
+# =========================
+def run_live_drift(
+    data,
+    columns: List[str],
+    reference_file: str,
+    profile_path: Optional[str] = None,
+    threshold: float = 0.05,
+    window: Optional[int] = None,
+):
+    """
+    KS / chi² / PSI des lignes servies contre le profil de référence
+
+    `data` : (X, probabilités, timestamps) issu de `LiveWindow.snapshot`.
+    """
+    import pandas as pd
+    from app.drift_detect import compute_drift
+    from app.drift_profile import load_or_build, psi_level
+
+    X, probas, times = data
+    profile = load_or_build(reference_file, profile_path)
+    prod = pd.DataFrame(X, columns=columns)
+
+    results, _ = compute_drift(profile, prod, threshold)
+    for col, result in results.items():
+        psi = profile.psi(col, prod[col].to_numpy())
+        result["psi"] = round(psi, 6)
+        result["psi_level"] = psi_level(psi)
+
+    return {
+        "window": {
+            "rows": int(len(X)),
+            "requested": window,
+            "start": datetime.utcfromtimestamp(times.min()).isoformat() if len(times) else None,
+            "end": datetime.utcfromtimestamp(times.max()).isoformat() if len(times) else None,
+        },
+        "threshold": threshold,
+        "features_analyzed": len(results),
+        "features_drifted": sum(1 for r in results.values() if r["drift_detected"]),
+        "results": results,
+        "predictions": {
+            "mean_probability": float(probas.mean()) if len(probas) else None,
+            "positive_rate": float((probas > 0.5).mean()) if len(probas) else None,
+        },
+    }
@@ -1,19 +1,43 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, Header, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import FileResponse, JSONResponse, Response
 from fastapi.middleware.cors import CORSMiddleware
-from typing import List
+from typing import List, Optional
 import joblib
 import numpy as np
 import logging
 import os
 import json
 import glob
-import traceback
+import hmac
+import threading
+import time
 from pathlib import Path
 
 from opencensus.ext.azure.log_exporter import AzureLogHandler
 
-from app.models import CustomerFeatures, PredictionResponse, HealthResponse
-from app.drift_detect import detect_drift
+from app.models import CustomerFeatures, PredictionResponse, HealthResponse, validate_feature_matrix
+from app.utils import FEATURE_COLUMNS, features_to_matrix, predict_churn_proba, file_version
+from app.cache import PredictionCache, canonical_key
+from app.streaming import (
+    STREAM_MEDIA_TYPES, DuplexStreamingResponse, RowParser,
+    csv_header, detect_format, format_results, iter_lines,
+)
+from app import columnar
+from app.telemetry import build_pipeline
+from app.diagnostics import memory_report
+from app.hot_reload import ModelReloader
+from pydantic import ValidationError
+from app.batching import MicroBatcher
+from app.forest_engine import CompiledForest
+from app.metrics import MetricsMiddleware, MetricsRegistry
+from app.drift_jobs import (
+    DriftJobRunner, JobNotFound, JobQueueFull, SUCCEEDED, FAILED, FINISHED, run_drift_timeline, run_render_plot
+)
+from app.drift_reports import PLOT_KINDS, cached_plot, load_report, new_report_id, report_path
+from app.drift_history import DriftHistoryStore, to_ms
+from app.drift_cache import DriftResultCache
+from app.live_drift import LiveWindow, run_live_drift
 
 # ============================================================
 # LOGGING & APPLICATION INSIGHTS
@@ -41,6 +65,28 @@ else:
     })
 
 
+# Télémétrie des endpoints de prédiction : file + export en arrière-plan
+# (exporteur "logger" = AzureLogHandler si configuré, "file" ou "stdout")
+telemetry = build_pipeline(
+    logger,
+    exporter=os.getenv("TELEMETRY_EXPORTER", "logger").lower(),
+    file_path=os.getenv("TELEMETRY_FILE", "telemetry.jsonl"),
+    max_queue=int(os.getenv("TELEMETRY_QUEUE_SIZE", "10000")),
+    batch_size=int(os.getenv("TELEMETRY_BATCH_SIZE", "500")),
+    flush_interval=float(os.getenv("TELEMETRY_FLUSH_INTERVAL", "5")),
+    sample_rates={"prediction": float(os.getenv("TELEMETRY_PREDICTION_SAMPLE_RATE", "1.0"))},
+)
+
+
+# Métriques Prometheus ; METRICS_MULTIPROC_DIR : répertoire partagé par les
+# workers gunicorn (chaque worker y écrit ses compteurs toutes les
+# METRICS_FLUSH_INTERVAL secondes, /metrics les additionne)
+metrics = MetricsRegistry(
+    multiproc_dir=os.getenv("METRICS_MULTIPROC_DIR"),
+    flush_interval=float(os.getenv("METRICS_FLUSH_INTERVAL", "5")),
+)
+
+
 # ============================================================
 # FASTAPI INIT
 # ============================================================
@@ -58,21 +104,180 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+app.add_middleware(MetricsMiddleware, registry=metrics)
+
 
 
 MODEL_PATH = os.getenv("MODEL_PATH", "model/churn_model.pkl")
+# Moteur d'inférence : "sklearn" (predict_proba natif) ou "compiled" (app.forest_engine)
+INFERENCE_ENGINE = os.getenv("INFERENCE_ENGINE", "sklearn").lower()
+# Répertoire des artefacts mmap du moteur compilé (partagés entre workers)
+MODEL_MMAP_DIR = os.getenv("MODEL_MMAP_DIR")
+# Chargement du modèle à l'import (gunicorn --preload : partagé par fork)
+PRELOAD_MODEL = os.getenv("PRELOAD_MODEL", "false").lower() in ("1", "true", "yes")
+# Taille max d'un bloc passé à predict_proba pour /predict/batch (0 = illimité)
+BATCH_CHUNK_SIZE = int(os.getenv("BATCH_CHUNK_SIZE", "10000"))
+# Nombre de lignes scorées à la fois par /predict/stream
+STREAM_CHUNK_SIZE = int(os.getenv("STREAM_CHUNK_SIZE", "1000"))
+
+# Micro-batching de /predict (opt-in)
+MICROBATCH_ENABLED = os.getenv("MICROBATCH_ENABLED", "false").lower() in ("1", "true", "yes")
+MICROBATCH_MAX_WAIT_MS = float(os.getenv("MICROBATCH_MAX_WAIT_MS", "2"))
+MICROBATCH_MAX_SIZE = int(os.getenv("MICROBATCH_MAX_SIZE", "64"))
+
+# Cache des prédictions (0 = désactivé, TTL 0 = pas d'expiration)
+PREDICTION_CACHE_SIZE = int(os.getenv("PREDICTION_CACHE_SIZE", "10000"))
+PREDICTION_CACHE_TTL = float(os.getenv("PREDICTION_CACHE_TTL", "3600"))
+
+# Démarrage anticipé des processus de drift (import de pandas, scipy,
+# matplotlib, seaborn hors du processus de l'API) ; sinon au premier job
+DRIFT_PREIMPORT = os.getenv("DRIFT_PREIMPORT", "false").lower() in ("1", "true", "yes")
+# Jobs de drift : processus simultanés, jobs en attente max, historique conservé
+DRIFT_JOB_WORKERS = int(os.getenv("DRIFT_JOB_WORKERS", "1"))
+DRIFT_JOB_MAX_QUEUED = int(os.getenv("DRIFT_JOB_MAX_QUEUED", "20"))
+DRIFT_JOB_HISTORY = int(os.getenv("DRIFT_JOB_HISTORY", "100"))
+# Profil de référence précalculé (python -m app.drift_profile), à côté du modèle
+DRIFT_REFERENCE_PROFILE = os.getenv("DRIFT_REFERENCE_PROFILE", "model/reference_profile.npz")
+# /drift/check : mode par défaut ("full" en mémoire, "streaming" par blocs),
+# taille des blocs et précision du sketch KLL du mode streaming
+DRIFT_MODE = os.getenv("DRIFT_MODE", "full").lower()
+DRIFT_CHUNK_SIZE = int(os.getenv("DRIFT_CHUNK_SIZE", "100000"))
+DRIFT_SKETCH_K = int(os.getenv("DRIFT_SKETCH_K", "200"))
+# Rapports de drift (JSON) et cache des graphiques rendus à la demande ;
+# attente max (secondes) du rendu par /drift/reports/{id}/plots avant un 202
+DRIFT_REPORTS_DIR = os.getenv("DRIFT_REPORTS_DIR", "drift_reports")
+DRIFT_PLOT_TIMEOUT = float(os.getenv("DRIFT_PLOT_TIMEOUT", "30"))
+# Historique des contrôles (SQLite) pour /drift/history ; rétention en jours
+# et en nombre de contrôles (0 = illimitée), rapports et graphiques compris
+DRIFT_HISTORY_DB = os.getenv("DRIFT_HISTORY_DB", os.path.join(DRIFT_REPORTS_DIR, "drift_history.db"))
+DRIFT_HISTORY_RETENTION_DAYS = float(os.getenv("DRIFT_HISTORY_RETENTION_DAYS", "0"))
+DRIFT_HISTORY_MAX_RUNS = int(os.getenv("DRIFT_HISTORY_MAX_RUNS", "0"))
+# /drift/timeline : lignes par fenêtre par défaut (sans colonne de temps)
+DRIFT_TIMELINE_WINDOW_ROWS = int(os.getenv("DRIFT_TIMELINE_WINDOW_ROWS", "1000"))
+# Résultats de /drift/check gardés en mémoire (0 = désactivé), par empreinte
+# des fichiers de données et configuration du test
+DRIFT_RESULT_CACHE_SIZE = int(os.getenv("DRIFT_RESULT_CACHE_SIZE", "32"))
+# Drift en ligne : lignes servies gardées en mémoire (fenêtre circulaire),
+# taux d'échantillonnage, minimum de lignes pour évaluer, et évaluation
+# périodique (secondes, 0 = à la demande seulement) sur les N dernières lignes
+LIVE_DRIFT_WINDOW_SIZE = int(os.getenv("LIVE_DRIFT_WINDOW_SIZE", "50000"))
+LIVE_DRIFT_SAMPLE_RATE = float(os.getenv("LIVE_DRIFT_SAMPLE_RATE", "1.0"))
+LIVE_DRIFT_MIN_ROWS = int(os.getenv("LIVE_DRIFT_MIN_ROWS", "500"))
+LIVE_DRIFT_INTERVAL = float(os.getenv("LIVE_DRIFT_INTERVAL", "0"))
+LIVE_DRIFT_EVAL_WINDOW = int(os.getenv("LIVE_DRIFT_EVAL_WINDOW", "0"))
+# Rechargement à chaud : surveillance de MODEL_PATH (secondes, 0 = désactivée)
+MODEL_WATCH_INTERVAL = float(os.getenv("MODEL_WATCH_INTERVAL", "0"))
+# Seul répertoire d'où /admin/model/reload accepte de charger un artefact
+MODEL_DIR = os.getenv("MODEL_DIR", os.path.dirname(os.path.abspath(MODEL_PATH)))
+# Demandes de rechargement partagées entre workers gunicorn, relues toutes
+# les MODEL_RELOAD_POLL_INTERVAL secondes (0 = worker qui reçoit la requête seul)
+MODEL_RELOAD_REQUEST = os.getenv("MODEL_RELOAD_REQUEST", MODEL_PATH + ".reload")
+MODEL_RELOAD_POLL_INTERVAL = float(os.getenv("MODEL_RELOAD_POLL_INTERVAL", "2"))
+# Jeton exigé par les endpoints /admin (en-tête X-Admin-Token) ; sans
+# jeton configuré, ces endpoints sont désactivés (503)
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")
+
+live_window = LiveWindow(LIVE_DRIFT_WINDOW_SIZE, FEATURE_COLUMNS, sample_rate=LIVE_DRIFT_SAMPLE_RATE)
+
 model = None
+# (modèle, version) publiés ensemble par une seule affectation
+_active = (None, None)
+batcher = None
+prediction_cache = PredictionCache(PREDICTION_CACHE_SIZE, PREDICTION_CACHE_TTL)
 
 
-@app.on_event("startup")
-async def load_model():
-    global model
+def compile_model(raw_model):
+    """
+    Remplace le modèle scikit-learn par le moteur compilé si demandé
+    """
+    if INFERENCE_ENGINE != "compiled":
+        return raw_model
+    try:
+        return CompiledForest.from_sklearn(raw_model)
+    except TypeError as e:
+        logger.warning("model_compile_skipped", extra={
+            "custom_dimensions": {
+                "event_type": "model_load",
+                "inference_engine": "sklearn",
+                "reason": str(e)
+            }
+        })
+        return raw_model
+
+
+def read_model(path: str, version: str):
+    """
+    Charge le modèle servi depuis `path`
+
+    Avec le moteur compilé et MODEL_MMAP_DIR, les tableaux de la forêt
+    sont relus en mmap depuis MODEL_MMAP_DIR/<version> (construit au
+    premier chargement) : tous les workers partagent les mêmes pages
+    physiques et le pickle scikit-learn n'est même pas désérialisé.
+    """
+    if INFERENCE_ENGINE == "compiled" and MODEL_MMAP_DIR:
+        artifact = Path(MODEL_MMAP_DIR) / version
+        if not (artifact / "meta.json").exists():
+            compiled = compile_model(joblib.load(path))
+            if not isinstance(compiled, CompiledForest):
+                return compiled
+            compiled.save(artifact, source_version=version)
+        return CompiledForest.load(artifact, mmap_mode="r")
+
+    return compile_model(joblib.load(path))
+
+
+def load_candidate(path: str, with_reference: bool = False):
+    """
+    Charge un modèle sans le publier : (modèle, version, référence)
+
+    La référence est le modèle scikit-learn d'origine quand le modèle servi
+    est compilé, pour le contrôle de parité du rechargement à chaud.
+    """
+    version = file_version(path)
+    candidate = read_model(path, version)
+    reference = None
+    if with_reference and isinstance(candidate, CompiledForest):
+        reference = joblib.load(path)
+    return candidate, version, reference
+
+
+def _swap_model(new_model, version):
+    """
+    Publie atomiquement un nouveau modèle
+
+    `_active` est affecté avant `model` : un lecteur qui lit `model` puis
+    `_active` obtient soit l'ancien couple, soit le nouveau, soit un
+    modèle sans version (traité sans cache) — jamais un modèle étiqueté
+    avec la version d'un autre.
+    """
+    global model, _active
+    _active = (new_model, version)
+    model = new_model
+    prediction_cache.invalidate(version)
+
+
+def current_model():
+    """
+    Modèle servi et sa version (None si le modèle n'a pas été publié par
+    `_swap_model`, par exemple remplacé dans les tests)
+    """
+    current = model
+    active_model, version = _active
+    return current, version if current is active_model else None
+
+
+def _load_model_sync():
     try:
-        model = joblib.load(MODEL_PATH)
+        candidate, version, _ = load_candidate(MODEL_PATH)
+        _swap_model(candidate, version)
         logger.info("model_loaded", extra={
             "custom_dimensions": {
                 "event_type": "model_load",
                 "model_path": MODEL_PATH,
+                "model_version": version,
+                "inference_engine": type(candidate).__name__,
+                "mmap_dir": MODEL_MMAP_DIR,
+                "pid": os.getpid(),
                 "status": "success"
             }
         })
@@ -83,7 +288,142 @@ async def load_model():
                 "error": str(e)
             }
         })
-        model = None
+        _swap_model(None, None)
+
+
+@app.on_event("startup")
+async def load_model():
+    # Déjà chargé par le processus maître (PRELOAD_MODEL + preload_app) :
+    # le worker réutilise les pages héritées du fork
+    if not (PRELOAD_MODEL and model is not None):
+        _load_model_sync()
+    reloader.watch_path = MODEL_PATH if MODEL_WATCH_INTERVAL > 0 else None
+    reloader.start_watching()
+
+
+@app.on_event("shutdown")
+def stop_reloader():
+    reloader.stop()
+
+
+def _reload_candidate(path: str):
+    return load_candidate(path, with_reference=True)
+
+
+def _publish_reload(new_model, version):
+    _swap_model(new_model, version)
+    logger.info("model_reloaded", extra={
+        "custom_dimensions": {
+            "event_type": "model_load",
+            "model_version": version,
+            "inference_engine": type(new_model).__name__,
+            "pid": os.getpid(),
+            "status": "success"
+        }
+    })
+
+
+reloader = ModelReloader(
+    _reload_candidate,
+    _publish_reload,
+    watch_path=MODEL_PATH if MODEL_WATCH_INTERVAL > 0 else None,
+    watch_interval=MODEL_WATCH_INTERVAL or MODEL_RELOAD_POLL_INTERVAL,
+    request_path=MODEL_RELOAD_REQUEST if MODEL_RELOAD_POLL_INTERVAL > 0 else None,
+)
+
+
+if PRELOAD_MODEL:
+    _load_model_sync()
+
+
+def _score_batch(X: np.ndarray, context=None) -> np.ndarray:
+    # Chaque lot est scoré par le modèle lu par ses requêtes
+    with metrics.stage("predict_proba", rows=len(X)):
+        return predict_churn_proba(context if context is not None else model, X)
+
+
+def score_matrix(X: np.ndarray):
+    """
+    Probabilités de churn avec cache : seules les lignes absentes du cache
+    (dédupliquées) sont envoyées au modèle.
+
+    Renvoie (probabilités, version du modèle qui a répondu).
+    """
+    current, version = current_model()
+
+    if version is None or not prediction_cache.enabled:
+        return _predict_rows(current, X), version
+
+    keys = [canonical_key(row) for row in X.tolist()]
+    probas = np.empty(len(keys), dtype=np.float64)
+    missing = {}
+    for i, (key, cached) in enumerate(zip(keys, prediction_cache.get_many(version, keys))):
+        if cached is None:
+            missing.setdefault(key, []).append(i)
+        else:
+            probas[i] = cached
+
+    if missing:
+        unique_keys = list(missing)
+        scored = _predict_rows(current, np.array(unique_keys, dtype=np.float64))
+        prediction_cache.put_many(version, zip(unique_keys, scored.tolist()))
+        for key, proba in zip(unique_keys, scored.tolist()):
+            probas[missing[key]] = proba
+
+    return probas, version
+
+
+def _predict_rows(current, X: np.ndarray) -> np.ndarray:
+    # Une ligne isolée passe par le micro-batcher s'il est actif
+    if len(X) == 1 and batcher is not None and batcher.running:
+        return np.array([batcher.submit(X[0], context=current)], dtype=np.float64)
+    with metrics.stage("predict_proba", rows=len(X)):
+        return predict_churn_proba(current, X, chunk_size=BATCH_CHUNK_SIZE)
+
+
+def record_live(X: np.ndarray, probas: np.ndarray):
+    # Lignes servies -> fenêtre du drift en ligne (coût mesuré dans /metrics)
+    with metrics.stage("live_window", rows=len(X)):
+        live_window.append(X, probas)
+
+
+@app.on_event("startup")
+async def start_telemetry():
+    telemetry.start()
+    metrics.start()
+
+
+@app.on_event("shutdown")
+def stop_telemetry():
+    telemetry.stop()
+    metrics.stop()
+
+
+@app.on_event("startup")
+async def start_batcher():
+    global batcher
+    if MICROBATCH_ENABLED:
+        batcher = MicroBatcher(
+            _score_batch,
+            max_batch_size=MICROBATCH_MAX_SIZE,
+            max_wait_ms=MICROBATCH_MAX_WAIT_MS,
+        )
+        batcher.start()
+        logger.info("microbatcher_started", extra={
+            "custom_dimensions": {
+                "event_type": "microbatcher",
+                "max_batch_size": MICROBATCH_MAX_SIZE,
+                "max_wait_ms": MICROBATCH_MAX_WAIT_MS
+            }
+        })
+
+
+@app.on_event("shutdown")
+def stop_batcher():
+    global batcher
+    if batcher is not None:
+        batcher.stop()
+        batcher = None
 
 
 # ============================================================
@@ -113,105 +453,346 @@ def health():
 
 @app.post("/predict", response_model=PredictionResponse)
 def predict(features: CustomerFeatures):
+    metrics.stage_since_request("validation", rows=1)
 
     if model is None:
         raise HTTPException(status_code=503, detail="Model unavailable")
 
     try:
-        input_data = np.array([[  
-            features.CreditScore,
-            features.Age,
-            features.Tenure,
-            features.Balance,
-            features.NumOfProducts,
-            features.HasCrCard,
-            features.IsActiveMember,
-            features.EstimatedSalary,
-            features.Geography_Germany,
-            features.Geography_Spain
-        ]])
-
-        proba = float(model.predict_proba(input_data)[0][1])
+        with metrics.stage("matrix", rows=1):
+            input_data = features_to_matrix([features])
+        probas, version = score_matrix(input_data)
+        record_live(input_data, probas)
+        proba = float(probas[0])
         prediction = int(proba > 0.5)
 
         risk = "Low" if proba < 0.3 else "Medium" if proba < 0.7 else "High"
 
-        logger.info("prediction", extra={
-            "custom_dimensions": {
+        with metrics.stage("logging"):
+            telemetry.emit("prediction", {
                 "event_type": "prediction",
                 "endpoint": "/predict",
                 "probability": proba,
                 "prediction": prediction,
                 "risk_level": risk
-            }
-        })
+            })
 
         return {
             "churn_probability": round(proba, 4),
             "prediction": prediction,
-            "risk_level": risk
+            "risk_level": risk,
+            "model_version": version
         }
 
     except Exception as e:
-        logger.error("prediction_error", extra={
-            "custom_dimensions": {
-                "event_type": "prediction_error",
-                "error": str(e)
-            }
-        })
+        telemetry.emit("prediction_error", {
+            "event_type": "prediction_error",
+            "error": str(e)
+        }, level=logging.ERROR)
         raise HTTPException(status_code=500, detail=str(e))
 @app.post("/predict/batch")
 def predict_batch(features_list: List[CustomerFeatures]):
+    metrics.stage_since_request("validation", rows=len(features_list))
 
     if model is None:
         raise HTTPException(status_code=503, detail="Model unavailable")
 
     try:
-        predictions = []
-
-        for features in features_list:
-            input_data = np.array([[  
-                features.CreditScore,
-                features.Age,
-                features.Tenure,
-                features.Balance,
-                features.NumOfProducts,
-                features.HasCrCard,
-                features.IsActiveMember,
-                features.EstimatedSalary,
-                features.Geography_Germany,
-                features.Geography_Spain
-            ]])
-
-            proba = float(model.predict_proba(input_data)[0][1])
-            prediction = int(proba > 0.5)
-
-            predictions.append({
+        # Une seule matrice pour tout le lot, scorée en un appel (par blocs)
+        with metrics.stage("matrix", rows=len(features_list)):
+            X = features_to_matrix(features_list)
+        probas, version = score_matrix(X)
+        record_live(X, probas)
+
+        predictions = [
+            {
                 "churn_probability": round(proba, 4),
-                "prediction": prediction
-            })
+                "prediction": int(proba > 0.5)
+            }
+            for proba in probas.tolist()
+        ]
 
-        logger.info("batch_prediction", extra={
-            "custom_dimensions": {
+        with metrics.stage("logging"):
+            telemetry.count_predictions(probas)
+            telemetry.emit("batch_prediction", {
                 "event_type": "batch_prediction",
                 "count": len(predictions)
-            }
-        })
+            })
 
         return {
             "predictions": predictions,
-            "count": len(predictions)
+            "count": len(predictions),
+            "model_version": version
         }
 
     except Exception as e:
-        logger.error("batch_prediction_error", extra={
-            "custom_dimensions": {
-                "event_type": "batch_prediction_error",
-                "error": str(e)
-            }
+        telemetry.emit("batch_prediction_error", {
+            "event_type": "batch_prediction_error",
+            "error": str(e)
+        }, level=logging.ERROR)
+        raise HTTPException(status_code=500, detail=str(e))
+
+def _row_error(error: Exception) -> str:
+    if isinstance(error, ValidationError):
+        return "; ".join(
+            f"{'.'.join(str(loc) for loc in err['loc'])}: {err['msg']}"
+            for err in error.errors()
+        )
+    return str(error)
+
+
+@app.post("/predict/stream")
+async def predict_stream(
+    request: Request,
+    stream_format: Optional[str] = Query(None, alias="format")
+):
+    """
+    Scoring en flux : corps NDJSON ou CSV lu par morceaux, résultats
+    renvoyés au fil de l'eau par blocs de STREAM_CHUNK_SIZE lignes.
+
+    Chaque résultat porte l'indice `row` de la ligne d'entrée ; une ligne
+    invalide, ou un bloc dont le scoring échoue, produit des résultats
+    avec `error` sans interrompre le flux.
+    """
+    if model is None:
+        raise HTTPException(status_code=503, detail="Model unavailable")
+
+    try:
+        fmt = detect_format(request.headers.get("content-type"), stream_format)
+    except ValueError as e:
+        raise HTTPException(status_code=415, detail=str(e))
+
+    async def generate():
+        parser = RowParser(fmt)
+        rows, row_ids = [], []
+        index = 0
+        scored = 0
+        errors = 0
+
+        async def flush():
+            nonlocal scored, errors
+            try:
+                with metrics.stage("matrix", rows=len(rows)):
+                    X = features_to_matrix(rows)
+                probas, version = await run_in_threadpool(score_matrix, X)
+                record_live(X, probas)
+                with metrics.stage("logging"):
+                    telemetry.count_predictions(probas)
+                results = [
+                    {
+                        "row": row_id,
+                        "churn_probability": round(proba, 4),
+                        "prediction": int(proba > 0.5),
+                        "model_version": version,
+                    }
+                    for row_id, proba in zip(row_ids, probas.tolist())
+                ]
+                scored += len(results)
+            except Exception as e:
+                # Échec du bloc : une erreur par ligne, le flux continue (200 déjà envoyé)
+                telemetry.emit("stream_prediction_error", {
+                    "event_type": "stream_prediction_error",
+                    "format": fmt,
+                    "rows": len(row_ids),
+                    "first_row": row_ids[0],
+                    "error": str(e)
+                }, level=logging.ERROR)
+                results = [{"row": row_id, "error": f"Scoring failed: {e}"} for row_id in row_ids]
+                errors += len(results)
+            finally:
+                rows.clear()
+                row_ids.clear()
+            return format_results(fmt, results)
+
+        if fmt == "csv":
+            yield csv_header()
+
+        async for line in iter_lines(request.stream()):
+            if not line.strip():
+                continue
+            try:
+                with metrics.stage("validation", rows=1):
+                    record = parser.parse(line)
+                    features = CustomerFeatures(**record) if record is not None else None
+                if features is None:
+                    continue
+                rows.append(features)
+                row_ids.append(index)
+            except ValueError as e:
+                errors += 1
+                yield format_results(fmt, [{"row": index, "error": _row_error(e)}])
+            index += 1
+
+            if len(rows) >= STREAM_CHUNK_SIZE:
+                yield await flush()
+
+        if rows:
+            yield await flush()
+
+        telemetry.emit("stream_prediction", {
+            "event_type": "stream_prediction",
+            "format": fmt,
+            "count": scored,
+            "errors": errors
         })
+
+    return DuplexStreamingResponse(generate(), media_type=STREAM_MEDIA_TYPES[fmt])
+
+
+@app.post("/predict/columnar")
+async def predict_columnar(request: Request):
+    """
+    Scoring serveur-à-serveur sans JSON ni objets Pydantic par ligne.
+
+    Corps : flux Arrow IPC (`application/vnd.apache.arrow.stream`) ou
+    buffer float64 little-endian (`application/octet-stream`, ordre des
+    colonnes dans `X-Columns`, disposition `row`/`column` dans `X-Layout`).
+    Réponse dans le même format : table Arrow (churn_probability,
+    prediction) ou buffer float64 des probabilités.
+    """
+    if model is None:
+        raise HTTPException(status_code=503, detail="Model unavailable")
+
+    body = await request.body()
+    decode_started = time.perf_counter()
+    try:
+        X, media_type = columnar.decode(
+            body,
+            request.headers.get("content-type"),
+            request.headers.get("x-columns"),
+            request.headers.get("x-layout"),
+        )
+    except columnar.UnsupportedFormatError as e:
+        raise HTTPException(status_code=415, detail=str(e))
+    except columnar.ColumnarFormatError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    metrics.observe_stage("matrix", time.perf_counter() - decode_started, rows=len(X))
+
+    with metrics.stage("validation", rows=len(X)):
+        errors = validate_feature_matrix(X, columnar.FEATURE_COLUMNS)
+    if errors:
+        raise HTTPException(status_code=422, detail=errors)
+
+    current, version = current_model()
+    try:
+        probas = await run_in_threadpool(_predict_rows, current, X)
+    except Exception as e:
+        telemetry.emit("columnar_prediction_error", {
+            "event_type": "columnar_prediction_error",
+            "error": str(e)
+        }, level=logging.ERROR)
         raise HTTPException(status_code=500, detail=str(e))
 
+    record_live(X, probas)
+    with metrics.stage("logging"):
+        telemetry.count_predictions(probas)
+        telemetry.emit("columnar_prediction", {
+            "event_type": "columnar_prediction",
+            "format": media_type,
+            "count": len(probas)
+        })
+
+    return Response(
+        content=columnar.encode(probas, media_type),
+        media_type=media_type,
+        headers={"X-Rows": str(len(probas)), "X-Model-Version": version or ""},
+    )
+
+
+@app.get("/predict/batcher", tags=["Monitoring"])
+def batcher_stats():
+    """Profondeur de file, histogramme des tailles de lot et attente ajoutée"""
+    if batcher is None:
+        return {"enabled": False}
+    return batcher.stats()
+
+
+# ============================================================
+# ADMIN : RECHARGEMENT DU MODÈLE
+# ============================================================
+
+def _check_admin(token: Optional[str]):
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=503, detail="Admin endpoints are disabled (ADMIN_TOKEN not set)")
+    if token is None or not hmac.compare_digest(token.encode(), ADMIN_TOKEN.encode()):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
+
+def _model_file(path: Optional[str]) -> str:
+    """Artefact à charger : MODEL_PATH, ou un fichier de MODEL_DIR (joblib.load exécute du pickle)"""
+    if not path:
+        return MODEL_PATH
+    resolved = Path(path).resolve()
+    if not resolved.is_relative_to(Path(MODEL_DIR).resolve()):
+        raise HTTPException(status_code=403, detail=f"Model path must be inside {MODEL_DIR}")
+    return str(resolved)
+
+
+@app.get("/admin/model", tags=["Admin"])
+def model_status(x_admin_token: Optional[str] = Header(None)):
+    """Version servie et état du dernier rechargement"""
+    _check_admin(x_admin_token)
+    current, version = current_model()
+    return {
+        "model_path": MODEL_PATH,
+        "model_version": version,
+        "inference_engine": type(current).__name__ if current is not None else None,
+        "reload": reloader.status(),
+    }
+
+
+@app.post("/admin/model/reload", status_code=202, tags=["Admin"])
+def reload_model(
+    path: Optional[str] = None,
+    wait: bool = False,
+    x_admin_token: Optional[str] = Header(None)
+):
+    """
+    Charge `path` (MODEL_PATH par défaut, sinon un fichier de MODEL_DIR)
+    en arrière-plan, le chauffe, vérifie ses sorties puis l'échange avec
+    le modèle servi ; les autres workers suivent via la demande partagée,
+    publiée seulement si ce worker a validé le candidat (422 sinon, avec
+    `wait`)
+    """
+    _check_admin(x_admin_token)
+    target = _model_file(path)
+    if not os.path.exists(target):
+        raise HTTPException(status_code=404, detail=f"Model file not found: {target}")
+    if not reloader.reload(target, reason="admin", wait=wait, broadcast=True):
+        raise HTTPException(status_code=409, detail="A reload is already in progress")
+    status = reloader.status()
+    if status["state"] == "failed":
+        # Candidat refusé : modèle servi inchangé, rien n'est propagé aux autres workers
+        raise HTTPException(status_code=422, detail=status["error"])
+    return status
+
+
+@app.get("/diagnostics/memory", tags=["Monitoring"])
+def diagnostics_memory():
+    """RSS / PSS et pages partagées vs privées de chaque worker"""
+    report = memory_report()
+    report["inference_engine"] = type(model).__name__ if model is not None else None
+    report["model_mmap"] = isinstance(getattr(model, "feature", None), np.memmap)
+    return report
+
+
+@app.get("/telemetry", tags=["Monitoring"])
+def telemetry_stats():
+    """File, échantillonnage et pertes du pipeline de télémétrie"""
+    return telemetry.stats()
+
+
+@app.get("/metrics", tags=["Monitoring"])
+def prometheus_metrics():
+    """Compteurs et histogrammes de latence (format texte Prometheus)"""
+    return Response(content=metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+@app.get("/predict/cache", tags=["Monitoring"])
+def cache_stats():
+    """Taille, hits / misses / évictions du cache de prédictions"""
+    return prediction_cache.stats()
+
 # ============================================================
 # DRIFT LOGGING TO APPLICATION INSIGHTS
 # ============================================================
@@ -253,33 +834,426 @@ def log_drift_to_insights(drift_results: dict):
 # DRIFT ENDPOINTS
 # ============================================================
 
-@app.post("/drift/check")
-def check_drift(threshold: float = 0.05):
+# La pile de drift / visualisation n'est jamais importée par l'API : chaque
+# contrôle tourne dans un processus séparé (app.drift_jobs), sans bloquer
+# un thread de requête ni disputer le GIL à l'inférence.
 
-    try:
-        results = detect_drift(
-            reference_file="data/bank_churn.csv",
-            production_file="data/production_data.csv",
-            threshold=threshold
-        )
+drift_history = DriftHistoryStore(
+    DRIFT_HISTORY_DB,
+    max_age_days=DRIFT_HISTORY_RETENTION_DAYS,
+    max_runs=DRIFT_HISTORY_MAX_RUNS,
+)
 
-        log_drift_to_insights(results)
 
-        return {
-            "status": "success",
-            "features_analyzed": len(results),
-            "features_drifted": sum(1 for r in results.values() if r["drift_detected"])
+def _record_drift_history(job: dict):
+    """Ajoute le contrôle terminé à l'historique (rapport JSON, ou résultat du drift en ligne)"""
+    if job["kind"] == run_live_drift.__name__:
+        report = {
+            **job["result"],
+            "report_id": f"live_{job['id']}",
+            "timestamp": job["finished_at"],
+            "mode": "live",
         }
+        drift_history.record(report, source="live")
+    else:
+        report_id = job["params"]["report_id"]
+        reports_dir = job["params"]["output_dir"]
+        drift_history.record(load_report(reports_dir, report_id), source="check", reports_dir=reports_dir)
+
+
+drift_result_cache = DriftResultCache(DRIFT_RESULT_CACHE_SIZE)
+# Contrôles en cours : clé -> job, et job -> clé (un seul calcul par clé)
+_drift_inflight = {}
+_drift_inflight_keys = {}
+_drift_inflight_lock = threading.Lock()
 
-    except Exception:
-        tb = traceback.format_exc()
+
+def _on_drift_job_complete(job: dict):
+    with _drift_inflight_lock:
+        cache_key = _drift_inflight_keys.pop(job["id"], None)
+        if cache_key is not None:
+            _drift_inflight.pop(cache_key, None)
+            if job["status"] == SUCCEEDED:
+                drift_result_cache.put(cache_key, _job_view(job))
+
+    if job["status"] == SUCCEEDED and job["kind"] == run_drift_timeline.__name__:
+        # Timeline : pas de résultat global à journaliser ni à historiser
+        pass
+    elif job["status"] == SUCCEEDED:
+        result = job["result"]
+        log_drift_to_insights(result["results"] if job["kind"] == run_live_drift.__name__ else result)
+        try:
+            _record_drift_history(job)
+        except Exception as e:
+            logger.error("drift_history_error", extra={
+                "custom_dimensions": {
+                    "event_type": "drift_history_error",
+                    "job_id": job["id"],
+                    "error": str(e)
+                }
+            })
+    elif job["status"] == FAILED:
         logger.error("drift_error", extra={
             "custom_dimensions": {
                 "event_type": "drift_error",
-                "traceback": tb
+                "job_id": job["id"],
+                "traceback": job["error"]
             }
         })
-        raise HTTPException(status_code=500, detail="Drift check failed")
+
+
+drift_runner = DriftJobRunner(
+    max_workers=DRIFT_JOB_WORKERS,
+    max_queued=DRIFT_JOB_MAX_QUEUED,
+    history=DRIFT_JOB_HISTORY,
+    on_complete=_on_drift_job_complete,
+)
+
+# Rendu des graphiques : file séparée (un contrôle long ne la bloque pas),
+# matplotlib ne tourne que dans ses processus
+plot_runner = DriftJobRunner(
+    target=run_render_plot,
+    max_workers=1,
+    max_queued=DRIFT_JOB_MAX_QUEUED,
+    history=DRIFT_JOB_HISTORY,
+)
+# (rapport, type) -> job de rendu en cours : une seule exécution par graphique
+_plot_jobs = {}
+_plot_jobs_lock = threading.Lock()
+
+
+def submit_live_drift(window: Optional[int] = None, threshold: float = 0.05) -> dict:
+    """Soumet l'évaluation des `window` dernières lignes servies (toutes par défaut)"""
+    data = live_window.snapshot(window)
+    if len(data[0]) < LIVE_DRIFT_MIN_ROWS:
+        raise ValueError(f"{len(data[0])} live rows, at least {LIVE_DRIFT_MIN_ROWS} required")
+    return drift_runner.submit(
+        target=run_live_drift,
+        data=data,
+        columns=FEATURE_COLUMNS,
+        reference_file="data/bank_churn.csv",
+        profile_path=DRIFT_REFERENCE_PROFILE,
+        threshold=threshold,
+        window=window
+    )
+
+
+_live_drift_stop = threading.Event()
+
+
+def _live_drift_loop():
+    while not _live_drift_stop.wait(LIVE_DRIFT_INTERVAL):
+        try:
+            submit_live_drift(LIVE_DRIFT_EVAL_WINDOW or None)
+        except (ValueError, JobQueueFull):
+            continue
+
+
+@app.on_event("startup")
+def start_drift_runner():
+    drift_runner.start()
+    plot_runner.start()
+    if DRIFT_PREIMPORT:
+        threading.Thread(target=drift_runner.warmup, name="drift-preimport", daemon=True).start()
+    if LIVE_DRIFT_INTERVAL > 0:
+        _live_drift_stop.clear()
+        threading.Thread(target=_live_drift_loop, name="live-drift", daemon=True).start()
+
+
+@app.on_event("shutdown")
+def stop_drift_runner():
+    _live_drift_stop.set()
+    drift_runner.stop()
+    plot_runner.stop()
+
+
+def _job_view(job: dict) -> dict:
+    view = {k: v for k, v in job.items() if k not in ("result", "cancel_requested")}
+    view["status_url"] = f"/drift/jobs/{job['id']}"
+    report_id = job["params"].get("report_id")
+    if report_id is not None:
+        view["report_id"] = report_id
+        if job["status"] == SUCCEEDED:
+            view["plots_url"] = f"/drift/reports/{report_id}/plots"
+    results = job.get("result")
+    if results is not None and job["kind"] == run_live_drift.__name__:
+        view.update(results)
+    elif results is not None and job["kind"] == run_drift_timeline.__name__:
+        view["timeline"] = results
+    elif results is not None:
+        view["features_analyzed"] = len(results)
+        view["features_drifted"] = sum(1 for r in results.values() if r["drift_detected"])
+        view["results"] = results
+    return view
+
+
+@app.post("/drift/check", status_code=202)
+def check_drift(
+    threshold: float = 0.05,
+    mode: Optional[str] = Query(None, pattern="^(full|streaming)$"),
+    chunk_size: Optional[int] = Query(None, gt=0),
+    sketch_k: Optional[int] = Query(None, ge=8)
+):
+    """
+    Soumet un contrôle de drift en tâche de fond et renvoie son identifiant ;
+    statut et résultats sur /drift/jobs/{job_id}
+
+    `mode=streaming` : fichier de production lu par blocs de `chunk_size`
+    lignes, KS approché par un sketch KLL de précision `sketch_k`
+    (erreur sur la statistique ≈ 2.75 / k^0.97, bornes de p-value dans le
+    résultat) ; pour les fichiers qui ne tiennent pas en mémoire.
+    """
+    params = {
+        "reference_file": "data/bank_churn.csv",
+        "production_file": "data/production_data.csv",
+        "profile_path": DRIFT_REFERENCE_PROFILE,
+        "threshold": threshold,
+        "mode": mode or DRIFT_MODE,
+    }
+    if params["mode"] == "streaming":
+        params.update(chunk_size=chunk_size or DRIFT_CHUNK_SIZE, sketch_k=sketch_k or DRIFT_SKETCH_K)
+    cache_key = drift_result_cache.key(**params) if drift_result_cache.enabled else None
+
+    if cache_key is not None:
+        cached = drift_result_cache.get(cache_key)
+        if cached is not None:
+            return JSONResponse(content={**cached, "job_id": cached["id"], "cache": "hit"})
+
+    if not drift_runner.running:
+        drift_runner.start()
+    # Single-flight : un contrôle identique déjà en cours est partagé
+    with _drift_inflight_lock:
+        job = None
+        job_id = _drift_inflight.get(cache_key) if cache_key is not None else None
+        if job_id is not None:
+            try:
+                job = drift_runner.get(job_id)
+            except JobNotFound:
+                pass
+            # Job annulé en file (pas de on_complete) ou oublié : on relance
+            if job is None or (job["status"] in FINISHED and job["status"] != SUCCEEDED):
+                _drift_inflight.pop(cache_key, None)
+                _drift_inflight_keys.pop(job_id, None)
+                job = None
+        if job is not None:
+            cache_status = "shared"
+        else:
+            try:
+                job = drift_runner.submit(
+                    output_dir=DRIFT_REPORTS_DIR,
+                    chunk_size=chunk_size or DRIFT_CHUNK_SIZE,
+                    sketch_k=sketch_k or DRIFT_SKETCH_K,
+                    report_id=new_report_id(),
+                    **params
+                )
+            except JobQueueFull as e:
+                raise HTTPException(status_code=429, detail=str(e))
+            cache_status = "miss"
+            if cache_key is not None:
+                _drift_inflight[cache_key] = job["id"]
+                _drift_inflight_keys[job["id"]] = cache_key
+
+    view = _job_view(job)
+    view["job_id"] = job["id"]
+    view["cache"] = cache_status
+    return view
+
+
+@app.post("/drift/timeline", status_code=202)
+def drift_timeline(
+    window_rows: Optional[int] = Query(None, gt=0),
+    time_column: Optional[str] = None,
+    freq: Optional[str] = None,
+    psi_threshold: float = Query(0.25, gt=0)
+):
+    """
+    Soumet le calcul de la timeline de drift du fichier de production :
+    PSI et KS par feature et par fenêtre (`window_rows` lignes, ou période
+    `freq` de la colonne `time_column`), en une seule lecture ; résultats
+    sur /drift/jobs/{job_id}
+    """
+    if time_column is not None and not freq:
+        raise HTTPException(status_code=422, detail="freq is required with time_column")
+    if not drift_runner.running:
+        drift_runner.start()
+    try:
+        job = drift_runner.submit(
+            target=run_drift_timeline,
+            reference_file="data/bank_churn.csv",
+            production_file="data/production_data.csv",
+            profile_path=DRIFT_REFERENCE_PROFILE,
+            window_rows=window_rows or DRIFT_TIMELINE_WINDOW_ROWS,
+            time_column=time_column,
+            freq=freq,
+            chunk_size=DRIFT_CHUNK_SIZE,
+            psi_threshold=psi_threshold
+        )
+    except JobQueueFull as e:
+        raise HTTPException(status_code=429, detail=str(e))
+
+    view = _job_view(job)
+    view["job_id"] = job["id"]
+    return view
+
+
+@app.get("/drift/live")
+def live_drift_window():
+    """Taille, mémoire et période couverte par la fenêtre du drift en ligne"""
+    return {**live_window.stats(), "min_rows": LIVE_DRIFT_MIN_ROWS, "interval_s": LIVE_DRIFT_INTERVAL}
+
+
+@app.post("/drift/live/check", status_code=202)
+def check_live_drift(window: Optional[int] = Query(None, gt=0), threshold: float = 0.05):
+    """
+    Évalue le drift (KS / chi² / PSI) des `window` dernières lignes servies
+    par l'API contre le profil de référence ; résultats sur /drift/jobs/{job_id}
+    """
+    if not drift_runner.running:
+        drift_runner.start()
+    try:
+        job = submit_live_drift(window, threshold)
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except JobQueueFull as e:
+        raise HTTPException(status_code=429, detail=str(e))
+
+    view = _job_view(job)
+    view["job_id"] = job["id"]
+    return view
+
+
+@app.get("/drift/jobs")
+def list_drift_jobs():
+    """Jobs de drift récents (sans les résultats détaillés)"""
+    return {
+        "jobs": [_job_view(job) for job in drift_runner.jobs()],
+        **drift_runner.stats(),
+        "result_cache": drift_result_cache.stats(),
+    }
+
+
+@app.get("/drift/jobs/{job_id}")
+def get_drift_job(job_id: str):
+    try:
+        return _job_view(drift_runner.get(job_id))
+    except JobNotFound:
+        # Job oublié par le runner mais dont le résultat est encore en cache
+        cached = drift_result_cache.find_job(job_id)
+        if cached is None:
+            raise HTTPException(status_code=404, detail=f"Unknown drift job: {job_id}")
+        return cached
+
+
+@app.post("/drift/jobs/{job_id}/cancel")
+def cancel_drift_job(job_id: str):
+    """Annule un job en attente, ou termine le processus d'un job en cours"""
+    try:
+        return _job_view(drift_runner.cancel(job_id))
+    except JobNotFound:
+        raise HTTPException(status_code=404, detail=f"Unknown drift job: {job_id}")
+
+
+@app.get("/drift/reports/{report_id}/plots")
+def drift_report_plots(
+    report_id: str,
+    kind: str = Query("distributions", pattern="^(" + "|".join(PLOT_KINDS) + ")$"),
+    wait: Optional[float] = Query(None, ge=0, le=300)
+):
+    """
+    Graphique PNG d'un rapport de drift (`distributions` ou `heatmap`)
+
+    Rendu dans un processus de drift à partir du rapport sauvegardé
+    (classes d'histogramme, p-values), puis servi depuis le cache. Si le
+    rendu dépasse `wait` secondes : 202, la même URL renverra le PNG.
+    """
+    try:
+        if not report_path(DRIFT_REPORTS_DIR, report_id).exists():
+            raise FileNotFoundError(report_id)
+    except (ValueError, FileNotFoundError):
+        raise HTTPException(status_code=404, detail=f"Unknown drift report: {report_id}")
+
+    cached = cached_plot(DRIFT_REPORTS_DIR, report_id, kind)
+    if cached is not None:
+        return FileResponse(cached, media_type="image/png", headers={"X-Plot-Cache": "hit"})
+    if kind == "distributions" and not load_report(DRIFT_REPORTS_DIR, report_id).get("histograms"):
+        raise HTTPException(status_code=409, detail=f"No histogram bins stored in report {report_id}")
+
+    if not plot_runner.running:
+        plot_runner.start()
+    key = (report_id, kind)
+    with _plot_jobs_lock:
+        job_id = _plot_jobs.get(key)
+        try:
+            if job_id is None or plot_runner.get(job_id)["status"] in FINISHED:
+                job_id = None
+        except JobNotFound:
+            job_id = None
+        if job_id is None:
+            try:
+                job_id = plot_runner.submit(
+                    report_id=report_id, reports_dir=DRIFT_REPORTS_DIR, kind=kind
+                )["id"]
+            except JobQueueFull as e:
+                raise HTTPException(status_code=429, detail=str(e))
+            _plot_jobs[key] = job_id
+
+    job = plot_runner.wait(job_id, DRIFT_PLOT_TIMEOUT if wait is None else wait)
+    if job["status"] == SUCCEEDED:
+        with _plot_jobs_lock:
+            _plot_jobs.pop(key, None)
+        return FileResponse(job["result"], media_type="image/png", headers={"X-Plot-Cache": "miss"})
+    if job["status"] in FINISHED:
+        with _plot_jobs_lock:
+            _plot_jobs.pop(key, None)
+        error = (job["error"] or "").strip().splitlines()
+        raise HTTPException(status_code=500, detail=f"Plot rendering {job['status']}: {error[-1] if error else ''}")
+    return JSONResponse(status_code=202, content={
+        "report_id": report_id,
+        "kind": kind,
+        "job_id": job_id,
+        "status": job["status"],
+        "retry_url": f"/drift/reports/{report_id}/plots?kind={kind}",
+    })
+
+
+def _parse_instant(value: Optional[str], name: str) -> Optional[int]:
+    if value is None:
+        return None
+    try:
+        return to_ms(value)
+    except ValueError:
+        raise HTTPException(status_code=422, detail=f"Invalid {name}: expected epoch ms or ISO 8601")
+
+
+@app.get("/drift/history")
+def drift_history_series(
+    feature: Optional[str] = None,
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    limit: int = Query(1000, gt=0, le=100000)
+):
+    """
+    Série temporelle des contrôles de drift (instants `ts_ms` en ms UTC)
+
+    Avec `feature` : p-value, statistique, chi² / PSI et décision de la
+    feature à chaque contrôle ; sans : part de features en drift par
+    contrôle. `since` / `until` : epoch en ms ou ISO 8601 ; les `limit`
+    points les plus récents de la période sont renvoyés.
+    """
+    since_ms = _parse_instant(since, "since")
+    until_ms = _parse_instant(until, "until")
+    if feature is None:
+        points = drift_history.runs(since_ms, until_ms, limit)
+    else:
+        points = drift_history.history(feature, since_ms, until_ms, limit)
+    return {"feature": feature, "since": since_ms, "until": until_ms, "count": len(points), "points": points}
+
+
+@app.post("/admin/drift/history/import", tags=["Admin"])
+def import_drift_history(x_admin_token: Optional[str] = Header(None)):
+    """Importe dans l'historique les rapports JSON de DRIFT_REPORTS_DIR déjà présents"""
+    _check_admin(x_admin_token)
+    return drift_history.import_reports(DRIFT_REPORTS_DIR)
 
 
 @app.post("/drift/alert")
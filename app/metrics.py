@@ -0,0 +1,312 @@
+"""
+Métriques au format Prometheus (texte) pour /metrics
+
+- compteurs et histogrammes de latence par route, et durées des étapes
+  internes (validation, matrice, predict_proba, logging)
+- écriture sans verrou : chaque thread incrémente son propre fragment, les
+  fragments ne sont additionnés qu'à la lecture
+- mode multi-processus : avec un répertoire partagé, chaque worker y écrit
+  périodiquement un instantané ; /metrics additionne ceux de tous les workers
+"""
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Tuple
+
+# Bornes (secondes) des histogrammes de latence
+LATENCY_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+    0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+# nom -> (type, description)
+METRICS = {
+    "http_requests_total": ("counter", "Requêtes HTTP par route, méthode et statut"),
+    "http_request_errors_total": ("counter", "Requêtes HTTP en erreur (statut >= 400) par route"),
+    "http_request_duration_seconds": ("histogram", "Latence des requêtes HTTP par route"),
+    "stage_duration_seconds": ("histogram", "Durée des étapes internes de prédiction"),
+    "stage_rows_total": ("counter", "Lignes traitées par étape"),
+}
+
+SNAPSHOT_PREFIX = "metrics_"
+
+Labels = Tuple[Tuple[str, str], ...]
+
+# Début de la requête en cours (posé par MetricsMiddleware, copié dans le threadpool)
+request_started: ContextVar[Optional[float]] = ContextVar("request_started", default=None)
+
+
+class MetricsRegistry:
+    """
+    Compteurs et histogrammes fragmentés par thread
+
+    Un fragment est un dict {(nom, labels): valeur} ; un histogramme est une
+    liste [compte par bucket..., +Inf, somme, nombre]. Seule la création
+    d'un fragment (une fois par thread) prend un verrou.
+    """
+
+    def __init__(
+        self,
+        buckets: Iterable[float] = LATENCY_BUCKETS,
+        multiproc_dir: Optional[str] = None,
+        flush_interval: float = 5.0,
+    ):
+        self.buckets = tuple(sorted(buckets))
+        self.multiproc_dir = Path(multiproc_dir) if multiproc_dir else None
+        self.flush_interval = float(flush_interval)
+
+        self._local = threading.local()
+        self._shards = []
+        self._shards_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._flusher: Optional[threading.Thread] = None
+
+    # =========================
+    # ÉCRITURE (CHEMIN CHAUD)
+    # =========================
+    def _shard(self) -> dict:
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = {}
+            with self._shards_lock:
+                self._shards.append(shard)
+            self._local.shard = shard
+        return shard
+
+    def inc(self, name: str, labels: Labels = (), value: float = 1.0):
+        shard = self._shard()
+        key = (name, labels)
+        shard[key] = shard.get(key, 0.0) + value
+
+    def observe(self, name: str, labels: Labels, seconds: float):
+        shard = self._shard()
+        key = (name, labels)
+        histogram = shard.get(key)
+        if histogram is None:
+            histogram = shard[key] = [0] * (len(self.buckets) + 1) + [0.0, 0]
+        histogram[bisect_left(self.buckets, seconds)] += 1
+        histogram[-2] += seconds
+        histogram[-1] += 1
+
+    def stage(self, name: str, rows: int = 0) -> "StageTimer":
+        """Chronomètre une étape : `with metrics.stage("matrix"): ...`"""
+        return StageTimer(self, name, rows)
+
+    def observe_stage(self, name: str, seconds: float, rows: int = 0):
+        labels = (("stage", name),)
+        self.observe("stage_duration_seconds", labels, seconds)
+        if rows:
+            self.inc("stage_rows_total", labels, rows)
+
+    def stage_since_request(self, name: str, rows: int = 0):
+        """Étape écoulée depuis l'arrivée de la requête (lecture + validation du corps)"""
+        started = request_started.get()
+        if started is not None:
+            self.observe_stage(name, time.perf_counter() - started, rows)
+
+    # =========================
+    # LECTURE
+    # =========================
+    def snapshot(self) -> dict:
+        """Somme des fragments du processus courant"""
+        with self._shards_lock:
+            shards = list(self._shards)
+        merged: Dict[tuple, object] = {}
+        for shard in shards:
+            # copie C (atomique sous le GIL) : pas d'itération sur un dict en mutation
+            for key, value in dict(shard).items():
+                _merge_value(merged, key, value)
+        return merged
+
+    def collect(self) -> dict:
+        """Métriques de tous les workers (mode multi-processus) ou du processus"""
+        if self.multiproc_dir is None:
+            return self.snapshot()
+        self.write_snapshot()
+        merged: Dict[tuple, object] = {}
+        for path in self.multiproc_dir.glob(f"{SNAPSHOT_PREFIX}*.json"):
+            try:
+                entries = json.loads(path.read_text())
+            except (OSError, ValueError):
+                # instantané en cours de remplacement ou supprimé
+                continue
+            for name, labels, value in entries:
+                _merge_value(merged, (name, tuple(tuple(pair) for pair in labels)), value)
+        return merged
+
+    def render(self) -> str:
+        return render_prometheus(self.collect(), self.buckets)
+
+    # =========================
+    # MODE MULTI-PROCESSUS
+    # =========================
+    def write_snapshot(self):
+        if self.multiproc_dir is None:
+            return
+        self.multiproc_dir.mkdir(parents=True, exist_ok=True)
+        entries = [[name, [list(pair) for pair in labels], value]
+                   for (name, labels), value in self.snapshot().items()]
+        target = self.multiproc_dir / f"{SNAPSHOT_PREFIX}{os.getpid()}.json"
+        tmp = target.with_suffix(".tmp")
+        tmp.write_text(json.dumps(entries))
+        os.replace(tmp, target)
+
+    def start(self):
+        if self.multiproc_dir is None or self._flusher is not None or self.flush_interval <= 0:
+            return
+        self._stop.clear()
+        self._flusher = threading.Thread(target=self._flush_loop, name="metrics-flush", daemon=True)
+        self._flusher.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._flusher is not None:
+            self._flusher.join(self.flush_interval + 1)
+            self._flusher = None
+        if self.multiproc_dir is not None:
+            self.write_snapshot()
+
+    def _flush_loop(self):
+        while not self._stop.wait(self.flush_interval):
+            try:
+                self.write_snapshot()
+            except OSError:
+                pass
+
+
+class StageTimer:
+    __slots__ = ("registry", "name", "rows", "started")
+
+    def __init__(self, registry: MetricsRegistry, name: str, rows: int = 0):
+        self.registry = registry
+        self.name = name
+        self.rows = rows
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.registry.observe_stage(self.name, time.perf_counter() - self.started, self.rows)
+        return False
+
+
+def _merge_value(merged: dict, key: tuple, value):
+    current = merged.get(key)
+    if isinstance(value, list):
+        if current is None:
+            merged[key] = list(value)
+        else:
+            for i, v in enumerate(value):
+                current[i] += v
+    else:
+        merged[key] = (current or 0.0) + value
+
+
+def clear_multiproc_dir(directory: Optional[str]):
+    """Supprime les instantanés d'un lancement précédent (à appeler avant le fork)"""
+    if not directory:
+        return
+    for path in Path(directory).glob(f"{SNAPSHOT_PREFIX}*"):
+        try:
+            path.unlink()
+        except OSError:
+            pass
+
+
+# =========================
+# FORMAT TEXTE PROMETHEUS
+# =========================
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: Labels, extra: Labels = ()) -> str:
+    pairs = tuple(labels) + tuple(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+
+def _format_number(value: float) -> str:
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def render_prometheus(samples: dict, buckets: Tuple[float, ...] = LATENCY_BUCKETS) -> str:
+    by_name: Dict[str, list] = {}
+    for (name, labels), value in samples.items():
+        by_name.setdefault(name, []).append((labels, value))
+
+    lines = []
+    for name in sorted(by_name):
+        kind, description = METRICS.get(name, ("untyped", ""))
+        lines.append(f"# HELP {name} {description}")
+        lines.append(f"# TYPE {name} {kind}")
+        for labels, value in sorted(by_name[name]):
+            if kind != "histogram":
+                lines.append(f"{name}{_format_labels(labels)} {_format_number(value)}")
+                continue
+            cumulative = 0
+            for bound, count in zip(buckets, value):
+                cumulative += count
+                lines.append(
+                    f"{name}_bucket{_format_labels(labels, (('le', repr(bound)),))} {cumulative}"
+                )
+            cumulative += value[len(buckets)]
+            lines.append(f"{name}_bucket{_format_labels(labels, (('le', '+Inf'),))} {cumulative}")
+            lines.append(f"{name}_sum{_format_labels(labels)} {_format_number(value[-2])}")
+            lines.append(f"{name}_count{_format_labels(labels)} {_format_number(value[-1])}")
+    return "\n".join(lines) + "\n"
+
+
+# =========================
+# MIDDLEWARE ASGI
+# =========================
+class MetricsMiddleware:
+    """
+    Compte et chronomètre chaque requête HTTP par route (gabarit FastAPI,
+    pas le chemin brut) jusqu'au dernier octet envoyé
+
+    Middleware ASGI pur : les réponses en flux ne sont pas mises en tampon.
+    """
+
+    def __init__(self, app, registry: MetricsRegistry, exclude: Iterable[str] = ("/metrics",)):
+        self.app = app
+        self.registry = registry
+        self.exclude = set(exclude)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] in self.exclude:
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        token = request_started.set(started)
+        status = {"code": 500}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            request_started.reset(token)
+            route = scope.get("route")
+            path = getattr(route, "path", None) or "unmatched"
+            code = status["code"]
+            self.registry.inc("http_requests_total", (
+                ("route", path), ("method", scope["method"]), ("status", str(code)),
+            ))
+            if code >= 400:
+                self.registry.inc("http_request_errors_total", (("route", path), ("status", str(code))))
+            self.registry.observe(
+                "http_request_duration_seconds", (("route", path),), time.perf_counter() - started
+            )
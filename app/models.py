@@ -1,5 +1,6 @@
-from pydantic import BaseModel, Field
-from typing import List
+from pydantic import BaseModel, ConfigDict, Field
+from typing import List, Optional
+import numpy as np
 
 class CustomerFeatures(BaseModel):
     """Schema pour les features d'un client"""
@@ -35,8 +36,64 @@ class PredictionResponse(BaseModel):
     churn_probability: float = Field(..., description="Probabilite de churn (0-1)")
     prediction: int = Field(..., description="Prediction binaire (0=reste, 1=part)")
     risk_level: str = Field(..., description="Niveau de risque (Low/Medium/High)")
+    model_version: Optional[str] = Field(None, description="Version (empreinte) du modèle ayant répondu")
+
+    model_config = ConfigDict(protected_namespaces=())
 
 class HealthResponse(BaseModel):
     """Schema pour le health check"""
     status: str
-    model_loaded: bool
\ No newline at end of file
+    model_loaded: bool
+
+# ============================================================
+# VALIDATION VECTORISÉE (entrées colonnaires)
+# ============================================================
+
+def _field_constraints(field) -> dict:
+    """Bornes (ge / le) et type entier d'un champ de CustomerFeatures"""
+    constraints = {"ge": None, "le": None, "integer": field.annotation is int}
+    for meta in field.metadata:
+        if getattr(meta, "ge", None) is not None:
+            constraints["ge"] = meta.ge
+        if getattr(meta, "le", None) is not None:
+            constraints["le"] = meta.le
+    return constraints
+
+
+# Contraintes par colonne, dérivées du schéma pour rester synchronisées
+FEATURE_CONSTRAINTS = {
+    name: _field_constraints(field)
+    for name, field in CustomerFeatures.model_fields.items()
+}
+
+
+def validate_feature_matrix(X, columns) -> list:
+    """
+    Applique les contraintes de CustomerFeatures colonne par colonne
+
+    Renvoie une liste d'erreurs (vide si la matrice est valide) ; chaque
+    erreur indique la colonne, le nombre de lignes fautives et les
+    premiers indices concernés.
+    """
+    errors = []
+    for j, name in enumerate(columns):
+        rules = FEATURE_CONSTRAINTS[name]
+        col = X[:, j]
+
+        invalid = ~np.isfinite(col)
+        if rules["ge"] is not None:
+            invalid |= col < rules["ge"]
+        if rules["le"] is not None:
+            invalid |= col > rules["le"]
+        if rules["integer"]:
+            invalid |= col != np.floor(col)
+
+        if invalid.any():
+            rows = np.flatnonzero(invalid)
+            errors.append({
+                "column": name,
+                "invalid_rows": int(rows.size),
+                "first_rows": rows[:10].tolist(),
+                "constraint": {k: v for k, v in rules.items() if v is not None and v is not False},
+            })
+    return errors
@@ -0,0 +1,209 @@
+"""
+Point de reprise de la recherche d'hyperparamètres (SQLite embarqué)
+
+Chaque score (recherche, candidat, fold) est écrit dès qu'il est calculé,
+par le worker qui a ajusté le modèle : une recherche interrompue (VM
+évincée, OOM) puis relancée sur le même fichier ne réévalue que les folds
+manquants. Une recherche est identifiée par une empreinte de
+l'estimateur, du scoring, des données et des folds (`search`) : changer
+l'un d'eux repart de zéro sans effacer les scores précédents.
+
+Plusieurs processus peuvent lancer la même recherche sur le même fichier :
+chaque (groupe de candidats, fold) est réservé (`claims`) avant d'être
+ajusté, un processus passe les folds réservés par un autre puis attend
+leurs scores. Une réservation expire après `claim_ttl` secondes, ou dès
+que son processus (sur la même machine) n'existe plus.
+
+Purge d'une base :
+    python -m app.search_checkpoint model/search_checkpoint.db --clear
+"""
+import json
+import os
+import socket
+import sqlite3
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS scores (
+    search TEXT NOT NULL,
+    candidate TEXT NOT NULL,
+    fold INTEGER NOT NULL,
+    score REAL NOT NULL,
+    fit_seconds REAL,
+    ts_ms INTEGER NOT NULL,
+    PRIMARY KEY (search, candidate, fold)
+);
+
+CREATE TABLE IF NOT EXISTS claims (
+    search TEXT NOT NULL,
+    candidate TEXT NOT NULL,
+    fold INTEGER NOT NULL,
+    owner TEXT NOT NULL,
+    ts_ms INTEGER NOT NULL,
+    PRIMARY KEY (search, candidate, fold)
+);
+"""
+
+
+def candidate_key(params: dict, resource=None) -> str:
+    """Clé stable d'un candidat : paramètres (triés) et ressource du palier"""
+    return json.dumps({"params": params, "resource": resource}, sort_keys=True, default=str)
+
+
+def _now_ms() -> int:
+    return int(time.time() * 1000)
+
+
+def _owner_alive(owner: str) -> bool:
+    """Faux seulement si le processus propriétaire, sur cette machine, n'existe plus"""
+    host, _, pid = owner.partition("/")
+    if host != socket.gethostname() or not pid.isdigit():
+        return True
+    try:
+        os.kill(int(pid), 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        return True
+    return True
+
+
+class SearchCheckpoint:
+    """
+    Accès au point de reprise ; une connexion par opération (l'objet est
+    picklable et utilisable depuis les workers joblib, mode WAL)
+    """
+
+    def __init__(self, path, claim_ttl: float = 3600):
+        self.path = Path(path)
+        self.claim_ttl = float(claim_ttl)
+        # Un propriétaire par processus : ses propres réservations restent reprenables
+        self.owner = f"{socket.gethostname()}/{os.getpid()}"
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.executescript(SCHEMA)
+        finally:
+            conn.close()
+
+    def _connect(self, **kwargs) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=30, **kwargs)
+
+    # =========================
+    # LECTURE
+    # =========================
+    def scores(self, search: str, candidates: List[str]) -> Dict[Tuple[str, int], Tuple[float, float]]:
+        """{(candidat, fold): (score, durée du fit)} des candidats déjà évalués"""
+        conn = self._connect()
+        try:
+            rows = conn.execute(
+                f"SELECT candidate, fold, score, fit_seconds FROM scores"
+                f" WHERE search = ? AND candidate IN ({', '.join('?' * len(candidates))})",
+                [search, *candidates],
+            ).fetchall()
+        finally:
+            conn.close()
+        return {(candidate, fold): (score, fit_seconds) for candidate, fold, score, fit_seconds in rows}
+
+    def count(self, search: Optional[str] = None) -> int:
+        conn = self._connect()
+        try:
+            if search is None:
+                return conn.execute("SELECT COUNT(*) FROM scores").fetchone()[0]
+            return conn.execute("SELECT COUNT(*) FROM scores WHERE search = ?", (search,)).fetchone()[0]
+        finally:
+            conn.close()
+
+    # =========================
+    # ÉCRITURE
+    # =========================
+    def put(self, search: str, fold: int, scores: List[Tuple[str, float]], fit_seconds: float):
+        """Enregistre les scores d'un fold (un par candidat) et libère leurs réservations"""
+        ts_ms = _now_ms()
+        conn = self._connect()
+        try:
+            with conn:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO scores (search, candidate, fold, score, fit_seconds, ts_ms)"
+                    " VALUES (?, ?, ?, ?, ?, ?)",
+                    [(search, candidate, fold, score, fit_seconds, ts_ms) for candidate, score in scores],
+                )
+                conn.executemany(
+                    "DELETE FROM claims WHERE search = ? AND candidate = ? AND fold = ?",
+                    [(search, candidate, fold) for candidate, _ in scores],
+                )
+        finally:
+            conn.close()
+
+    def claim(self, search: str, candidates: List[str], fold: int) -> bool:
+        """
+        Réserve (candidats, fold) pour ce processus ; faux si un autre
+        processus vivant le détient ou si tous les scores sont déjà là
+        """
+        now = _now_ms()
+        placeholders = ", ".join("?" * len(candidates))
+        conn = self._connect(isolation_level=None)
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                done = conn.execute(
+                    f"SELECT COUNT(*) FROM scores WHERE search = ? AND fold = ? AND candidate IN ({placeholders})",
+                    [search, fold, *candidates],
+                ).fetchone()[0]
+                holders = conn.execute(
+                    f"SELECT owner FROM claims WHERE search = ? AND fold = ? AND owner != ? AND ts_ms > ?"
+                    f" AND candidate IN ({placeholders})",
+                    [search, fold, self.owner, now - int(self.claim_ttl * 1000), *candidates],
+                ).fetchall()
+                if done == len(candidates) or any(_owner_alive(owner) for owner, in holders):
+                    conn.execute("COMMIT")
+                    return False
+                conn.executemany(
+                    "INSERT OR REPLACE INTO claims (search, candidate, fold, owner, ts_ms) VALUES (?, ?, ?, ?, ?)",
+                    [(search, candidate, fold, self.owner, now) for candidate in candidates],
+                )
+                conn.execute("COMMIT")
+                return True
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        finally:
+            conn.close()
+
+    def release(self, search: str, candidates: List[str], fold: int):
+        """Rend les réservations (candidats, fold) de ce processus (fits abandonnés)"""
+        conn = self._connect()
+        try:
+            with conn:
+                conn.executemany(
+                    "DELETE FROM claims WHERE search = ? AND candidate = ? AND fold = ? AND owner = ?",
+                    [(search, candidate, fold, self.owner) for candidate in candidates],
+                )
+        finally:
+            conn.close()
+
+    def clear(self, search: Optional[str] = None) -> int:
+        """Supprime les scores (d'une recherche, ou tous) ; renvoie le nombre de scores supprimés"""
+        conn = self._connect()
+        try:
+            with conn:
+                if search is None:
+                    conn.execute("DELETE FROM claims")
+                    return conn.execute("DELETE FROM scores").rowcount
+                conn.execute("DELETE FROM claims WHERE search = ?", (search,))
+                return conn.execute("DELETE FROM scores WHERE search = ?", (search,)).rowcount
+        finally:
+            conn.close()
+
+
+if __name__ == "__main__":
+    target = sys.argv[1] if len(sys.argv) > 1 else "model/search_checkpoint.db"
+    checkpoint = SearchCheckpoint(target)
+    if "--clear" in sys.argv[2:]:
+        print({"cleared": checkpoint.clear()})
+    else:
+        print({"scores": checkpoint.count()})
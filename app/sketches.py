@@ -0,0 +1,151 @@
+"""
+Sketch de quantiles KLL (Karnin, Lang, Liberty 2016) pour le drift hors mémoire
+
+Le sketch résume un flux de valeurs en O(k) éléments pondérés, alimenté
+par blocs (tableaux numpy) et fusionnable. Garantie : pour toute valeur x,
+l'erreur sur le rang normalisé F(x) est au plus `rank_error(k)` avec une
+probabilité d'au moins 99 % (k = 200 : ~1,6 %).
+
+Conséquence pour KS : la statistique D = sup |F_ref - F_prod| calculée
+avec une référence exacte et un F_prod estimé par le sketch vérifie
+|D_sketch - D| <= rank_error(k) avec la même probabilité.
+"""
+from typing import Optional
+
+import numpy as np
+
+# Taille de la plus haute couche ; la précision croît avec k
+DEFAULT_K = 200
+# Décroissance géométrique des capacités vers les couches basses
+CAPACITY_DECAY = 2.0 / 3.0
+MIN_CAPACITY = 8
+
+# Constante de la borne d'erreur : 2.296 pour Apache DataSketches (99 %),
+# majorée de 20 % après calibration de cette implémentation (pire cas sur
+# 30 flux de 300k valeurs : 2.34 / k^0.9723)
+RANK_ERROR_CONSTANT = 2.75
+
+
+def rank_error(k: int) -> float:
+    """
+    Erreur de rang normalisée (bilatérale, 99 %) d'un sketch KLL de paramètre k :
+    C / k^0.9723 (forme empirique de Apache DataSketches)
+    """
+    return RANK_ERROR_CONSTANT / k ** 0.9723
+
+
+class KLLSketch:
+    """
+    Couches de compacteurs : la couche h contient des éléments de poids 2^h.
+    Une couche pleine est triée puis un élément sur deux (position de
+    départ aléatoire) est promu à la couche supérieure.
+    """
+
+    def __init__(self, k: int = DEFAULT_K, seed: Optional[int] = None):
+        self.k = max(MIN_CAPACITY, int(k))
+        self.n = 0
+        self.min = np.inf
+        self.max = -np.inf
+        self.levels = [np.empty(0, dtype=np.float64)]
+        self._rng = np.random.default_rng(seed)
+        self._compactions = 0
+
+    # =========================
+    # ALIMENTATION
+    # =========================
+    def update(self, values):
+        """Ajoute un bloc de valeurs (les NaN sont ignorés)"""
+        values = np.asarray(values, dtype=np.float64).ravel()
+        values = values[~np.isnan(values)]
+        if not len(values):
+            return
+        self.n += len(values)
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self._compress()
+
+    def merge(self, other: "KLLSketch"):
+        """Fusionne `other` dans ce sketch (même garantie sur l'union des flux)"""
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0, dtype=np.float64))
+        for h, items in enumerate(other.levels):
+            self.levels[h] = np.concatenate([self.levels[h], items])
+        self.n += other.n
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self._compactions += other._compactions
+        self._compress()
+
+    def _capacity(self, h: int) -> int:
+        depth = len(self.levels) - h - 1
+        return max(MIN_CAPACITY, int(np.ceil(self.k * CAPACITY_DECAY ** depth)))
+
+    def _compress(self):
+        h = 0
+        while h < len(self.levels):
+            if len(self.levels[h]) <= self._capacity(h):
+                h += 1
+                continue
+            if h + 1 == len(self.levels):
+                self.levels.append(np.empty(0, dtype=np.float64))
+            items = np.sort(self.levels[h])
+            # Nombre impair : un élément reste sur place, le poids total est conservé
+            keep = items[-1:] if len(items) % 2 else items[:0]
+            items = items[:len(items) - len(keep)]
+            promoted = items[self._rng.integers(2)::2]
+            self.levels[h + 1] = np.concatenate([self.levels[h + 1], promoted])
+            self.levels[h] = keep
+            self._compactions += 1
+            # Une nouvelle couche réduit les capacités des couches basses
+            h = 0 if h + 2 == len(self.levels) else h + 1
+
+    # =========================
+    # REQUÊTES
+    # =========================
+    @property
+    def is_exact(self) -> bool:
+        """Vrai tant qu'aucune compaction n'a eu lieu (toutes les valeurs sont gardées)"""
+        return self._compactions == 0
+
+    @property
+    def size(self) -> int:
+        return sum(len(items) for items in self.levels)
+
+    def weighted_items(self):
+        """(valeurs triées, poids) : la somme des poids vaut n"""
+        values = np.concatenate(self.levels)
+        weights = np.concatenate([
+            np.full(len(items), 2.0 ** h) for h, items in enumerate(self.levels)
+        ])
+        order = np.argsort(values, kind="stable")
+        return values[order], weights[order]
+
+    def cdf(self, points) -> np.ndarray:
+        """F(x) = proportion estimée des valeurs <= x, pour chaque point"""
+        values, weights = self.weighted_items()
+        if not self.n:
+            return np.zeros(len(np.atleast_1d(points)))
+        cumulative = np.concatenate([[0.0], np.cumsum(weights)])
+        return cumulative[np.searchsorted(values, points, side="right")] / self.n
+
+    def quantiles(self, qs) -> np.ndarray:
+        values, weights = self.weighted_items()
+        cumulative = np.cumsum(weights) / self.n
+        idx = np.searchsorted(cumulative, np.asarray(qs, dtype=np.float64), side="left")
+        return values[np.minimum(idx, len(values) - 1)]
+
+    def error_bound(self) -> float:
+        return 0.0 if self.is_exact else rank_error(self.k)
+
+
+def ks_statistic_from_sketch(reference_sorted: np.ndarray, sketch: KLLSketch) -> float:
+    """
+    D = sup_x |F_ref(x) - F_sketch(x)| : référence exacte (triée), production
+    estimée. Les deux fonctions de répartition sont en escalier, le sup est
+    atteint sur l'union de leurs points de saut.
+    """
+    values, _ = sketch.weighted_items()
+    points = np.concatenate([reference_sorted, values])
+    ref_cdf = np.searchsorted(reference_sorted, points, side="right") / len(reference_sorted)
+    return float(np.max(np.abs(ref_cdf - sketch.cdf(points))))
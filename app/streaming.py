@@ -0,0 +1,132 @@
+"""
+Lecture / écriture incrémentale pour /predict/stream (NDJSON ou CSV)
+
+Le corps de la requête est consommé par morceaux et découpé en lignes ;
+seule la ligne partielle en cours est gardée en mémoire.
+"""
+import csv
+import io
+import json
+from typing import AsyncIterator, Optional, Union
+
+from starlette.responses import StreamingResponse
+
+STREAM_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+
+def detect_format(content_type: Optional[str], explicit: Optional[str] = None) -> str:
+    """
+    Format du flux : paramètre explicite, sinon Content-Type (NDJSON par défaut)
+    """
+    if explicit:
+        fmt = explicit.lower()
+        if fmt not in STREAM_MEDIA_TYPES:
+            raise ValueError(f"Format non supporté: {explicit}")
+        return fmt
+    if content_type and "csv" in content_type.lower():
+        return "csv"
+    return "ndjson"
+
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    """
+    Découpe un flux d'octets en lignes (fins de ligne \\n ou \\r\\n)
+
+    Les lignes restent en octets : `RowParser.parse` les décode, si bien
+    qu'une séquence UTF-8 invalide n'invalide que sa ligne.
+    """
+    pending = b""
+    async for chunk in chunks:
+        if not chunk:
+            continue
+        pending += chunk
+        *lines, pending = pending.split(b"\n")
+        for line in lines:
+            yield line.rstrip(b"\r")
+    if pending:
+        yield pending.rstrip(b"\r")
+
+
+class RowParser:
+    """
+    Transforme chaque ligne en dict {colonne: valeur}
+
+    En CSV, la première ligne non vide est l'en-tête ; `parse` renvoie
+    alors None.
+    """
+
+    def __init__(self, fmt: str):
+        self.fmt = fmt
+        self.header = None
+
+    def parse(self, line: Union[str, bytes]) -> Optional[dict]:
+        if isinstance(line, bytes):
+            # UnicodeDecodeError est une ValueError : erreur de la ligne seule
+            line = line.decode("utf-8")
+        if self.fmt == "ndjson":
+            record = json.loads(line)
+            if not isinstance(record, dict):
+                raise ValueError("Chaque ligne NDJSON doit être un objet JSON")
+            return record
+
+        values = next(csv.reader([line]))
+        if self.header is None:
+            self.header = [v.strip() for v in values]
+            return None
+        if len(values) != len(self.header):
+            raise ValueError(
+                f"{len(values)} valeurs pour {len(self.header)} colonnes"
+            )
+        return dict(zip(self.header, values))
+
+
+def format_results(fmt: str, results) -> bytes:
+    """
+    Sérialise une liste de résultats {"row", "churn_probability", "prediction", "error", "model_version"}
+    """
+    if fmt == "ndjson":
+        return "".join(
+            json.dumps({k: v for k, v in r.items() if v is not None}) + "\n"
+            for r in results
+        ).encode("utf-8")
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    for r in results:
+        writer.writerow([
+            r["row"],
+            "" if r.get("churn_probability") is None else r["churn_probability"],
+            "" if r.get("prediction") is None else r["prediction"],
+            r.get("error") or "",
+            r.get("model_version") or "",
+        ])
+    return buffer.getvalue().encode("utf-8")
+
+
+def csv_header() -> bytes:
+    return b"row,churn_probability,prediction,error,model_version\n"
+
+
+class DuplexStreamingResponse(StreamingResponse):
+    """
+    StreamingResponse qui laisse le corps de la requête au générateur
+
+    La version Starlette écoute `receive()` pendant l'envoi pour détecter
+    une déconnexion, ce qui consommerait les morceaux du corps encore en
+    cours de lecture par le générateur.
+    """
+
+    async def __call__(self, scope, receive, send):
+        await send({
+            "type": "http.response.start",
+            "status": self.status_code,
+            "headers": self.raw_headers,
+        })
+        async for chunk in self.body_iterator:
+            if not isinstance(chunk, (bytes, memoryview)):
+                chunk = chunk.encode(self.charset)
+            await send({"type": "http.response.body", "body": chunk, "more_body": True})
+        await send({"type": "http.response.body", "body": b"", "more_body": False})
@@ -0,0 +1,296 @@
+"""
+Pipeline de télémétrie non bloquant
+
+Les endpoints déposent leurs événements dans une file bornée ; un thread
+d'export les envoie par lots (logger / Application Insights, fichier
+JSONL ou stdout). Si la file est pleine, l'événement est compté comme
+perdu : une requête n'attend jamais l'exporteur et n'échoue jamais à
+cause de lui.
+
+Les événements `prediction` peuvent être échantillonnés ; les compteurs
+agrégés (prédictions par niveau de risque, histogramme des probabilités)
+restent exacts car ils sont mis à jour avant l'échantillonnage et
+publiés une fois par intervalle dans un événement `prediction_summary`.
+"""
+import json
+import logging
+import queue
+import random
+import sys
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import numpy as np
+
+# Libellés des 10 buckets de l'histogramme des probabilités ([0.0, 0.1[, ...)
+PROBA_BUCKETS = [f"{i / 10:.1f}-{(i + 1) / 10:.1f}" for i in range(10)]
+
+
+# =========================
+# EXPORTEURS
+# =========================
+class LoggerExporter:
+    """
+    Ré-émet les événements via un logger standard (AzureLogHandler inclus)
+    """
+
+    def __init__(self, target_logger: logging.Logger):
+        self.logger = target_logger
+
+    def export(self, records: List[dict]):
+        for record in records:
+            self.logger.log(record["level"], record["name"], extra={
+                "custom_dimensions": record["custom_dimensions"]
+            })
+
+    def close(self):
+        pass
+
+
+class FileExporter:
+    """
+    Écrit un événement JSON par ligne dans un fichier ("-" = stdout)
+    """
+
+    def __init__(self, path: str = "-"):
+        self.path = path
+        self._stream = sys.stdout if path == "-" else open(path, "a", encoding="utf-8")
+
+    def export(self, records: List[dict]):
+        for record in records:
+            self._stream.write(json.dumps({
+                "timestamp": record["timestamp"],
+                "level": logging.getLevelName(record["level"]),
+                "name": record["name"],
+                "custom_dimensions": record["custom_dimensions"],
+            }, default=str) + "\n")
+        self._stream.flush()
+
+    def close(self):
+        if self._stream is not sys.stdout:
+            self._stream.close()
+
+
+# =========================
+# PIPELINE
+# =========================
+class TelemetryPipeline:
+    """
+    File bornée + thread d'export par lots + agrégats par intervalle
+    """
+
+    def __init__(
+        self,
+        exporters: List,
+        max_queue: int = 10000,
+        batch_size: int = 500,
+        flush_interval: float = 5.0,
+        sample_rates: Optional[Dict[str, float]] = None,
+    ):
+        self.exporters = exporters
+        self.batch_size = max(1, int(batch_size))
+        self.flush_interval = max(0.01, float(flush_interval))
+        self.sample_rates = dict(sample_rates or {})
+
+        self._queue: "queue.Queue[dict]" = queue.Queue(maxsize=max(1, int(max_queue)))
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._agg_lock = threading.Lock()
+        # Compteurs mis à jour depuis les threads des requêtes
+        self._count_lock = threading.Lock()
+        self._reset_aggregates()
+
+        self.emitted = 0
+        self.sampled_out = 0
+        self.dropped = 0
+        self.exported = 0
+        self.export_errors = 0
+
+    # -------- Cycle de vie
+    def start(self):
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="telemetry-exporter", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        """
+        Arrête le thread après un dernier export (file + agrégats) ; les
+        exporteurs sont fermés par le thread lui-même une fois ce dernier
+        export écrit, même si `timeout` expire avant
+        """
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join(timeout)
+        if not self._thread.is_alive():
+            self._thread = None
+
+    def _close_exporters(self):
+        for exporter in self.exporters:
+            try:
+                exporter.close()
+            except Exception:
+                pass
+
+    # -------- Côté requête (jamais bloquant)
+    def emit(self, name: str, dimensions: dict, level: int = logging.INFO):
+        if name == "prediction":
+            self._aggregate(dimensions)
+
+        rate = self.sample_rates.get(name, 1.0)
+        if rate < 1.0 and random.random() >= rate:
+            with self._count_lock:
+                self.sampled_out += 1
+            return
+
+        record = {
+            "timestamp": datetime.utcnow().isoformat(),
+            "level": level,
+            "name": name,
+            "custom_dimensions": dimensions,
+        }
+        try:
+            self._queue.put_nowait(record)
+            queued = True
+        except queue.Full:
+            queued = False
+        with self._count_lock:
+            if queued:
+                self.emitted += 1
+            else:
+                self.dropped += 1
+
+    def _aggregate(self, dimensions: dict):
+        proba = dimensions.get("probability")
+        risk = dimensions.get("risk_level", "unknown")
+        with self._agg_lock:
+            self._predictions += 1
+            self._by_risk[risk] = self._by_risk.get(risk, 0) + 1
+            if proba is not None:
+                bucket = min(int(float(proba) * 10), 9)
+                self._proba_hist[bucket] += 1
+
+    def count_predictions(self, probas):
+        """
+        Agrège un lot de probabilités (endpoints batch) sans émettre d'événement par ligne
+        """
+        probas = np.asarray(probas, dtype=np.float64)
+        if not probas.size:
+            return
+        buckets = np.bincount(np.minimum((probas * 10).astype(np.int64), 9), minlength=10)
+        n_low = int(np.count_nonzero(probas < 0.3))
+        n_high = int(np.count_nonzero(probas >= 0.7))
+        with self._agg_lock:
+            self._predictions += int(probas.size)
+            for risk, n in (("Low", n_low), ("Medium", probas.size - n_low - n_high), ("High", n_high)):
+                if n:
+                    self._by_risk[risk] = self._by_risk.get(risk, 0) + int(n)
+            for i, n in enumerate(buckets.tolist()):
+                self._proba_hist[i] += n
+
+    def _reset_aggregates(self):
+        self._predictions = 0
+        self._by_risk: Dict[str, int] = {}
+        self._proba_hist = [0] * len(PROBA_BUCKETS)
+        self._interval_start = time.monotonic()
+
+    def _summary(self) -> Optional[dict]:
+        with self._agg_lock:
+            if not self._predictions:
+                self._interval_start = time.monotonic()
+                return None
+            dimensions = {
+                "event_type": "prediction_summary",
+                "interval_seconds": round(time.monotonic() - self._interval_start, 3),
+                "predictions": self._predictions,
+                "predictions_by_risk": dict(self._by_risk),
+                "probability_histogram": dict(zip(PROBA_BUCKETS, self._proba_hist)),
+            }
+            self._reset_aggregates()
+        return {
+            "timestamp": datetime.utcnow().isoformat(),
+            "level": logging.INFO,
+            "name": "prediction_summary",
+            "custom_dimensions": dimensions,
+        }
+
+    # -------- Thread d'export
+    def _export(self, records: List[dict]):
+        if not records:
+            return
+        for exporter in self.exporters:
+            try:
+                exporter.export(records)
+            except Exception:
+                self.export_errors += 1
+        self.exported += len(records)
+
+    def _drain(self, limit: int) -> List[dict]:
+        records = []
+        while len(records) < limit:
+            try:
+                records.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return records
+
+    def _run(self):
+        next_summary = time.monotonic() + self.flush_interval
+        while True:
+            batch = []
+            deadline = min(next_summary, time.monotonic() + self.flush_interval)
+            while len(batch) < self.batch_size and not self._stop.is_set():
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=min(remaining, 0.1)))
+                except queue.Empty:
+                    continue
+                batch.extend(self._drain(self.batch_size - len(batch)))
+            self._export(batch)
+
+            if time.monotonic() >= next_summary or self._stop.is_set():
+                summary = self._summary()
+                if summary is not None:
+                    self._export([summary])
+                next_summary = time.monotonic() + self.flush_interval
+
+            if self._stop.is_set():
+                # Dernier passage : tout ce qui reste dans la file
+                while True:
+                    rest = self._drain(self.batch_size)
+                    if not rest:
+                        self._close_exporters()
+                        return
+                    self._export(rest)
+
+    def stats(self) -> dict:
+        return {
+            "running": self._thread is not None,
+            "queue_depth": self._queue.qsize(),
+            "emitted": self.emitted,
+            "sampled_out": self.sampled_out,
+            "dropped": self.dropped,
+            "exported": self.exported,
+            "export_errors": self.export_errors,
+            "sample_rates": self.sample_rates,
+        }
+
+
+def build_pipeline(target_logger: logging.Logger, exporter: str = "logger",
+                   file_path: str = "telemetry.jsonl", **kwargs) -> TelemetryPipeline:
+    """
+    Pipeline configuré : exporteur "logger", "file" ou "stdout"
+    """
+    if exporter == "file":
+        exporters = [FileExporter(file_path)]
+    elif exporter == "stdout":
+        exporters = [FileExporter("-")]
+    else:
+        exporters = [LoggerExporter(target_logger)]
+    return TelemetryPipeline(exporters, **kwargs)
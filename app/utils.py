@@ -0,0 +1,72 @@
+"""
+Utilitaires partagés par les endpoints de prédiction
+"""
+import hashlib
+from typing import Iterable, List
+
+import numpy as np
+
+# Ordre des colonnes attendu par le modèle (identique à l'entraînement)
+FEATURE_COLUMNS: List[str] = [
+    "CreditScore",
+    "Age",
+    "Tenure",
+    "Balance",
+    "NumOfProducts",
+    "HasCrCard",
+    "IsActiveMember",
+    "EstimatedSalary",
+    "Geography_Germany",
+    "Geography_Spain",
+]
+
+
+def features_to_row(features) -> tuple:
+    """
+    Extrait les features d'un client dans l'ordre du modèle
+    """
+    return tuple(getattr(features, col) for col in FEATURE_COLUMNS)
+
+
+def features_to_matrix(features_list: Iterable) -> np.ndarray:
+    """
+    Construit une matrice contiguë (n_clients x 10) en float64
+    """
+    rows = [features_to_row(f) for f in features_list]
+    if not rows:
+        return np.empty((0, len(FEATURE_COLUMNS)), dtype=np.float64)
+    return np.ascontiguousarray(rows, dtype=np.float64)
+
+
+def predict_churn_proba(model, X: np.ndarray, chunk_size: int = 0) -> np.ndarray:
+    """
+    Probabilité de churn (classe 1) pour chaque ligne de X
+
+    Un seul appel à predict_proba par bloc de `chunk_size` lignes
+    (0 = toute la matrice en un seul appel).
+    """
+    n_rows = X.shape[0]
+    if n_rows == 0:
+        return np.empty(0, dtype=np.float64)
+
+    if chunk_size <= 0 or n_rows <= chunk_size:
+        return np.asarray(model.predict_proba(X), dtype=np.float64)[:, 1]
+
+    probas = np.empty(n_rows, dtype=np.float64)
+    for start in range(0, n_rows, chunk_size):
+        stop = min(start + chunk_size, n_rows)
+        probas[start:stop] = np.asarray(
+            model.predict_proba(X[start:stop]), dtype=np.float64
+        )[:, 1]
+    return probas
+
+
+def file_version(path, length: int = 12) -> str:
+    """
+    Empreinte SHA-256 (tronquée) d'un artefact, utilisée comme version du modèle
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()[:length]
@@ -0,0 +1,110 @@
+"""
+Benchmark du chargement des CSV : inférence pandas vs schéma typé
+
+Un fichier synthétique au format de data/bank_churn.csv est généré (une
+fois) ; chaque variante le charge dans un interpréteur neuf qui mesure :
+- le temps de lecture
+- la mémoire du DataFrame
+- le pic de RSS du processus (ru_maxrss), interpréteur et imports compris
+
+Variantes :
+- "default"        : pd.read_csv sans type (int64 / float64)
+- "typed_float64"  : app.data_loader, décimaux en float64 (drift)
+- "typed_float32"  : app.data_loader, décimaux en float32 (entraînement)
+
+Usage :
+    python benchmarks/data_loader_benchmark.py --rows 10000000 --runs 3
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+
+PROBE = r"""
+import json, resource, sys, time
+import numpy as np
+import pandas as pd
+from app.data_loader import read_table
+
+path, variant = sys.argv[1], sys.argv[2]
+started = time.perf_counter()
+if variant == "default":
+    df = pd.read_csv(path)
+else:
+    df = read_table(path, float_dtype=np.float64 if variant == "typed_float64" else np.float32)
+elapsed = time.perf_counter() - started
+print(json.dumps({
+    "load_s": elapsed,
+    "frame_mb": df.memory_usage(deep=True).sum() / 2**20,
+    "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+}))
+"""
+
+VARIANTS = ("default", "typed_float64", "typed_float32")
+
+
+def make_file(path: Path, rows: int, seed: int = 42, block: int = 1_000_000):
+    """Même distribution que generate_data.py, écrite par blocs"""
+    rng = np.random.default_rng(seed)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    for start in range(0, rows, block):
+        n = min(block, rows - start)
+        df = pd.DataFrame({
+            "CreditScore": rng.integers(300, 850, n),
+            "Age": rng.integers(18, 80, n),
+            "Tenure": rng.integers(0, 11, n),
+            "Balance": rng.uniform(0, 200000, n),
+            "NumOfProducts": rng.integers(1, 5, n),
+            "HasCrCard": rng.integers(0, 2, n),
+            "IsActiveMember": rng.integers(0, 2, n),
+            "EstimatedSalary": rng.uniform(20000, 150000, n),
+            "Geography_Germany": rng.integers(0, 2, n),
+            "Geography_Spain": rng.integers(0, 2, n),
+            "Exited": rng.integers(0, 2, n),
+        })
+        df.to_csv(path, mode="w" if start == 0 else "a", header=start == 0, index=False)
+
+
+def run_once(path: Path, variant: str) -> dict:
+    output = subprocess.run(
+        [sys.executable, "-c", PROBE, str(path), variant],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=10_000_000)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--file", default=None, help="CSV synthétique (généré s'il n'existe pas)")
+    args = parser.parse_args()
+
+    path = Path(args.file or ROOT / "benchmarks" / "data" / f"bank_churn_{args.rows}.csv")
+    if not path.exists():
+        make_file(path, args.rows)
+
+    results = {}
+    for variant in VARIANTS:
+        runs = [run_once(path, variant) for _ in range(args.runs)]
+        results[variant] = {
+            "load_s": round(statistics.median(r["load_s"] for r in runs), 2),
+            "frame_mb": round(runs[0]["frame_mb"], 1),
+            "peak_rss_mb": round(max(r["peak_rss_mb"] for r in runs), 1),
+        }
+
+    print(json.dumps({"rows": args.rows, "runs": args.runs, "file": str(path), "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
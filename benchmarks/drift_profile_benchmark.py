@@ -0,0 +1,69 @@
+"""
+Benchmark du contrôle de drift avec et sans profil de référence
+
+- "stats" : statistiques de référence + tests (KS / chi²), sans rapport
+- "full"  : detect_drift complet (rapport JSON et histogrammes inclus)
+
+Usage :
+    python benchmarks/drift_profile_benchmark.py --runs 5
+"""
+import argparse
+import json
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import pandas as pd  # noqa: E402
+
+from app.drift_detect import compute_drift, detect_drift  # noqa: E402
+from app.drift_profile import ReferenceProfile, load_or_build  # noqa: E402
+
+
+def timed(fn, runs: int) -> float:
+    durations = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        fn()
+        durations.append((time.perf_counter() - started) * 1000)
+    return round(statistics.median(durations), 1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--reference", default=str(ROOT / "data" / "bank_churn.csv"))
+    parser.add_argument("--production", default=str(ROOT / "data" / "production_data.csv"))
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        profile_path = ReferenceProfile.from_csv(args.reference).save(Path(tmp) / "reference_profile.npz")
+        output_dir = Path(tmp) / "reports"
+
+        def stats(profile=None):
+            prod = pd.read_csv(args.production)
+            compute_drift(load_or_build(args.reference, profile), prod)
+
+        results = {
+            "runs": args.runs,
+            "stats_without_profile_ms": timed(lambda: stats(), args.runs),
+            "stats_with_profile_ms": timed(lambda: stats(profile_path), args.runs),
+            "full_without_profile_ms": timed(
+                lambda: detect_drift(args.reference, args.production, output_dir=output_dir), args.runs
+            ),
+            "full_with_profile_ms": timed(
+                lambda: detect_drift(args.reference, args.production, output_dir=output_dir,
+                                     profile_path=profile_path), args.runs
+            ),
+            "profile_size_kb": round(profile_path.stat().st_size / 1024, 1),
+        }
+    results["stats_speedup"] = round(results["stats_without_profile_ms"] / results["stats_with_profile_ms"], 2)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
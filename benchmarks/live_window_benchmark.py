@@ -0,0 +1,51 @@
+"""
+Coût ajouté au chemin de prédiction par la fenêtre du drift en ligne
+
+Mesure `LiveWindow.append` (copie des features servies et des
+probabilités) par taille de lot, avec et sans échantillonnage. En
+production, le même coût est visible dans /metrics :
+stage_duration_seconds{stage="live_window"}.
+
+Usage :
+    python benchmarks/live_window_benchmark.py --capacity 50000
+"""
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import numpy as np  # noqa: E402
+
+from app.live_drift import LiveWindow  # noqa: E402
+from app.utils import FEATURE_COLUMNS  # noqa: E402
+
+
+def per_call_us(window: LiveWindow, batch: int, calls: int) -> float:
+    X = np.random.default_rng(0).random((batch, len(FEATURE_COLUMNS)))
+    probas = X[:, 0].copy()
+    started = time.perf_counter()
+    for _ in range(calls):
+        window.append(X, probas)
+    return round((time.perf_counter() - started) / calls * 1e6, 2)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--capacity", type=int, default=50000)
+    args = parser.parse_args()
+
+    results = {"capacity": args.capacity}
+    for sample_rate in (1.0, 0.1):
+        window = LiveWindow(args.capacity, FEATURE_COLUMNS, sample_rate=sample_rate, seed=0)
+        for batch, calls in ((1, 100000), (100, 20000), (10000, 500)):
+            results[f"append_us_batch{batch}_rate{sample_rate}"] = per_call_us(window, batch, calls)
+        results["memory_mb"] = round(window.stats()["memory_bytes"] / 1e6, 2)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
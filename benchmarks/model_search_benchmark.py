@@ -0,0 +1,110 @@
+"""
+Benchmark de la recherche d'hyperparamètres : GridSearchCV vs successive halving
+
+Mêmes données (data/bank_churn.csv, split 80/20 stratifié), même grille
+RandomForest, même validation croisée ; pour chaque méthode : durée,
+nombre de fits et d'arbres, meilleur ROC AUC en CV et ROC AUC du modèle
+retenu sur le jeu de test. "forest_grid" (ForestGridSearch) doit donner
+exactement les scores de "grid" avec moitié moins d'arbres ajustés.
+
+- "--grid full"    : grille de train_model_mod.py (1 296 candidats, des heures)
+- "--grid reduced" : sous-grille de 24 candidats (quelques minutes)
+
+Usage :
+    python benchmarks/model_search_benchmark.py --grid reduced --folds 3
+    python benchmarks/model_search_benchmark.py --grid full --max-fits 600
+"""
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from sklearn.ensemble import RandomForestClassifier  # noqa: E402
+from sklearn.metrics import roc_auc_score  # noqa: E402
+from sklearn.model_selection import GridSearchCV, StratifiedKFold, train_test_split  # noqa: E402
+
+from app.data_loader import read_table  # noqa: E402
+from app.model_search import ForestGridSearch, SuccessiveHalvingSearch  # noqa: E402
+
+GRIDS = {
+    "full": {
+        'n_estimators': [100, 200, 300],
+        'max_depth': [10, 15, 20, None],
+        'min_samples_split': [2, 5, 10],
+        'min_samples_leaf': [1, 2, 4],
+        'max_features': ['sqrt', 'log2'],
+        'bootstrap': [True, False],
+        'class_weight': ['balanced', 'balanced_subsample', None],
+    },
+    "reduced": {
+        'n_estimators': [100, 200, 300],
+        'max_depth': [10, None],
+        'min_samples_leaf': [1, 4],
+        'max_features': ['sqrt'],
+        'class_weight': ['balanced', None],
+    },
+}
+
+
+def run(name: str, search, X_train, y_train, X_test, y_test, n_fits, n_trees) -> dict:
+    started = time.perf_counter()
+    search.fit(X_train, y_train)
+    elapsed = time.perf_counter() - started
+    return {
+        "method": name,
+        "seconds": round(elapsed, 1),
+        "fits": n_fits(search),
+        "trees": n_trees(search),
+        "best_cv_roc_auc": round(float(search.best_score_), 4),
+        "test_roc_auc": round(float(roc_auc_score(y_test, search.best_estimator_.predict_proba(X_test)[:, 1])), 4),
+        "best_params": search.best_params_,
+        "cv_scores": [float(score) for score in getattr(search, "cv_results_", {}).get("mean_test_score", [])],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--data", default=str(ROOT / "data" / "bank_churn.csv"))
+    parser.add_argument("--grid", choices=sorted(GRIDS), default="reduced")
+    parser.add_argument("--folds", type=int, default=5)
+    parser.add_argument("--max-fits", type=int, default=0)
+    parser.add_argument("--skip-grid", action="store_true", help="sans GridSearchCV ni ForestGridSearch")
+    args = parser.parse_args()
+
+    df = read_table(args.data)
+    X, y = df.drop(columns="Exited"), df["Exited"]
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42, stratify=y)
+    cv = StratifiedKFold(n_splits=args.folds, shuffle=True, random_state=42)
+    grid = GRIDS[args.grid]
+
+    results = []
+    if not args.skip_grid:
+        results.append(run(
+            "grid", GridSearchCV(RandomForestClassifier(random_state=42), grid, cv=cv, scoring="roc_auc"),
+            X_train, y_train, X_test, y_test, lambda s: len(s.cv_results_["params"]) * args.folds,
+            lambda s: sum(p["n_estimators"] for p in s.cv_results_["params"]) * args.folds,
+        ))
+        results.append(run(
+            "forest_grid", ForestGridSearch(RandomForestClassifier(random_state=42), grid, cv),
+            X_train, y_train, X_test, y_test, lambda s: s.n_fits_, lambda s: s.n_trees_,
+        ))
+        results[1]["same_scores"] = results[1]["cv_scores"] == results[0]["cv_scores"]
+    results.append(run(
+        "halving",
+        SuccessiveHalvingSearch(RandomForestClassifier(random_state=42), grid, cv, max_fits=args.max_fits),
+        X_train, y_train, X_test, y_test, lambda s: s.n_fits_, lambda s: s.n_trees_,
+    ))
+    for result in results:
+        result.pop("cv_scores", None)
+        if result is not results[0] and not args.skip_grid:
+            result["speedup"] = round(results[0]["seconds"] / result["seconds"], 2)
+
+    print(json.dumps({"grid": args.grid, "folds": args.folds, "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+Benchmark du démarrage de l'API (cold start)
+
+Chaque essai lance un interpréteur neuf qui mesure :
+- le temps d'import de app.main
+- le temps jusqu'à la première prédiction (startup FastAPI + POST /predict)
+- les modules lourds déjà importés avant la première requête
+
+Usage :
+    MODEL_PATH=model/churn_model.pkl python benchmarks/startup_benchmark.py --runs 5
+    python benchmarks/startup_benchmark.py --max-import-ms 1500   # échoue si régression
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Modules qui ne doivent pas être chargés par le chemin de prédiction
+HEAVY_MODULES = ["matplotlib", "seaborn", "scipy.stats", "pandas", "app.drift_detect"]
+
+PROBE = r"""
+import json, sys, time
+started = time.perf_counter()
+from app.main import app
+imported = time.perf_counter()
+loaded = [m for m in HEAVY_MODULES if m in sys.modules]
+
+from fastapi.testclient import TestClient
+customer = {
+    "CreditScore": 650, "Age": 35, "Tenure": 5, "Balance": 50000.0,
+    "NumOfProducts": 2, "HasCrCard": 1, "IsActiveMember": 1,
+    "EstimatedSalary": 75000.0, "Geography_Germany": 0, "Geography_Spain": 1,
+}
+with TestClient(app) as client:
+    status = client.post("/predict", json=customer).status_code
+first_prediction = time.perf_counter()
+
+print(json.dumps({
+    "import_ms": (imported - started) * 1000,
+    "first_prediction_ms": (first_prediction - started) * 1000,
+    "prediction_status": status,
+    "heavy_modules_loaded": loaded,
+}))
+"""
+
+
+def run_once(env: dict) -> dict:
+    code = f"HEAVY_MODULES = {HEAVY_MODULES!r}\n" + PROBE
+    output = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--max-import-ms", type=float, default=None,
+                        help="Échec si le temps d'import médian dépasse ce seuil")
+    parser.add_argument("--max-first-prediction-ms", type=float, default=None,
+                        help="Échec si le temps médian jusqu'à la première prédiction dépasse ce seuil")
+    args = parser.parse_args()
+
+    env = dict(os.environ)
+    # Pas d'envoi vers Application Insights ni de fichier de télémétrie pendant la mesure
+    env.pop("APPLICATIONINSIGHTS_CONNECTION_STRING", None)
+    env.setdefault("TELEMETRY_EXPORTER", "stdout")
+
+    runs = [run_once(env) for _ in range(args.runs)]
+    summary = {
+        "runs": len(runs),
+        "import_ms_median": round(statistics.median(r["import_ms"] for r in runs), 1),
+        "import_ms_min": round(min(r["import_ms"] for r in runs), 1),
+        "first_prediction_ms_median": round(statistics.median(r["first_prediction_ms"] for r in runs), 1),
+        "first_prediction_ms_min": round(min(r["first_prediction_ms"] for r in runs), 1),
+        "prediction_status": sorted({r["prediction_status"] for r in runs}),
+        "heavy_modules_loaded": sorted({m for r in runs for m in r["heavy_modules_loaded"]}),
+    }
+    print(json.dumps(summary, indent=2))
+
+    failures = []
+    if summary["heavy_modules_loaded"]:
+        failures.append(f"modules lourds importés au démarrage: {summary['heavy_modules_loaded']}")
+    if args.max_import_ms is not None and summary["import_ms_median"] > args.max_import_ms:
+        failures.append(f"import {summary['import_ms_median']} ms > {args.max_import_ms} ms")
+    if (args.max_first_prediction_ms is not None
+            and summary["first_prediction_ms_median"] > args.max_first_prediction_ms):
+        failures.append(
+            f"première prédiction {summary['first_prediction_ms_median']} ms > {args.max_first_prediction_ms} ms"
+        )
+    for failure in failures:
+        print(f"REGRESSION: {failure}", file=sys.stderr)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -4,6 +4,8 @@ Génère des données de production avec drift pour tester la détection
 import pandas as pd
 import numpy as np
 
+from app.data_loader import read_table
+
 def generate_drifted_data(original_file='data/bank_churn.csv', 
                           output_file='data/production_data.csv',
                           drift_level='medium'):
@@ -16,7 +18,7 @@ def generate_drifted_data(original_file='data/bank_churn.csv',
         drift_level: 'low', 'medium', 'high'
     """
     # Charger les données originales
-    df = pd.read_csv(original_file)
+    df = read_table(original_file, float_dtype=np.float64)
     prod_data = df.copy()
     
     # Paramètres de drift selon le niveau
@@ -88,7 +90,7 @@ def generate_drifted_data(original_file='data/bank_churn.csv',
     print(f"{'='*60}")
     
     # Comparaison des moyennes
-    original = pd.read_csv(original_file)
+    original = read_table(original_file, float_dtype=np.float64)
     
     for col in ['Age', 'CreditScore', 'Balance', 'EstimatedSalary']:
         orig_mean = original[col].mean()
@@ -2,6 +2,8 @@
 import pandas as pd
 import numpy as np
 
+from app.data_loader import csv_dtypes
+
 np.random.seed(42)
 n_samples = 10000
 
@@ -27,7 +29,7 @@ churn_prob = (
 )
 data['Exited'] = (np.random.random(n_samples) < churn_prob).astype(int)
 
-df = pd.DataFrame(data)
+df = pd.DataFrame(data).astype(csv_dtypes(np.float64))
 df.to_csv('data/bank_churn.csv', index=False)
 print(f"Dataset cree : {len(df)} lignes")
 print(f"Taux de churn : {df['Exited'].mean():.2%}")
\ No newline at end of file
@@ -0,0 +1,39 @@
+"""
+Configuration gunicorn pour le mode multi-workers
+
+    gunicorn -c gunicorn.conf.py app.main:app
+
+Le modèle est chargé une fois dans le processus maître (PRELOAD_MODEL)
+puis hérité par fork ; gc.freeze() évite que le ramasse-miettes des
+workers ne touche ces objets et ne duplique leurs pages (copy-on-write).
+Avec INFERENCE_ENGINE=compiled et MODEL_MMAP_DIR, les tableaux de la
+forêt sont en plus mappés depuis le disque et partagés via le page cache.
+Vérification : GET /diagnostics/memory.
+
+Les métriques Prometheus de tous les workers sont agrégées via
+METRICS_MULTIPROC_DIR (vidé au démarrage du maître).
+"""
+import gc
+import os
+
+from app.metrics import clear_multiproc_dir
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
+workers = int(os.getenv("WEB_CONCURRENCY", "1"))
+worker_class = "uvicorn.workers.UvicornWorker"
+preload_app = True
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "60"))
+
+# Chargement du modèle à l'import de app.main, donc dans le maître
+os.environ.setdefault("PRELOAD_MODEL", "true")
+# /metrics additionne les compteurs de tous les workers
+os.environ.setdefault("METRICS_MULTIPROC_DIR", "/tmp/bank-churn-metrics")
+
+
+def on_starting(server):
+    clear_multiproc_dir(os.environ["METRICS_MULTIPROC_DIR"])
+
+
+def pre_fork(server, worker):
+    # Objets du maître (modèle inclus) déplacés dans la génération permanente
+    gc.freeze()
@@ -0,0 +1,60 @@
+"""
+Scoring d'un gros fichier CSV / NDJSON via /predict/stream
+
+Le fichier est envoyé par morceaux et les résultats sont écrits au fil
+de l'eau : la mémoire reste constante quelle que soit la taille du fichier.
+
+Usage : python stream_predict.py data/production_data.csv predictions.csv
+"""
+import sys
+import time
+
+import requests
+
+API_BASE_URL = "http://localhost:8000"
+CHUNK_BYTES = 1 << 16
+
+
+def read_chunks(path, chunk_bytes=CHUNK_BYTES):
+    with open(path, "rb") as f:
+        while True:
+            chunk = f.read(chunk_bytes)
+            if not chunk:
+                break
+            yield chunk
+
+
+def stream_predict(input_file, output_file, api_url=API_BASE_URL):
+    """
+    Envoie `input_file` à /predict/stream et écrit la réponse dans `output_file`
+    """
+    is_csv = input_file.lower().endswith(".csv")
+    content_type = "text/csv" if is_csv else "application/x-ndjson"
+
+    n_lines = 0
+    with requests.post(
+        f"{api_url}/predict/stream",
+        data=read_chunks(input_file),
+        headers={"Content-Type": content_type},
+        stream=True,
+        timeout=600,
+    ) as response:
+        response.raise_for_status()
+        with open(output_file, "wb") as out:
+            for chunk in response.iter_content(chunk_size=CHUNK_BYTES):
+                out.write(chunk)
+                n_lines += chunk.count(b"\n")
+
+    return n_lines
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 3:
+        print("Usage: python stream_predict.py <input.csv|input.ndjson> <output> [api_url]")
+        sys.exit(1)
+
+    api_url = sys.argv[3] if len(sys.argv) > 3 else API_BASE_URL
+    start = time.time()
+    n_lines = stream_predict(sys.argv[1], sys.argv[2], api_url)
+    print(f"✅ {n_lines} lignes écrites dans {sys.argv[2]}")
+    print(f"⏱️ Durée totale : {time.time() - start:.2f}s")
@@ -5,6 +5,7 @@ import plotly.graph_objects as go
 import plotly.express as px
 from datetime import datetime
 import json
+import io
 
 # Configuration de la page
 st.set_page_config(
@@ -98,6 +99,22 @@ def check_api_health():
     except Exception as e:
         return {"error": str(e)}, 500
 
+# Latence moyenne reelle d'une route, lue sur /metrics (None si indisponible)
+def get_route_latency_ms(route="/predict"):
+    try:
+        text = requests.get(f"{API_URL}/metrics", timeout=5).text
+    except Exception:
+        return None
+    values = {}
+    for line in text.splitlines():
+        for suffix in ("_sum", "_count"):
+            prefix = f'http_request_duration_seconds{suffix}{{route="{route}"}} '
+            if line.startswith(prefix):
+                values[suffix] = float(line[len(prefix):])
+    if not values.get("_count"):
+        return None
+    return values["_sum"] / values["_count"] * 1000
+
 # Fonction pour faire une prediction
 def make_prediction(customer_data):
     try:
@@ -139,10 +156,10 @@ if page == "🏠 Dashboard":
     with col1:
         st.subheader("🌐 API Endpoints")
         endpoints_data = {
-            "Endpoint": ["Root", "Health", "Predict", "Batch Predict", "Drift Check", "Docs"],
-            "URL": ["/", "/health", "/predict", "/predict/batch", "/drift/check", "/docs"],
-            "Method": ["GET", "GET", "POST", "POST", "POST", "GET"],
-            "Status": ["✅", "✅", "✅", "✅", "✅", "✅"]
+            "Endpoint": ["Root", "Health", "Predict", "Batch Predict", "Stream Predict", "Drift Check", "Docs"],
+            "URL": ["/", "/health", "/predict", "/predict/batch", "/predict/stream", "/drift/check", "/docs"],
+            "Method": ["GET", "GET", "POST", "POST", "POST", "POST", "GET"],
+            "Status": ["✅", "✅", "✅", "✅", "✅", "✅", "✅"]
         }
         df_endpoints = pd.DataFrame(endpoints_data)
         st.dataframe(df_endpoints, use_container_width=True)
@@ -348,21 +365,29 @@ elif page == "📊 Batch Prediction":
         st.dataframe(df.head(10))
         
         if st.button("🚀 Lancer les predictions", type="primary"):
-            customers_list = df.to_dict('records')
-            
             with st.spinner("Predictions en cours..."):
                 try:
+                    # Envoi du CSV brut : l'API le score en flux, par blocs
                     response = requests.post(
-                        f"{API_URL}/predict/batch",
-                        json=customers_list,
-                        timeout=30
+                        f"{API_URL}/predict/stream",
+                        data=uploaded_file.getvalue(),
+                        headers={"Content-Type": "text/csv"},
+                        timeout=300
                     )
-                    result = response.json()
                     
                     if response.status_code == 200:
-                        predictions = result['predictions']
-                        df['Churn_Probability'] = [p['churn_probability'] for p in predictions]
-                        df['Prediction'] = [p['prediction'] for p in predictions]
+                        results = pd.read_csv(io.StringIO(response.text)).set_index("row").sort_index()
+                        scored = results[results["error"].isna()]
+                        predictions = [
+                            {"churn_probability": p, "prediction": int(c)}
+                            for p, c in zip(scored["churn_probability"], scored["prediction"])
+                        ]
+                        result = {"predictions": predictions, "count": len(predictions)}
+                        df['Churn_Probability'] = results["churn_probability"].values
+                        df['Prediction'] = results["prediction"].values
+                        
+                        if len(scored) < len(results):
+                            st.warning(f"⚠️ {len(results) - len(scored)} lignes invalides ignorees")
                         
                         st.success(f"✅ {result['count']} predictions effectuees avec succes!")
                         
@@ -399,7 +424,7 @@ elif page == "📊 Batch Prediction":
                             mime="text/csv"
                         )
                     else:
-                        st.error(f"❌ Erreur: {result}")
+                        st.error(f"❌ Erreur: {response.text}")
                 except Exception as e:
                     st.error(f"❌ Erreur lors de la prediction: {str(e)}")
 
@@ -419,13 +444,15 @@ elif page == "🔍 API Status":
     with col1:
         st.subheader("❤️ Health Check")
         if status_code == 200:
+            latency = get_route_latency_ms("/predict")
+            latency_text = f"{latency:.1f} ms (moyenne /predict)" if latency is not None else "n/a"
             st.markdown("""
             <div class="success-box">
             <strong>✅ API Status:</strong> Healthy<br>
             <strong>✅ Model:</strong> Loaded<br>
-            <strong>⏱️ Response Time:</strong> < 100ms
+            <strong>⏱️ Response Time:</strong> {latency}
             </div>
-            """, unsafe_allow_html=True)
+            """.format(latency=latency_text), unsafe_allow_html=True)
         else:
             st.markdown("""
             <div class="danger-box">
@@ -443,7 +470,9 @@ GET  /              - Root
 GET  /health        - Health check
 POST /predict       - Single prediction
 POST /predict/batch - Batch predictions
+POST /predict/stream - Streaming CSV / NDJSON predictions
 POST /drift/check   - Drift detection
+GET  /metrics       - Prometheus metrics
 GET  /docs          - API documentation
         """)
     
@@ -9,6 +9,7 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')
 
 from fastapi.testclient import TestClient
 from app.main import app
+import app.main as app_main
 
 # Données de test
 TEST_CUSTOMER = {
@@ -116,4 +117,566 @@ def test_batch_predict():
         assert response.status_code == 200
         data = response.json()
         assert "predictions" in data
-        assert data["count"] == 2
\ No newline at end of file
+        assert data["count"] == 2
+
+def test_batch_predict_matches_single_calls():
+    """Test que /predict/batch (un seul appel vectorisé) donne les mêmes scores que ligne par ligne"""
+    import numpy as np
+    from sklearn.ensemble import RandomForestClassifier
+    from app.utils import features_to_matrix
+    from app.models import CustomerFeatures
+
+    rng = np.random.RandomState(0)
+    batch_data = []
+    for _ in range(25):
+        customer = TEST_CUSTOMER.copy()
+        customer["Age"] = int(rng.randint(18, 90))
+        customer["Balance"] = float(rng.uniform(0, 200000))
+        customer["NumOfProducts"] = int(rng.randint(1, 5))
+        batch_data.append(customer)
+
+    X = features_to_matrix([CustomerFeatures(**c) for c in batch_data])
+    y = (X[:, 1] > 50).astype(int)
+    y[:2] = [0, 1]
+    rf = RandomForestClassifier(n_estimators=10, random_state=0).fit(X, y)
+
+    with patch('app.main.model', rf), patch('app.main.BATCH_CHUNK_SIZE', 7):
+        client = TestClient(app)
+        response = client.post("/predict/batch", json=batch_data)
+
+    assert response.status_code == 200
+    expected = [round(float(rf.predict_proba(X[i:i + 1])[0][1]), 4) for i in range(len(X))]
+    assert [p["churn_probability"] for p in response.json()["predictions"]] == expected
+
+
+def test_microbatcher_groups_concurrent_requests():
+    """Test que le micro-batcher regroupe les prédictions concurrentes"""
+    import numpy as np
+    from concurrent.futures import ThreadPoolExecutor
+    from app.batching import MicroBatcher
+
+    calls = []
+
+    def fake_predict(X, context):
+        calls.append(len(X))
+        return X[:, 0] / 1000.0
+
+    batcher = MicroBatcher(fake_predict, max_batch_size=8, max_wait_ms=50)
+    batcher.start()
+    try:
+        with ThreadPoolExecutor(max_workers=16) as executor:
+            rows = [np.array([float(i)] + [0.0] * 9) for i in range(32)]
+            results = list(executor.map(batcher.submit, rows))
+    finally:
+        batcher.stop()
+
+    assert results == [i / 1000.0 for i in range(32)]
+    assert sum(calls) == 32
+    assert len(calls) < 32
+    assert max(calls) <= 8
+
+    stats = batcher.stats()
+    assert stats["rows"] == 32
+    assert stats["queue_depth"] == 0
+    assert sum(stats["batch_size_histogram"].values()) == stats["batches"]
+
+
+def test_prediction_cache_lru_and_invalidation():
+    """Test l'éviction LRU, l'expiration TTL et l'invalidation par version"""
+    from app.cache import PredictionCache
+
+    cache = PredictionCache(max_size=2, ttl_seconds=0)
+    cache.invalidate("v1")
+    cache.put("v1", "a", 0.1)
+    cache.put("v1", "b", 0.2)
+    assert cache.get("v1", "a") == 0.1   # "a" devient la plus récente
+    cache.put("v1", "c", 0.3)            # évince "b"
+    assert cache.get("v1", "b") is None
+    assert cache.get("v2", "a") is None  # autre version du modèle
+
+    cache.invalidate("v2")
+    assert cache.get("v2", "a") is None
+    cache.put("v1", "a", 0.1)            # résultat d'un ancien modèle ignoré
+    assert cache.stats()["size"] == 0
+
+    stats = cache.stats()
+    assert stats["evictions"] == 1
+    assert stats["hits"] == 1
+
+
+def test_batch_predict_uses_cache_for_duplicates():
+    """Test que les lignes dupliquées (dans et entre les lots) ne sont scorées qu'une fois"""
+    import numpy as np
+    from app.cache import PredictionCache
+
+    other = TEST_CUSTOMER.copy()
+    other["Age"] = 60
+    cache = PredictionCache(max_size=100)
+    cache.invalidate("test-version")
+
+    scored_rows = []
+
+    def fake_proba(X):
+        scored_rows.append(len(X))
+        return np.column_stack([1 - X[:, 1] / 100, X[:, 1] / 100])
+
+    with patch('app.main.model') as mock_model, \
+            patch('app.main.prediction_cache', cache):
+        mock_model.predict_proba.side_effect = fake_proba
+        app_main._active = (mock_model, "test-version")
+        client = TestClient(app)
+
+        first = client.post("/predict/batch", json=[TEST_CUSTOMER, other, TEST_CUSTOMER])
+        second = client.post("/predict/batch", json=[other, TEST_CUSTOMER])
+        single = client.post("/predict", json=TEST_CUSTOMER)
+
+    app_main._active = (None, None)
+    assert first.status_code == second.status_code == single.status_code == 200
+    assert single.json()["model_version"] == "test-version"
+    assert scored_rows == [2]
+    assert [p["churn_probability"] for p in first.json()["predictions"]] == [0.35, 0.6, 0.35]
+    assert [p["churn_probability"] for p in second.json()["predictions"]] == [0.6, 0.35]
+    assert single.json()["churn_probability"] == 0.35
+
+
+def test_predict_stream_ndjson_and_csv():
+    """Test /predict/stream en NDJSON et en CSV, avec une ligne invalide"""
+    import numpy as np
+
+    invalid = TEST_CUSTOMER.copy()
+    invalid["CreditScore"] = 250
+    ndjson_body = "\n".join(json.dumps(c) for c in [TEST_CUSTOMER, invalid, TEST_CUSTOMER]) + "\n"
+    csv_body = ",".join(TEST_CUSTOMER) + "\n" + "\n".join(
+        ",".join(str(v) for v in TEST_CUSTOMER.values()) for _ in range(3)
+    )
+
+    def chunked(body, size=17):
+        for i in range(0, len(body), size):
+            yield body[i:i + size].encode()
+
+    with patch('app.main.model') as mock_model, patch('app.main.STREAM_CHUNK_SIZE', 2):
+        mock_model.predict_proba.side_effect = lambda X: np.tile([0.3, 0.7], (len(X), 1))
+        client = TestClient(app)
+
+        response = client.post("/predict/stream", content=chunked(ndjson_body),
+                               headers={"Content-Type": "application/x-ndjson"})
+        assert response.status_code == 200
+        lines = [json.loads(l) for l in response.text.splitlines()]
+        assert sorted(l["row"] for l in lines) == [0, 1, 2]
+        assert [l for l in lines if l["row"] == 1][0]["error"].startswith("CreditScore")
+        assert all(l["churn_probability"] == 0.7 for l in lines if l["row"] != 1)
+
+        response = client.post("/predict/stream", content=chunked(csv_body),
+                               headers={"Content-Type": "text/csv"})
+        assert response.status_code == 200
+        rows = response.text.splitlines()
+        assert rows[0] == "row,churn_probability,prediction,error,model_version"
+        assert rows[1:] == ["0,0.7,1,,", "1,0.7,1,,", "2,0.7,1,,"]
+
+        # Octets UTF-8 invalides : erreur sur la ligne seule, le flux continue
+        body = (json.dumps(TEST_CUSTOMER) + "\n").encode() + b'{"CreditScore": "\xff"}\n' + \
+            (json.dumps(TEST_CUSTOMER) + "\n").encode()
+        response = client.post("/predict/stream", content=body, headers={"Content-Type": "application/x-ndjson"})
+        lines = [json.loads(l) for l in response.text.splitlines()]
+        assert sorted(l["row"] for l in lines) == [0, 1, 2]
+        assert "utf-8" in [l for l in lines if l["row"] == 1][0]["error"]
+
+    # Échec du scoring au milieu du flux : erreurs sur les lignes du bloc, suite scorée, événements émis
+    calls = []
+
+    def flaky_score(X):
+        calls.append(len(X))
+        if len(calls) == 2:
+            raise RuntimeError("model crashed")
+        return np.full(len(X), 0.7), "v1"
+
+    ndjson_body = "\n".join(json.dumps(TEST_CUSTOMER) for _ in range(5)) + "\n"
+    with patch('app.main.model'), patch('app.main.STREAM_CHUNK_SIZE', 2), \
+            patch('app.main.score_matrix', flaky_score), patch.object(app_main.telemetry, 'emit') as emit:
+        response = TestClient(app).post("/predict/stream", content=ndjson_body,
+                                        headers={"Content-Type": "application/x-ndjson"})
+    lines = [json.loads(l) for l in response.text.splitlines()]
+    assert [l["row"] for l in lines] == [0, 1, 2, 3, 4]
+    assert [l.get("error") for l in lines] == [None, None, "Scoring failed: model crashed",
+                                               "Scoring failed: model crashed", None]
+    events = {call.args[0]: call.args[1] for call in emit.call_args_list}
+    assert events["stream_prediction_error"]["first_row"] == 2
+    assert events["stream_prediction"]["count"] == 3 and events["stream_prediction"]["errors"] == 2
+
+
+def test_predict_columnar_raw_buffer():
+    """Test /predict/columnar avec un buffer float64 et un ordre de colonnes déclaré"""
+    import numpy as np
+    from app.utils import FEATURE_COLUMNS
+
+    columns = list(reversed(FEATURE_COLUMNS))
+    X = np.array([[TEST_CUSTOMER[c] for c in columns]] * 3, dtype="<f8")
+    X[1, columns.index("Age")] = 70
+
+    with patch('app.main.model') as mock_model:
+        mock_model.predict_proba.side_effect = lambda M: np.column_stack([1 - M[:, 1] / 100, M[:, 1] / 100])
+        client = TestClient(app)
+
+        response = client.post("/predict/columnar", content=X.tobytes(), headers={
+            "Content-Type": "application/octet-stream",
+            "X-Columns": ",".join(columns),
+        })
+        assert response.status_code == 200
+        assert np.frombuffer(response.content, dtype="<f8").tolist() == [0.35, 0.7, 0.35]
+
+        X[2, columns.index("CreditScore")] = 250
+        response = client.post("/predict/columnar", content=X.tobytes(), headers={
+            "Content-Type": "application/octet-stream",
+            "X-Columns": ",".join(columns),
+        })
+        assert response.status_code == 422
+        assert response.json()["detail"][0]["column"] == "CreditScore"
+        assert response.json()["detail"][0]["first_rows"] == [2]
+
+
+def test_predict_columnar_arrow():
+    """Test /predict/columnar avec un flux Arrow IPC"""
+    import numpy as np
+    import pytest
+    pa = pytest.importorskip("pyarrow")
+
+    table = pa.table({k: [v, v] for k, v in TEST_CUSTOMER.items()})
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+
+    with patch('app.main.model') as mock_model:
+        mock_model.predict_proba.side_effect = lambda M: np.tile([0.3, 0.7], (len(M), 1))
+        client = TestClient(app)
+        response = client.post("/predict/columnar", content=sink.getvalue().to_pybytes(),
+                               headers={"Content-Type": "application/vnd.apache.arrow.stream"})
+
+    assert response.status_code == 200
+    result = pa.ipc.open_stream(response.content).read_all()
+    assert result.column("churn_probability").to_pylist() == [0.7, 0.7]
+    assert result.column("prediction").to_pylist() == [1, 1]
+
+    # Colonne texte ou liste : requête mal formée (400), jamais décodée en silence
+    for bad in (["x", "y"], [[1.0], [2.0]]):
+        table = pa.table({**{k: [v, v] for k, v in TEST_CUSTOMER.items()}, "CreditScore": bad})
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        with patch('app.main.model'):
+            response = client.post("/predict/columnar", content=sink.getvalue().to_pybytes(),
+                                   headers={"Content-Type": "application/vnd.apache.arrow.stream"})
+        assert response.status_code == 400
+        assert "CreditScore" in response.json()["detail"]
+
+
+def test_telemetry_pipeline_sampling_and_summary(tmp_path):
+    """Test l'export par lots, l'échantillonnage et les agrégats de la télémétrie"""
+    from app.telemetry import TelemetryPipeline, FileExporter
+
+    class FailingExporter:
+        def export(self, records):
+            raise RuntimeError("exporter down")
+
+        def close(self):
+            pass
+
+    out = tmp_path / "telemetry.jsonl"
+    pipeline = TelemetryPipeline(
+        [FileExporter(str(out)), FailingExporter()],
+        flush_interval=0.05,
+        sample_rates={"prediction": 0.0},
+    )
+    pipeline.start()
+    for proba, risk in [(0.1, "Low"), (0.5, "Medium"), (0.9, "High")]:
+        pipeline.emit("prediction", {"probability": proba, "risk_level": risk})
+    pipeline.count_predictions([0.05, 0.95])
+    pipeline.emit("batch_prediction", {"count": 2})
+    pipeline.stop()
+
+    records = [json.loads(line) for line in out.read_text().splitlines()]
+    names = [r["name"] for r in records]
+    assert "prediction" not in names
+    assert "batch_prediction" in names
+
+    summary = [r for r in records if r["name"] == "prediction_summary"][0]["custom_dimensions"]
+    assert summary["predictions"] == 5
+    assert summary["predictions_by_risk"] == {"Low": 2, "Medium": 1, "High": 2}
+    assert summary["probability_histogram"]["0.9-1.0"] == 2
+
+    stats = pipeline.stats()
+    assert stats["sampled_out"] == 3
+    assert stats["export_errors"] >= 1
+
+    # Émissions concurrentes : aucun incrément perdu ; exporteur lent fermé seulement après son dernier lot
+    import threading
+    import time
+    from concurrent.futures import ThreadPoolExecutor
+
+    class SlowExporter:
+        def __init__(self):
+            self.closed = False
+            self.written_after_close = False
+            self.done = threading.Event()
+
+        def export(self, records):
+            time.sleep(0.2)
+            self.written_after_close |= self.closed
+
+        def close(self):
+            self.closed = True
+            self.done.set()
+
+    slow = SlowExporter()
+    pipeline = TelemetryPipeline([slow], max_queue=500, flush_interval=0.05, sample_rates={"prediction": 0.5})
+    pipeline.start()
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(lambda i: pipeline.emit("prediction", {"probability": 0.5}), range(2000)))
+    stats = pipeline.stats()
+    assert stats["emitted"] + stats["dropped"] + stats["sampled_out"] == 2000
+    pipeline.stop(timeout=0.01)
+    assert not slow.closed and pipeline.stats()["running"]
+    assert slow.done.wait(10) and not slow.written_after_close
+
+
+def test_admin_reload_swaps_model_and_rejects_bad_artifact(tmp_path):
+    """Test du rechargement à chaud : échange validé, artefact invalide refusé"""
+    import joblib
+    from sklearn.ensemble import RandomForestClassifier
+    from app.hot_reload import ModelReloader, warmup_batch
+
+    X = warmup_batch(200, seed=1)
+    good = tmp_path / "good.pkl"
+    joblib.dump(RandomForestClassifier(n_estimators=5, random_state=0).fit(X, X[:, 1] > 40), good)
+    bad = tmp_path / "bad.pkl"
+    joblib.dump({"not": "a model"}, bad)
+
+    client = TestClient(app)
+    headers = {"X-Admin-Token": "secret"}
+    previous = (app_main.model, app_main._active)
+    assert client.post("/admin/model/reload", params={"path": str(good)}).status_code == 503
+    try:
+        with patch('app.main.ADMIN_TOKEN', "secret"), patch('app.main.MODEL_DIR', str(tmp_path)), \
+                patch.object(app_main.reloader, 'request_path', str(tmp_path / "reload.json")):
+            assert client.post("/admin/model/reload", params={"path": str(good)}).status_code == 403
+            outside = client.post("/admin/model/reload", params={"path": str(tmp_path / ".." / "x.pkl")},
+                                  headers=headers)
+            assert outside.status_code == 403
+
+            response = client.post("/admin/model/reload", params={"path": str(good), "wait": True}, headers=headers)
+            assert response.status_code == 202
+            assert response.json()["state"] == "succeeded"
+            assert response.json()["broadcast"] is True
+            version = response.json()["version"]
+
+            status = client.get("/admin/model", headers=headers).json()
+            assert status["model_version"] == version
+            assert client.post("/predict", json=TEST_CUSTOMER).json()["model_version"] == version
+
+            # Autre worker : recharge le même artefact à la lecture de la demande partagée
+            swapped = []
+            worker = ModelReloader(app_main._reload_candidate, lambda m, v: swapped.append(v),
+                                   request_path=str(tmp_path / "reload.json"))
+            worker._last_request = None
+            worker.poll()
+            worker._worker.join()
+            assert swapped == [version]
+
+            request_signature = os.stat(tmp_path / "reload.json").st_mtime_ns
+            response = client.post("/admin/model/reload", params={"path": str(bad), "wait": True}, headers=headers)
+            assert response.status_code == 422
+            assert app_main.reloader.status()["state"] == "failed"
+            assert os.stat(tmp_path / "reload.json").st_mtime_ns == request_signature
+            assert client.get("/admin/model", headers=headers).json()["model_version"] == version
+    finally:
+        app_main.model, app_main._active = previous
+
+
+def test_import_does_not_load_drift_stack():
+    """Test que le démarrage de l'API n'importe pas la pile drift / visualisation"""
+    import subprocess
+    code = (
+        "import sys, app.main; "
+        "print(','.join(m for m in ('matplotlib', 'seaborn', 'scipy.stats', 'pandas', 'app.drift_detect') "
+        "if m in sys.modules))"
+    )
+    root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+    result = subprocess.run(
+        [sys.executable, "-c", code], cwd=root, capture_output=True, text=True, check=True
+    )
+    assert result.stdout.strip().splitlines()[-1:] in ([], [""])
+
+
+def test_metrics_endpoint_routes_stages_and_multiprocess(tmp_path):
+    """Test de /metrics : compteurs par route, étapes internes, agrégation multi-workers"""
+    import numpy as np
+    from app.metrics import MetricsRegistry, SNAPSHOT_PREFIX
+
+    with patch('app.main.model') as mock_model:
+        mock_model.predict_proba.return_value = np.array([[0.2, 0.8]])
+        client = TestClient(app)
+        assert client.post("/predict", json=TEST_CUSTOMER).status_code == 200
+        assert client.post("/predict", json={"Age": 10}).status_code == 422
+
+    text = client.get("/metrics").text
+    assert 'http_requests_total{route="/predict",method="POST",status="200"}' in text
+    assert 'http_request_errors_total{route="/predict",status="422"}' in text
+    assert 'http_request_duration_seconds_bucket{route="/predict",le="+Inf"}' in text
+    for stage in ("validation", "matrix", "predict_proba", "logging"):
+        assert f'stage_duration_seconds_count{{stage="{stage}"}}' in text
+
+    registry = MetricsRegistry(multiproc_dir=str(tmp_path))
+    registry.inc("http_requests_total", (("route", "/predict"), ("method", "POST"), ("status", "200")), 2)
+    # Instantané d'un autre worker
+    other = [["http_requests_total", [["route", "/predict"], ["method", "POST"], ["status", "200"]], 3.0]]
+    (tmp_path / f"{SNAPSHOT_PREFIX}999999.json").write_text(json.dumps(other))
+    assert 'http_requests_total{route="/predict",method="POST",status="200"} 5' in registry.render()
+
+
+def test_drift_jobs_run_in_background_and_cancel(tmp_path):
+    """Test des jobs de drift : exécution en processus séparé, annulation d'un job en attente"""
+    import time
+    import pandas as pd
+    from app.drift_jobs import DriftJobRunner
+
+    data_dir = os.path.join(os.path.dirname(__file__), '..', 'data')
+    ref = tmp_path / "ref.csv"
+    prod = tmp_path / "prod.csv"
+    pd.read_csv(os.path.join(data_dir, 'bank_churn.csv')).head(300).to_csv(ref, index=False)
+    pd.read_csv(os.path.join(data_dir, 'production_data.csv')).head(300).to_csv(prod, index=False)
+
+    completed = []
+    runner = DriftJobRunner(max_workers=1, on_complete=completed.append)
+    runner.start()
+    try:
+        params = dict(reference_file=str(ref), production_file=str(prod), output_dir=str(tmp_path / "out"))
+        # Paramètres non picklables : ce job échoue, les suivants tournent quand même
+        unpicklable = runner.submit(**params, on_row=lambda row: row)
+        first = runner.submit(**params)
+        second = runner.submit(**params)
+        assert runner.cancel(second["id"])["status"] == "cancelled"
+
+        deadline = time.time() + 120
+        while runner.get(first["id"])["status"] in ("queued", "running") and time.time() < deadline:
+            time.sleep(0.1)
+        job = runner.get(first["id"])
+        assert job["status"] == "succeeded", job["error"]
+        assert "Age" in job["result"]
+        failed = runner.get(unpicklable["id"])
+        assert failed["status"] == "failed" and "pickle" in failed["error"]
+        assert [j["id"] for j in completed] == [unpicklable["id"], first["id"]]
+    finally:
+        runner.stop()
+
+    client = TestClient(app)
+    assert client.get("/drift/jobs/unknown").status_code == 404
+
+
+def test_drift_report_plots_rendered_on_demand_and_cached(tmp_path):
+    """Test des graphiques de drift : aucun PNG au contrôle, rendu à la demande puis servi du cache"""
+    from app.drift_detect import detect_drift
+
+    data_dir = os.path.join(os.path.dirname(__file__), '..', 'data')
+    detect_drift(
+        os.path.join(data_dir, 'bank_churn.csv'), os.path.join(data_dir, 'production_data.csv'),
+        output_dir=tmp_path, report_id="test_report"
+    )
+    report = json.loads((tmp_path / "drift_report_test_report.json").read_text())
+    assert len(report["histograms"]["Age"]["edges"]) == 31
+    assert not list(tmp_path.rglob("*.png"))
+
+    client = TestClient(app)
+    with patch('app.main.DRIFT_REPORTS_DIR', str(tmp_path)):
+        try:
+            first = client.get("/drift/reports/test_report/plots?wait=120")
+            assert first.status_code == 200
+            assert first.headers["content-type"] == "image/png"
+            assert first.headers["x-plot-cache"] == "miss"
+            assert first.content.startswith(b"\x89PNG")
+
+            second = client.get("/drift/reports/test_report/plots")
+            assert second.headers["x-plot-cache"] == "hit"
+            assert second.content == first.content
+            assert client.get("/drift/reports/test_report/plots?kind=heatmap&wait=120").status_code == 200
+        finally:
+            app_main.plot_runner.stop()
+
+        assert client.get("/drift/reports/missing/plots").status_code == 404
+        assert client.get("/drift/reports/..%2Fsecret/plots").status_code == 404
+
+
+def test_drift_history_import_query_and_retention(tmp_path):
+    """Test de l'historique de drift : import des rapports existants, série d'une feature, rétention"""
+    from app.drift_history import DriftHistoryStore
+
+    for stamp, p_value in (("20250101_000000", 0.2), ("20250102_000000", 0.01), ("20250103_000000", 0.03)):
+        # Anciens rapports : sans report_id (repris du nom de fichier)
+        (tmp_path / f"drift_report_{stamp}.json").write_text(json.dumps({
+            "timestamp": f"{stamp[:4]}-{stamp[4:6]}-{stamp[6:8]}T00:00:00",
+            "threshold": 0.05,
+            "drift_percentage": 0.0,
+            "results": {"Age": {"type": "continuous", "p_value": p_value, "statistic": 0.1,
+                                "drift_detected": p_value < 0.05}},
+        }))
+    store = DriftHistoryStore(tmp_path / "history.db", max_runs=2)
+
+    client = TestClient(app)
+    headers = {"X-Admin-Token": "secret"}
+    with patch('app.main.DRIFT_REPORTS_DIR', str(tmp_path)), patch('app.main.drift_history', store), \
+            patch('app.main.ADMIN_TOKEN', "secret"):
+        imported = client.post("/admin/drift/history/import", headers=headers).json()
+        assert imported["imported"] == 3
+        assert client.post("/admin/drift/history/import", headers=headers).json()["skipped"] == 2
+
+        history = client.get("/drift/history?feature=Age&since=2025-01-01T12:00:00").json()
+        assert [point["ts_ms"] for point in history["points"]] == [1735776000000, 1735862400000]
+        assert [point["drift_detected"] for point in history["points"]] == [True, True]
+        assert client.get("/drift/history").json()["count"] == 2
+        assert client.get("/drift/history?since=yesterday").status_code == 422
+
+    # Le contrôle le plus ancien sort de la rétention avec son rapport
+    assert not (tmp_path / "drift_report_20250101_000000.json").exists()
+
+
+def test_drift_check_single_flight_and_result_cache(tmp_path):
+    """Test du cache des contrôles de drift : un seul calcul par clé, hit ensuite, clé liée aux fichiers"""
+    from app.drift_cache import DriftResultCache
+    from app.drift_jobs import JobNotFound
+
+    job = {"id": "job1", "kind": "run_detect_drift", "status": "queued", "params": {"report_id": "r1"}}
+    runner = Mock(running=True)
+    runner.submit.return_value = job
+    runner.get.side_effect = lambda job_id: dict(job)
+    cache = DriftResultCache(4)
+
+    client = TestClient(app)
+    with patch('app.main.drift_runner', runner), patch('app.main.drift_result_cache', cache), \
+            patch('app.main._record_drift_history'):
+        assert client.post("/drift/check").json()["cache"] == "miss"
+        assert client.post("/drift/check").json()["cache"] == "shared"
+        assert runner.submit.call_count == 1
+
+        job.update(status="succeeded", result={"Age": {"drift_detected": True, "p_value": 0.01}})
+        app_main._on_drift_job_complete(dict(job))
+        cached = client.post("/drift/check")
+        assert cached.status_code == 200
+        assert cached.json()["cache"] == "hit"
+        assert cached.json()["features_drifted"] == 1
+
+        # Job oublié par l'historique borné du runner : son statut reste servi depuis le cache
+        runner.get.side_effect = JobNotFound("job1")
+        polled = client.get(cached.json()["status_url"])
+        assert polled.status_code == 200
+        assert polled.json()["results"]["Age"]["p_value"] == 0.01
+        assert client.get("/drift/jobs/other").status_code == 404
+        runner.get.side_effect = lambda job_id: dict(job)
+        assert client.post("/drift/check?threshold=0.01").json()["cache"] == "miss"
+        assert runner.submit.call_count == 2
+
+    # Un fichier de données modifié change la clé
+    reference, production = tmp_path / "ref.csv", tmp_path / "prod.csv"
+    reference.write_text("a\n1\n")
+    production.write_text("a\n1\n")
+    key = cache.key(reference, production, tmp_path / "missing.npz", threshold=0.05)
+    assert cache.key(reference, production, tmp_path / "missing.npz", threshold=0.05) == key
+    production.write_text("a\n1\n2\n")
+    assert cache.key(reference, production, tmp_path / "missing.npz", threshold=0.05) != key
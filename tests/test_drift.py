@@ -0,0 +1,217 @@
+# tests/test_drift.py - Détection de drift
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pandas as pd
+import pytest
+
+from app.drift_detect import compute_drift
+from app.drift_profile import ReferenceProfile, load_or_build
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), '..', 'data')
+REFERENCE_FILE = os.path.join(DATA_DIR, 'bank_churn.csv')
+PRODUCTION_FILE = os.path.join(DATA_DIR, 'production_data.csv')
+
+
+@pytest.fixture(scope="module")
+def production_data():
+    return pd.read_csv(PRODUCTION_FILE)
+
+
+def test_reference_profile_roundtrip_matches_csv(tmp_path, production_data):
+    """Test que le profil sauvegardé donne exactement les résultats calculés depuis le CSV"""
+    from_csv = ReferenceProfile.from_csv(REFERENCE_FILE)
+    path = from_csv.save(tmp_path / "reference_profile.npz")
+    loaded = load_or_build(REFERENCE_FILE, path)
+
+    assert loaded.source_version == from_csv.source_version
+    assert "Exited" not in loaded.features
+    assert compute_drift(loaded, production_data) == compute_drift(from_csv, production_data)
+
+
+def test_reference_profile_ignored_when_reference_changes(tmp_path):
+    """Test qu'un profil construit sur un autre fichier de référence n'est pas utilisé"""
+    other = tmp_path / "other.csv"
+    pd.read_csv(REFERENCE_FILE).head(500).to_csv(other, index=False)
+    path = ReferenceProfile.from_csv(other).save(tmp_path / "reference_profile.npz")
+
+    profile = load_or_build(REFERENCE_FILE, path)
+    assert profile.n_rows == 10000
+
+
+def test_live_window_is_bounded_and_chronological():
+    """Test de la fenêtre circulaire : capacité fixe, ordre chronologique après rotation"""
+    import numpy as np
+    from app.live_drift import LiveWindow
+
+    window = LiveWindow(capacity=5, columns=["a", "b"])
+    for start in (0, 3, 6):
+        X = np.arange(start, start + 3, dtype=np.float64).repeat(2).reshape(-1, 2)
+        window.append(X, X[:, 0] / 10)
+
+    X, probas, _ = window.snapshot()
+    assert X[:, 0].tolist() == [4, 5, 6, 7, 8]
+    assert probas.tolist() == [0.4, 0.5, 0.6, 0.7, 0.8]
+    assert window.snapshot(2)[0][:, 1].tolist() == [7, 8]
+
+    window.append(np.arange(20, dtype=np.float64).repeat(2).reshape(-1, 2), np.zeros(20))
+    assert window.snapshot()[0][:, 0].tolist() == [15, 16, 17, 18, 19]
+    stats = window.stats()
+    assert stats["size"] == 5 and stats["rows_seen"] == 29
+
+
+def test_live_drift_psi_and_tests_against_profile(production_data):
+    """Test de l'évaluation en ligne : PSI ~0 sur la référence, tests KS / chi² présents"""
+    import numpy as np
+    from app.live_drift import run_live_drift
+    from app.utils import FEATURE_COLUMNS
+
+    profile = ReferenceProfile.from_csv(REFERENCE_FILE)
+    reference = pd.read_csv(REFERENCE_FILE)
+    assert profile.psi("Age", reference["Age"].to_numpy()) < 1e-9
+
+    X = production_data[FEATURE_COLUMNS].to_numpy(dtype=np.float64)[:2000]
+    report = run_live_drift(
+        (X, np.full(len(X), 0.3), np.full(len(X), 1.7e9)), FEATURE_COLUMNS, REFERENCE_FILE, window=2000
+    )
+    assert report["window"]["rows"] == 2000
+    assert report["features_analyzed"] == len(FEATURE_COLUMNS)
+    assert {"p_value", "psi", "psi_level"} <= set(report["results"]["Age"])
+    assert report["predictions"]["positive_rate"] == 0.0
+
+
+def test_kll_sketch_rank_error_and_merge():
+    """Test du sketch KLL : erreur de rang sous la borne, fusion équivalente"""
+    import numpy as np
+    from app.sketches import KLLSketch, rank_error
+
+    values = np.random.default_rng(0).exponential(1.0, 200_000)
+    sketch = KLLSketch(k=200, seed=0)
+    for chunk in np.array_split(values, 13):
+        sketch.update(chunk)
+    left, right = KLLSketch(k=200, seed=1), KLLSketch(k=200, seed=2)
+    left.update(values[:90_000])
+    right.update(values[90_000:])
+    left.merge(right)
+
+    ordered = np.sort(values)
+    points = ordered[::500]
+    exact = np.searchsorted(ordered, points, side="right") / len(values)
+    for s in (sketch, left):
+        assert s.n == len(values)
+        assert s.size < 5 * 200
+        assert np.max(np.abs(s.cdf(points) - exact)) <= rank_error(200)
+
+
+def test_streaming_drift_matches_full_within_bounds(tmp_path):
+    """Test du mode streaming : chi² exact, KS dans la borne d'erreur, exact si non compacté"""
+    from app.drift_detect import compute_drift_streaming
+
+    profile = ReferenceProfile.from_csv(REFERENCE_FILE)
+    full, _ = compute_drift(profile, pd.read_csv(PRODUCTION_FILE))
+
+    approx, _, _, info = compute_drift_streaming(profile, PRODUCTION_FILE, chunk_size=1500, sketch_k=200)
+    assert info["rows"] == 10000 and info["chunks"] == 7
+    for col, result in full.items():
+        if result["type"] == "categorical":
+            assert approx[col] == result
+        else:
+            assert abs(approx[col]["statistic"] - result["statistic"]) <= approx[col]["statistic_error_bound"]
+            assert abs(approx[col]["prod_mean"] - result["prod_mean"]) < 1e-6
+
+    exact, _, _, _ = compute_drift_streaming(profile, PRODUCTION_FILE, chunk_size=4000, sketch_k=20000)
+    assert all(exact[col]["p_value"] == full[col]["p_value"] for col in full)
+
+
+def test_vectorized_drift_stats_match_scipy():
+    """Test du moteur vectorisé : KS identique à ks_2samp, chi² identique à chi2_contingency"""
+    import numpy as np
+    from scipy.stats import chi2_contingency, ks_2samp
+    from app.drift_stats import chi2_columns, ks_2samp_columns
+
+    rng = np.random.default_rng(0)
+    reference = [np.sort(rng.normal(size=800)), np.sort(rng.integers(0, 30, 500).astype(float))]
+    for rows in (300, 20_000):
+        prod = np.column_stack([rng.normal(0.1, 1, rows), rng.integers(2, 40, rows).astype(float)])
+        prod[rng.random(prod.shape) < 0.05] = np.nan
+        statistics, p_values = ks_2samp_columns(reference, prod)
+        for j, ref in enumerate(reference):
+            expected = ks_2samp(ref, prod[~np.isnan(prod[:, j]), j])
+            assert (statistics[j], p_values[j]) == (expected.statistic, expected.pvalue)
+
+    pairs = [[[0, 700], [1, 300]], [[1, 50], [2, 30], [3, 20]], [[5, 10]]]
+    prod = np.column_stack([rng.integers(0, 2, 5000), rng.integers(1, 5, 5000), np.full(5000, 5)])
+    chi2, p_values, valid = chi2_columns(pairs, prod)
+    for j, ref in enumerate(pairs):
+        values, counts = np.unique(prod[:, j], return_counts=True)
+        keys = sorted(set(v for v, _ in ref) | set(values.tolist()))
+        table = [[dict(ref).get(k, 0) for k in keys], [dict(zip(values.tolist(), counts)).get(k, 0) for k in keys]]
+        expected_chi2, expected_p, _, _ = chi2_contingency(np.array(table))
+        assert valid[j]
+        assert chi2[j] == pytest.approx(expected_chi2, rel=1e-12)
+        assert p_values[j] == pytest.approx(expected_p, rel=1e-9)
+
+
+def test_drift_timeline_psi_and_ks_per_window(tmp_path, production_data):
+    """Test de la timeline : PSI par fenêtre identique au PSI du profil, KS par classes minorant, fenêtres de temps"""
+    from scipy.stats import ks_2samp
+    from app.drift_detect import compute_drift_timeline
+
+    profile = ReferenceProfile.from_csv(REFERENCE_FILE)
+    timeline = compute_drift_timeline(profile, PRODUCTION_FILE, window_rows=4000, chunk_size=1500)
+    assert [w["rows"] for w in timeline["windows"]] == [4000, 4000, 2000]
+    assert timeline["chunks"] == 7
+
+    for i, window in enumerate(timeline["windows"]):
+        rows = production_data.iloc[window["start_row"]:window["end_row"]]
+        for j, col in enumerate(timeline["features"]):
+            assert timeline["psi"][j][i] == pytest.approx(profile.psi(col, rows[col].to_numpy()), abs=1e-6)
+            if col in profile.continuous:
+                exact = ks_2samp(profile.continuous[col]["sorted"], rows[col].dropna()).statistic
+                assert exact - 0.02 <= timeline["ks_statistic"][j][i] <= exact + 1e-6
+            else:
+                assert timeline["ks_statistic"][j] is None
+
+    # Fenêtres d'une semaine sur un fichier horodaté non trié
+    stamped = production_data.assign(ts=pd.date_range("2025-01-06", periods=len(production_data), freq="1h"))
+    stamped.sample(frac=1, random_state=0).to_csv(tmp_path / "stamped.csv", index=False)
+    weekly = compute_drift_timeline(profile, tmp_path / "stamped.csv", time_column="ts", freq="7D")
+    starts = [w["start"] for w in weekly["windows"]]
+    assert starts == sorted(starts) and sum(w["rows"] for w in weekly["windows"]) == 10000
+
+
+def test_typed_loader_schema_and_missing_integers(tmp_path, production_data):
+    """Test du chargeur typé : int8/int16/float32, mêmes valeurs, entiers manquants ou hors bornes en float32"""
+    import numpy as np
+    from unittest.mock import patch
+    from app.data_loader import read_table, read_table_chunks
+
+    typed = read_table(PRODUCTION_FILE)
+    assert typed["HasCrCard"].dtype == np.int8 and typed["Age"].dtype == np.int16
+    assert typed["Balance"].dtype == np.float32
+    assert typed.memory_usage().sum() < production_data.memory_usage().sum() / 4
+    assert (typed["CreditScore"] == production_data["CreditScore"]).all()
+
+    missing = production_data.copy()
+    missing.loc[7000, "Tenure"] = np.nan
+    missing.to_csv(tmp_path / "missing.csv", index=False)
+    assert read_table(tmp_path / "missing.csv")["Tenure"].isna().sum() == 1
+    chunks = list(read_table_chunks(tmp_path / "missing.csv", 3000, usecols=["Tenure"]))
+    assert [len(c) for c in chunks] == [3000, 3000, 3000, 1000]
+    assert pd.concat(chunks)["Tenure"].isna().sum() == 1
+
+    # Hors bornes de l'int8 : valeur conservée, pas de repli silencieux (300 -> 44)
+    wide = production_data.head(10).copy()
+    wide.loc[3, "Tenure"] = 300
+    wide.to_csv(tmp_path / "wide.csv", index=False)
+    tenure = read_table(tmp_path / "wide.csv")["Tenure"]
+    assert tenure.dtype == np.float32 and tenure[3] == 300
+    assert read_table(tmp_path / "wide.csv")["Age"].dtype == np.int16
+
+    # Plusieurs blocs : colonne élargie en place quand un bloc l'exige, autres valeurs intactes
+    with patch("app.data_loader.READ_CHUNK_ROWS", 3):
+        blocks = read_table(tmp_path / "wide.csv")
+    assert blocks["Tenure"].dtype == np.float32 and blocks["Tenure"].tolist() == wide["Tenure"].tolist()
+    assert blocks["Age"].dtype == np.int16 and (blocks["Age"] == wide["Age"]).all()
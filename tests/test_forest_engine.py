@@ -0,0 +1,64 @@
+# tests/test_forest_engine.py - Parité du moteur compilé avec scikit-learn
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+
+from app.forest_engine import CompiledForest
+
+DATA_FILE = os.path.join(os.path.dirname(__file__), '..', 'data', 'bank_churn.csv')
+
+
+@pytest.fixture(scope="module")
+def bank_data():
+    df = pd.read_csv(DATA_FILE)
+    return df.drop('Exited', axis=1), df['Exited']
+
+
+@pytest.mark.parametrize("params", [
+    # Paramètres de train_model.py
+    {"n_estimators": 100, "max_depth": 10, "min_samples_split": 5, "random_state": 42},
+    {"n_estimators": 30, "max_depth": None, "bootstrap": False, "max_features": "log2", "random_state": 0},
+    {"n_estimators": 20, "min_samples_leaf": 4, "class_weight": "balanced_subsample", "random_state": 1},
+])
+def test_compiled_forest_matches_sklearn(bank_data, params):
+    """Test que le moteur compilé reproduit predict_proba sur toutes les lignes du CSV"""
+    X, y = bank_data
+    forest = RandomForestClassifier(**params).fit(X, y)
+    engine = CompiledForest.from_sklearn(forest, block_size=3000)
+
+    expected = forest.predict_proba(X)
+    actual = engine.predict_proba(X.values)
+
+    assert actual.shape == expected.shape
+    assert np.max(np.abs(actual - expected)) <= 1e-9
+    assert np.array_equal(engine.predict(X.values), forest.predict(X))
+
+
+def test_compiled_forest_rejects_bad_shape(bank_data):
+    """Test la validation de la forme des entrées"""
+    X, y = bank_data
+    forest = RandomForestClassifier(n_estimators=2, random_state=0).fit(X, y)
+    engine = CompiledForest.from_sklearn(forest)
+
+    with pytest.raises(ValueError):
+        engine.predict_proba(np.zeros((3, 4)))
+
+
+def test_compiled_forest_mmap_roundtrip(bank_data, tmp_path):
+    """Test que l'artefact relu en mmap donne les mêmes probabilités"""
+    X, y = bank_data
+    forest = RandomForestClassifier(n_estimators=10, max_depth=8, random_state=0).fit(X, y)
+    engine = CompiledForest.from_sklearn(forest)
+
+    artifact = engine.save(tmp_path / "abc123", source_version="abc123")
+    engine.save(tmp_path / "abc123")  # second worker : artefact déjà présent
+    loaded = CompiledForest.load(artifact, mmap_mode="r")
+
+    assert isinstance(loaded.feature, np.memmap)
+    assert np.array_equal(loaded.predict_proba(X.values), forest.predict_proba(X))
@@ -0,0 +1,149 @@
+# tests/test_model_search.py - Recherche d'hyperparamètres sous budget
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+import pytest
+from sklearn.datasets import make_classification
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.model_selection import GridSearchCV, StratifiedKFold
+
+from sklearn.preprocessing import StandardScaler
+
+from app.artifact_cache import ArtifactCache
+from app.model_search import ForestGridSearch, SuccessiveHalvingSearch
+from app.search_checkpoint import candidate_key
+
+PARAM_GRID = {
+    'n_estimators': [10, 20, 45],
+    'max_depth': [3, None],
+    'min_samples_leaf': [1, 8],
+    'max_features': ['sqrt', 'log2'],
+}
+
+
+def test_successive_halving_within_budget_matches_grid():
+    """Test du successive halving : plan sous budget, ressource max au dernier palier, score proche de la grille"""
+    X, y = make_classification(600, 8, random_state=0)
+    cv = StratifiedKFold(3, shuffle=True, random_state=42)
+    grid = GridSearchCV(RandomForestClassifier(random_state=42), PARAM_GRID, cv=cv, scoring='roc_auc').fit(X, y)
+
+    search = SuccessiveHalvingSearch(RandomForestClassifier(random_state=42), PARAM_GRID, cv, max_fits=30)
+    search.fit(X, y)
+    assert search.n_fits_ <= 30 < 3 * len(grid.cv_results_["params"])
+    assert [rung["resource"] for rung in search.rungs_] == [5, 15, 45]
+    assert search.best_params_["n_estimators"] == 45
+    assert search.best_score_ > grid.best_score_ - 0.02
+    assert search.best_estimator_.n_estimators == 45
+    assert [entry["fits"] for entry in search.trajectory_] == list(range(3, search.n_fits_ + 1, 3))
+
+    by_rows = SuccessiveHalvingSearch(
+        RandomForestClassifier(n_estimators=10, random_state=42), PARAM_GRID, cv,
+        resource="n_samples", max_fits=12, refit=False
+    ).fit(X, y)
+    assert by_rows.n_fits_ <= 12
+    assert by_rows.trajectory_[0]["resource"] < by_rows.trajectory_[-1]["resource"] <= 400
+
+    # Ressource max : lignes du plus petit fold après suréchantillonnage
+    X, y = make_classification(600, 8, weights=[0.8], random_state=0)
+    resampled = SuccessiveHalvingSearch(
+        RandomForestClassifier(n_estimators=10, random_state=42), PARAM_GRID, cv, resource="n_samples",
+        max_fits=12, refit=False, fold_preprocess=lambda X_train, y_train, X_test: (*oversample(X_train, y_train), X_test)
+    ).fit(X, y)
+    assert resampled.rungs_[-1]["resource"] == min(len(oversample(X[train], y[train])[1]) for train, _ in cv.split(X, y))
+
+
+def test_tpe_sampler_proposes_each_candidate_once():
+    """Test de l'échantillonneur TPE : petite grille, aucune proposition évaluée deux fois"""
+    pytest.importorskip("optuna")
+    X, y = make_classification(300, 8, random_state=0)
+    cv = StratifiedKFold(3, shuffle=True, random_state=42)
+    param_grid = {'n_estimators': [10, 20], 'max_depth': [3, None], 'min_samples_leaf': [1, 8]}
+
+    search = SuccessiveHalvingSearch(RandomForestClassifier(random_state=42), param_grid, cv, sampler="tpe",
+                                     refit=False).fit(X, y)
+    first_rung = [entry["params"] for entry in search.trajectory_ if entry["rung"] == 0]
+    assert len(first_rung) == 4
+    assert len({candidate_key(params) for params in first_rung}) == 4
+    assert search.best_params_ in [{**params, "n_estimators": 20} for params in first_rung]
+
+
+def test_forest_grid_shares_trees_and_matches_grid_search():
+    """Test de la grille à forêts partagées : scores identiques à GridSearchCV, une forêt par groupe et fold"""
+    X, y = make_classification(400, 8, random_state=0)
+    cv = StratifiedKFold(3, shuffle=True, random_state=42)
+    param_grid = {**PARAM_GRID, 'class_weight': ['balanced_subsample', None]}
+    grid = GridSearchCV(RandomForestClassifier(random_state=42), param_grid, cv=cv, scoring='roc_auc').fit(X, y)
+
+    search = ForestGridSearch(RandomForestClassifier(random_state=42), param_grid, cv).fit(X, y)
+    assert search.cv_results_["params"] == grid.cv_results_["params"]
+    assert np.array_equal(search.cv_results_["mean_test_score"], grid.cv_results_["mean_test_score"])
+    assert search.best_params_ == grid.best_params_
+    assert search.n_fits_ == len(grid.cv_results_["params"])
+    assert search.n_trees_ == 45 * search.n_fits_
+
+
+def test_checkpointed_search_resumes_without_refitting(tmp_path):
+    """Test du point de reprise : recherche interrompue puis relancée, seuls les folds manquants sont ajustés"""
+    X, y = make_classification(300, 8, random_state=0)
+    cv = StratifiedKFold(3, shuffle=True, random_state=42)
+    checkpoint = tmp_path / "search.db"
+    evaluated = []
+
+    def interrupt(entry):
+        evaluated.append(entry)
+        if len(evaluated) == 6:
+            raise KeyboardInterrupt
+
+    try:
+        ForestGridSearch(RandomForestClassifier(random_state=42), PARAM_GRID, cv, checkpoint=checkpoint,
+                         on_evaluation=interrupt).fit(X, y)
+    except KeyboardInterrupt:
+        pass
+    resumed = ForestGridSearch(RandomForestClassifier(random_state=42), PARAM_GRID, cv, checkpoint=checkpoint,
+                               refit=False).fit(X, y)
+    fresh = ForestGridSearch(RandomForestClassifier(random_state=42), PARAM_GRID, cv, refit=False).fit(X, y)
+    assert resumed.n_restored_ == 2 * 3
+    assert resumed.n_trees_ == fresh.n_trees_ - 2 * 3 * 45
+    assert np.array_equal(resumed.cv_results_["mean_test_score"], fresh.cv_results_["mean_test_score"])
+
+    rerun = ForestGridSearch(RandomForestClassifier(random_state=42), PARAM_GRID, cv, checkpoint=checkpoint,
+                             refit=False).fit(X, y)
+    assert rerun.n_trees_ == 0
+    assert rerun.best_params_ == fresh.best_params_
+
+
+def oversample(X, y):
+    """Suréchantillonnage de la classe minoritaire (remplace SMOTE, imblearn non requis)"""
+    minority = np.flatnonzero(y == 1)
+    extra = np.random.RandomState(0).choice(minority, len(y) - 2 * len(minority), replace=True)
+    return np.vstack([X, X[extra]]), np.concatenate([y, y[extra]])
+
+
+def test_fold_preprocessing_cached_across_candidates_and_runs(tmp_path):
+    """Test du cache d'artefacts : préparation une fois par fold, relue au lancement suivant"""
+    X, y = make_classification(300, 8, weights=[0.8], random_state=0)
+    cv = StratifiedKFold(3, shuffle=True, random_state=42)
+
+    def run():
+        cache = ArtifactCache(tmp_path / "artifacts")
+
+        def prepare(X_train, y_train, X_test):
+            X_train, y_train = cache.call("oversample", oversample, X_train, y_train)
+            scaler = cache.call("scaler", StandardScaler().fit, X_train)
+            return scaler.transform(X_train), y_train, scaler.transform(X_test)
+
+        search = ForestGridSearch(RandomForestClassifier(random_state=42), PARAM_GRID, cv, fold_preprocess=prepare)
+        return search.fit(X, y), cache.report()
+
+    first, first_report = run()
+    assert first_report["oversample"]["misses"] == 3 + 1
+    assert first_report["scaler"]["hits"] == 0
+    assert first.best_estimator_.n_features_in_ == 8
+
+    second, second_report = run()
+    assert second_report["oversample"]["hit_rate"] == second_report["scaler"]["hit_rate"] == 1.0
+    assert second_report["oversample"]["compute_seconds"] == 0
+    assert np.array_equal(second.cv_results_["mean_test_score"], first.cv_results_["mean_test_score"])
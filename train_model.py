@@ -16,12 +16,16 @@ import mlflow.sklearn
 import matplotlib.pyplot as plt
 import seaborn as sns
 
+from app.data_loader import read_table
+from app.drift_profile import ReferenceProfile
+
 # Configuration MLflow
 mlflow.set_tracking_uri("./mlruns")
 mlflow.set_experiment("bank-churn-prediction")
 
 print("Chargement des donnees...")
-df = pd.read_csv("data/bank_churn.csv")
+# Schéma typé (int8/int16, décimaux en float32 comme dans les arbres)
+df = read_table("data/bank_churn.csv")
 
 print(f"Dataset : {len(df)} lignes, {len(df.columns)} colonnes")
 print(f"Taux de churn : {df['Exited'].mean():.2%}")
@@ -110,6 +114,9 @@ with mlflow.start_run(run_name="random-forest-v1"):
     
     # Sauvegarde locale du modele
     joblib.dump(model, "model/churn_model.pkl")
+
+    # Profil de reference pour la detection de drift (stats calculees une fois)
+    ReferenceProfile.from_csv("data/bank_churn.csv").save("model/reference_profile.npz")
     
     # Tags
     mlflow.set_tags({
@@ -130,4 +137,5 @@ with mlflow.start_run(run_name="random-forest-v1"):
     print("="*50)
     
     print(f"\nModele sauvegarde dans : model/churn_model.pkl")
+    print(f"Profil de reference drift : model/reference_profile.npz")
     print(f"MLflow UI : mlflow ui --port 5000")
\ No newline at end of file
@@ -1,6 +1,6 @@
 import pandas as pd
 import numpy as np
-from sklearn.model_selection import train_test_split, GridSearchCV, StratifiedKFold
+from sklearn.model_selection import train_test_split, StratifiedKFold
 from sklearn.ensemble import RandomForestClassifier, GradientBoostingClassifier
 from sklearn.metrics import (
     accuracy_score, 
@@ -14,12 +14,35 @@ from sklearn.metrics import (
 from sklearn.preprocessing import StandardScaler
 from imblearn.over_sampling import SMOTE
 import joblib
+import os
+import time
 import mlflow
 import mlflow.sklearn
 import matplotlib.pyplot as plt
 import seaborn as sns
 from datetime import datetime
 
+from app.artifact_cache import ArtifactCache
+from app.data_loader import read_table
+from app.model_search import ForestGridSearch, SuccessiveHalvingSearch
+
+# Recherche d'hyperparamètres : "halving" (successive halving sous budget)
+# ou "grid" (grille exhaustive, 1 296 candidats x 5 folds, forêts partagées
+# entre valeurs de n_estimators) ;
+# budget en fits (0 = plan complet) et en secondes (0 = illimité),
+# ressource ("n_estimators" ou "n_samples"), échantillonneur ("grid" ou "tpe", optuna)
+SEARCH_MODE = os.getenv("SEARCH_MODE", "halving").lower()
+SEARCH_MAX_FITS = int(os.getenv("SEARCH_MAX_FITS", "0"))
+SEARCH_MAX_SECONDS = float(os.getenv("SEARCH_MAX_SECONDS", "0"))
+SEARCH_RESOURCE = os.getenv("SEARCH_RESOURCE", "n_estimators")
+SEARCH_SAMPLER = os.getenv("SEARCH_SAMPLER", "grid")
+# Point de reprise SQLite : scores (candidat, fold) conservés entre deux
+# lancements ("" pour désactiver) ; plusieurs processus peuvent le partager
+SEARCH_CHECKPOINT = os.getenv("SEARCH_CHECKPOINT", "model/search_checkpoint.db")
+# Cache des features, du SMOTE et du StandardScaler (par fold) entre
+# candidats et lancements ("" : cache en mémoire, pour ce lancement seulement)
+ARTIFACT_CACHE = os.getenv("ARTIFACT_CACHE", "model/artifact_cache")
+
 # Configuration MLflow
 mlflow.set_tracking_uri("./mlruns")
 mlflow.set_experiment("bank-churn-prediction")
@@ -28,60 +51,88 @@ print("="*60)
 print("CHARGEMENT ET PREPROCESSING DES DONNEES")
 print("="*60)
 
-df = pd.read_csv("data/bank_churn.csv")
+# Schéma typé (int8/int16, décimaux en float32 comme dans les arbres)
+df = read_table("data/bank_churn.csv")
 
 print(f"Dataset : {len(df)} lignes, {len(df.columns)} colonnes")
 print(f"Taux de churn : {df['Exited'].mean():.2%}")
 
-# ANALYSE ET FEATURE ENGINEERING
-print("\n🔍 Feature engineering...")
+numerical_cols = ['CreditScore', 'Age', 'Balance', 'EstimatedSalary', 
+                  'Balance_to_Salary_Ratio', 'CreditScore_Age_Interaction']
+
+
+def engineer_features(df):
+    """Features dérivées et one-hot des tranches d'âge ; renvoie (X, y)"""
+    df = df.copy()
+    # 1. Création de nouvelles features pertinentes
+    df['Balance_to_Salary_Ratio'] = df['Balance'] / (df['EstimatedSalary'] + 1)
+    df['Products_per_Tenure'] = df['NumOfProducts'] / (df['Tenure'] + 1)
+    # int16 * int16 déborde (850 * 90 > 32767) : produit calculé en float
+    df['CreditScore_Age_Interaction'] = df['CreditScore'].astype(np.float64) * df['Age'] / 1000
+    df['Is_High_Value'] = ((df['Balance'] > df['Balance'].median()) & 
+                           (df['EstimatedSalary'] > df['EstimatedSalary'].median())).astype(int)
+
+    # 2. Catégorisation d'âge (plus informatif que l'âge brut)
+    df['Age_Group'] = pd.cut(df['Age'], 
+                             bins=[0, 25, 35, 45, 55, 65, 100],
+                             labels=['<25', '25-35', '35-45', '45-55', '55-65', '65+'])
+
+    # Encodage one-hot pour Age_Group
+    age_dummies = pd.get_dummies(df['Age_Group'], prefix='Age', drop_first=True)
+    df = pd.concat([df, age_dummies], axis=1)
+
+    # Séparation features/target
+    return df.drop(['Exited', 'Age_Group'], axis=1), df['Exited']
+
+
+def resample(X, y):
+    """SMOTE : 50% de churneurs (k-NN sur toutes les lignes)"""
+    return SMOTE(random_state=42, sampling_strategy=0.5).fit_resample(X, y)
+
 
-# 1. Création de nouvelles features pertinentes
-df['Balance_to_Salary_Ratio'] = df['Balance'] / (df['EstimatedSalary'] + 1)
-df['Products_per_Tenure'] = df['NumOfProducts'] / (df['Tenure'] + 1)
-df['CreditScore_Age_Interaction'] = df['CreditScore'] * df['Age'] / 1000
-df['Is_High_Value'] = ((df['Balance'] > df['Balance'].median()) & 
-                       (df['EstimatedSalary'] > df['EstimatedSalary'].median())).astype(int)
+def fit_scaler(X):
+    return StandardScaler().fit(X[numerical_cols])
 
-# 2. Catégorisation d'âge (plus informatif que l'âge brut)
-df['Age_Group'] = pd.cut(df['Age'], 
-                         bins=[0, 25, 35, 45, 55, 65, 100],
-                         labels=['<25', '25-35', '35-45', '45-55', '55-65', '65+'])
 
-# Encodage one-hot pour Age_Group
-age_dummies = pd.get_dummies(df['Age_Group'], prefix='Age', drop_first=True)
-df = pd.concat([df, age_dummies], axis=1)
+def prepare(X_train, y_train, X_test):
+    """SMOTE puis normalisation ajustés sur X_train seul (un fold ou le train complet)"""
+    X_train, y_train = artifacts.call("smote", resample, X_train, y_train)
+    scaler = artifacts.call("scaler", fit_scaler, X_train)
+    X_train, X_test = X_train.copy(), X_test.copy()
+    X_train[numerical_cols] = scaler.transform(X_train[numerical_cols])
+    X_test[numerical_cols] = scaler.transform(X_test[numerical_cols])
+    return X_train, y_train, X_test, scaler
 
-# Séparation features/target
-X = df.drop(['Exited', 'Age_Group'], axis=1)
-y = df['Exited']
 
-# GÉRER LE DÉSÉQUILIBRE DE CLASSES AVEC SMOTE
-print(f"\n📊 Distribution avant SMOTE: {np.bincount(y)}")
-print(f"Ratio classe minoritaire: {np.bincount(y)[1]/len(y):.2%}")
+def prepare_fold(X_train, y_train, X_test):
+    return prepare(X_train, y_train, X_test)[:3]
 
-smote = SMOTE(random_state=42, sampling_strategy=0.5)  # 50% de churneurs
-X_resampled, y_resampled = smote.fit_resample(X, y)
-print(f"📊 Distribution après SMOTE: {np.bincount(y_resampled)}")
 
-# Split train/test avec stratification
+# Cache disque des étapes de préparation (clé : données + code + paramètres)
+artifacts = ArtifactCache(ARTIFACT_CACHE or None)
+
+# ANALYSE ET FEATURE ENGINEERING
+print("\n🔍 Feature engineering...")
+X, y = artifacts.call("features", engineer_features, df)
+
+# Split train/test avec stratification, sur les données réelles :
+# SMOTE et normalisation sont ajustés sur le train (et sur chaque fold en CV)
 X_train, X_test, y_train, y_test = train_test_split(
-    X_resampled, y_resampled, test_size=0.2, random_state=42, stratify=y_resampled
+    X, y, test_size=0.2, random_state=42, stratify=y
 )
 
 print(f"\n📈 Train : {len(X_train)} lignes")
 print(f"📉 Test  : {len(X_test)} lignes")
 
-# NORMALISATION des features numériques
-scaler = StandardScaler()
-numerical_cols = ['CreditScore', 'Age', 'Balance', 'EstimatedSalary', 
-                  'Balance_to_Salary_Ratio', 'CreditScore_Age_Interaction']
-X_train[numerical_cols] = scaler.fit_transform(X_train[numerical_cols])
-X_test[numerical_cols] = scaler.transform(X_test[numerical_cols])
+# GÉRER LE DÉSÉQUILIBRE DE CLASSES AVEC SMOTE + NORMALISATION des features numériques
+print(f"\n📊 Distribution avant SMOTE: {np.bincount(y_train)}")
+print(f"Ratio classe minoritaire: {np.bincount(y_train)[1]/len(y_train):.2%}")
+X_train_prepared, y_train_prepared, X_test, scaler = prepare(X_train, y_train, X_test)
+print(f"📊 Distribution après SMOTE: {np.bincount(y_train_prepared)}")
 
-# OPTIMISATION HYPERPARAMÈTRES AVEC GRID SEARCH
+# OPTIMISATION HYPERPARAMÈTRES
 print("\n" + "="*60)
-print("OPTIMISATION DES HYPERPARAMÈTRES (GridSearchCV)")
+print(f"OPTIMISATION DES HYPERPARAMÈTRES ({SEARCH_MODE})")
 print("="*60)
 
 with mlflow.start_run(run_name=f"optimized-rf-{datetime.now().strftime('%Y%m%d-%H%M%S')}"):
@@ -100,22 +151,87 @@ with mlflow.start_run(run_name=f"optimized-rf-{datetime.now().strftime('%Y%m%d-%
     # Validation croisée stratifiée
     cv = StratifiedKFold(n_splits=5, shuffle=True, random_state=42)
     
-    # GridSearch avec scoring sur ROC AUC (meilleur pour déséquilibre)
-    grid_search = GridSearchCV(
-        RandomForestClassifier(random_state=42),
-        param_grid,
-        cv=cv,
-        scoring='roc_auc',
-        n_jobs=-1,
-        verbose=1
-    )
+    # Scoring sur ROC AUC (meilleur pour déséquilibre)
+    search_started = time.perf_counter()
+    if SEARCH_MODE == "grid":
+        # Mêmes scores que GridSearchCV : une forêt de 300 arbres par fold
+        # dont on score les préfixes 100 / 200 / 300
+        search = ForestGridSearch(
+            RandomForestClassifier(random_state=42),
+            param_grid,
+            cv=cv,
+            scoring='roc_auc',
+            n_jobs=-1,
+            verbose=1,
+            fold_preprocess=prepare_fold,
+            checkpoint=SEARCH_CHECKPOINT or None
+        )
+    else:
+        # Successive halving : tous les candidats avec peu d'arbres, le
+        # meilleur tiers avec 3x plus, ... jusqu'à max(n_estimators)
+        search = SuccessiveHalvingSearch(
+            RandomForestClassifier(random_state=42),
+            param_grid,
+            cv=cv,
+            scoring='roc_auc',
+            resource=SEARCH_RESOURCE,
+            sampler=SEARCH_SAMPLER,
+            max_fits=SEARCH_MAX_FITS,
+            max_seconds=SEARCH_MAX_SECONDS,
+            n_jobs=-1,
+            verbose=1,
+            fold_preprocess=prepare_fold,
+            checkpoint=SEARCH_CHECKPOINT or None
+        )
     
     print("🔍 Recherche des meilleurs hyperparamètres...")
-    grid_search.fit(X_train, y_train)
+    # Données réelles : SMOTE et normalisation refaits (ou relus du cache)
+    # sur le train de chaque fold, puis sur tout le train pour le refit
+    search.fit(X_train, y_train)
+    search_seconds = time.perf_counter() - search_started
+    
+    # Trajectoire de la recherche (une entrée par candidat évalué)
+    trajectory = search.trajectory_
+    total_fits = search.n_fits_
+    
+    for step, entry in enumerate(trajectory):
+        metrics = {"search_score": entry["mean_score"], "candidate_seconds": entry["seconds"]}
+        if entry["resource"] is not None:
+            metrics["search_resource"] = entry["resource"]
+        mlflow.log_metrics(metrics, step=step)
+    mlflow.log_dict({"trajectory": trajectory}, "search_trajectory.json")
+    mlflow.log_params({
+        'search_mode': SEARCH_MODE,
+        'search_max_fits': SEARCH_MAX_FITS,
+        'search_max_seconds': SEARCH_MAX_SECONDS,
+        'search_checkpoint': SEARCH_CHECKPOINT or "none",
+    })
+    mlflow.log_metrics({
+        "search_total_fits": total_fits,
+        "search_total_trees": search.n_trees_,
+        "search_restored_folds": search.n_restored_,
+        "search_seconds": search_seconds,
+        "search_best_cv_score": float(search.best_score_),
+    })
+    
+    # Cache des étapes de préparation : hits et temps économisé par étape
+    cache_report = artifacts.report()
+    mlflow.log_dict(cache_report, "artifact_cache.json")
+    for stage, stats in cache_report.items():
+        mlflow.log_metrics({
+            f"cache_{stage}_hit_rate": stats["hit_rate"],
+            f"cache_{stage}_saved_seconds": stats["saved_seconds"],
+        })
+        print(f"🗄️  Cache {stage:<8}: {stats['hits']} hits / {stats['misses']} calculs "
+              f"({stats['hit_rate']:.0%}), {stats['saved_seconds']:.1f}s économisées, "
+              f"{stats['compute_seconds']:.1f}s de calcul")
+    print(f"⏱️  Recherche : {total_fits} fits ({search.n_restored_} repris du point de reprise) "
+          f"en {search_seconds:.0f}s, "
+          f"meilleur ROC AUC (CV) {search.best_score_:.4f}")
     
     # Meilleur modèle
-    best_model = grid_search.best_estimator_
-    best_params = grid_search.best_params_
+    best_model = search.best_estimator_
+    best_params = search.best_params_
     
     print(f"✅ Meilleurs paramètres trouvés:")
     for param, value in best_params.items():
@@ -231,7 +347,7 @@ with mlflow.start_run(run_name=f"optimized-rf-{datetime.now().strftime('%Y%m%d-%
         "environment": "production",
         "model_type": "RandomForest_Optimized",
         "task": "binary_classification",
-        "optimization": "grid_search",
+        "optimization": "grid_search" if SEARCH_MODE == "grid" else "successive_halving",
         "feature_engineering": "advanced"
     })
     